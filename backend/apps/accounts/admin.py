@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, TeacherProfile, StudentProfile, Lead
+from .models import User, TeacherProfile, StudentProfile, Lead, UserImportJob
 
 
 @admin.register(User)
@@ -31,6 +31,9 @@ class TeacherProfileAdmin(admin.ModelAdmin):
     search_fields = ['user__email', 'user__full_name', 'specialization']
     readonly_fields = ['total_students', 'total_earnings']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user').with_student_counts()
+
 
 @admin.register(StudentProfile)
 class StudentProfileAdmin(admin.ModelAdmin):
@@ -45,3 +48,10 @@ class LeadAdmin(admin.ModelAdmin):
     search_fields = ['full_name', 'phone_number', 'email']
     list_editable = ['is_contacted']
     ordering = ['-created_at']
+
+
+@admin.register(UserImportJob)
+class UserImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'role', 'status', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'role']
+    readonly_fields = ['report', 'error', 'started_at', 'finished_at']
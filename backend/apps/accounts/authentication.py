@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import user_cache
+
+
+def load_active_user(user_id):
+    """The full User for a token, rejected like JWTAuthentication.get_user would."""
+    try:
+        user = user_cache.get_or_load(user_id)
+    except get_user_model().DoesNotExist:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+    if not user.is_active:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+    return user
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    Lightweight request.user built from the claims that
+    CustomTokenObtainPairSerializer puts in every token.
+
+    id and role are answered straight from the token. Any other attribute
+    (or an ORM operation such as filter(student=request.user)) transparently
+    loads the full User through the per-process user cache. email and
+    full_name are deliberately not served from the token because users can
+    edit them mid-session. A deleted or deactivated user fails that load
+    with AuthenticationFailed, which DRF turns into a 401. The role
+    permissions (permissions.has_role) confirm the role the same way, so a
+    deactivated or demoted user loses access once the user cache entry of
+    the worker serving them expires (USER_CACHE_TTL_SECONDS), not when the
+    access token does.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, validated_token):
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: load_active_user(user_id))
+        self.__dict__['_claims'] = {
+            'id': user_id,
+            'pk': user_id,
+            'role': validated_token['role'],
+        }
+
+    def __getattr__(self, name):
+        claims = self.__dict__['_claims']
+        if name in claims:
+            return claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        return True
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_teacher(self):
+        return self.role == 'teacher'
+
+    @property
+    def is_student(self):
+        return self.role == 'student'
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that avoids the per-request SELECT on users.
+
+    Tokens carrying the role claim yield a ClaimsUser (or the cached User
+    when this worker already holds it). Older tokens without the claim fall
+    back to the stock database lookup. A deleted or deactivated user is
+    rejected as soon as the request needs more than id, or passes a role
+    permission, which covers every view that filters by request.user or
+    serializes it.
+    AdminUserToggleActiveView also blacklists the user's refresh tokens so
+    the session cannot be extended.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if 'role' not in validated_token:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+            return user
+
+        user = user_cache.get(user_id)
+        if user is not None:
+            if not user.is_active:
+                raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+            return user
+        return ClaimsUser(validated_token)
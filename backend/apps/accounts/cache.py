@@ -0,0 +1,78 @@
+"""
+Per-process LRU/TTL cache of User rows.
+
+Each gunicorn worker keeps its own copy, so entries are bounded both by
+size (least recently used rows are evicted first) and by age. Writes to a
+User invalidate the local entry through the signals in ``signals.py``;
+other workers pick the change up once their entry expires.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+
+class UserCache:
+    """Thread-safe LRU cache of User instances with a time-to-live."""
+
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id):
+        """Return a private copy of the cached user, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # Callers may mutate the instance (set_password, serializer updates),
+        # so never hand out the shared copy.
+        return copy.copy(user)
+
+    def set(self, user):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user.pk] = (time.monotonic() + self.ttl_seconds, copy.copy(user))
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, user_id):
+        """Return the user from the cache, loading it from the database on a miss."""
+        user = self.get(user_id)
+        if user is None:
+            User = get_user_model()
+            user = User.objects.get(pk=user_id)
+            self.set(user)
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,122 @@
+"""
+Local verification of Firebase ID tokens.
+
+Google rotates the keys that sign Firebase ID tokens and publishes them
+either as an x509 certificate map ({kid: pem}) or as a JWKS document. The
+key set is loaded from FIREBASE_CERTS_FILE or FIREBASE_CERTS_URL by a
+background thread and refreshed on the publisher's Cache-Control max-age,
+so verifying a token is a dictionary lookup plus a signature check and
+never waits on the network.
+"""
+import json
+import logging
+import re
+import threading
+import time
+import urllib.request
+
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_SECONDS = 60
+
+
+class FirebaseTokenError(Exception):
+    """The ID token is malformed, expired, or not signed by Firebase."""
+
+
+class KeySetUnavailable(Exception):
+    """Signing keys have not been loaded yet."""
+
+
+def parse_key_set(document):
+    """Return {kid: public_key} from an x509 certificate map or a JWKS document."""
+    if 'keys' in document:
+        return {key.key_id: key.key for key in jwt.PyJWKSet.from_dict(document).keys}
+    return {
+        kid: load_pem_x509_certificate(pem.encode()).public_key()
+        for kid, pem in document.items()
+    }
+
+
+class FirebaseKeySet:
+    def __init__(self, certs_file, certs_url, refresh_seconds):
+        self.certs_file = certs_file
+        self.certs_url = certs_url
+        self.refresh_seconds = refresh_seconds
+        self._keys = {}
+        self._loaded_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _fetch(self):
+        """Load the key set; returns the number of seconds it stays fresh."""
+        if self.certs_file:
+            with open(self.certs_file) as source:
+                document = json.load(source)
+            max_age = self.refresh_seconds
+        else:
+            with urllib.request.urlopen(self.certs_url, timeout=10) as response:
+                document = json.load(response)
+                match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+            max_age = int(match.group(1)) if match else self.refresh_seconds
+        self._keys = parse_key_set(document)
+        self._loaded_at = time.time()
+        return min(max_age, self.refresh_seconds)
+
+    def _refresh_forever(self):
+        while True:
+            try:
+                wait = self._fetch()
+            except Exception:
+                logger.exception('Could not load Firebase signing keys; retrying in %ss.', RETRY_SECONDS)
+                wait = RETRY_SECONDS
+            time.sleep(wait)
+
+    def start(self):
+        """Start the background refresher once per process."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._refresh_forever, name='firebase-keys', daemon=True
+                )
+                self._thread.start()
+
+    def get(self, kid):
+        if not self._keys:
+            self.start()
+            raise KeySetUnavailable()
+        key = self._keys.get(kid)
+        if key is None:
+            raise FirebaseTokenError('Unknown signing key.')
+        return key
+
+
+firebase_keys = FirebaseKeySet(
+    certs_file=settings.FIREBASE_CERTS_FILE,
+    certs_url=settings.FIREBASE_CERTS_URL,
+    refresh_seconds=settings.FIREBASE_CERTS_REFRESH_SECONDS,
+)
+
+
+def verify_id_token(id_token):
+    """Verify a Firebase ID token and return its claims."""
+    project_id = settings.FIREBASE_PROJECT_ID
+    try:
+        header = jwt.get_unverified_header(id_token)
+        claims = jwt.decode(
+            id_token,
+            firebase_keys.get(header.get('kid')),
+            algorithms=['RS256'],
+            audience=project_id,
+            issuer=f'https://securetoken.google.com/{project_id}',
+            options={'require': ['exp', 'iat', 'sub']},
+        )
+    except jwt.PyJWTError as exc:
+        raise FirebaseTokenError(str(exc))
+    if not claims.get('email') or not claims.get('email_verified'):
+        raise FirebaseTokenError('Token has no verified email.')
+    return claims
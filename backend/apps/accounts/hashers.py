@@ -0,0 +1,147 @@
+"""
+Bounded password hashing.
+
+PBKDF2 keeps a CPU busy for tens of milliseconds per call. Routing every
+hash through a small per-process executor caps how many run at once, so a
+burst of logins cannot occupy every worker thread. Once the slots and the
+wait queue are full, the hash fails at once with PasswordHashingBusy instead
+of piling up behind the hashes already running. The hasher also runs under
+the Django admin and management commands, so it raises a plain exception;
+the API turns it into a 503 with Retry-After (core/exceptions.py).
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashingBusy(Exception):
+    """Every hashing slot is taken; `wait` is the suggested retry delay in seconds."""
+
+    def __init__(self, wait):
+        super().__init__(f'Password hashing is busy; retry in {wait}s.')
+        self.wait = wait
+
+
+class HashingExecutor:
+    """Runs hash functions on at most `slots` threads with a bounded wait queue."""
+
+    def __init__(self, slots, queue_size, timeout, retry_after):
+        self.slots = slots
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def _get_pool(self):
+        # Created lazily so no threads exist before gunicorn forks its workers.
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.slots, thread_name_prefix='password-hash'
+                    )
+        return self._pool
+
+    def _reject(self, reason):
+        with self._lock:
+            self._rejected += 1
+        logger.warning('Rejected password hash (%s); %d pending.', reason, self._pending)
+        raise PasswordHashingBusy(wait=self.retry_after)
+
+    def _timed(self, fn, args):
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def run(self, fn, *args):
+        if self.slots <= 0:
+            return fn(*args)
+
+        with self._lock:
+            full = self._pending >= self.slots + self.queue_size
+            if not full:
+                self._pending += 1
+                self._peak_pending = max(self._peak_pending, self._pending)
+        if full:
+            self._reject('queue full')
+
+        future = self._get_pool().submit(self._timed, fn, args)
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._reject('timed out waiting for a slot')
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'slots': self.slots,
+                'queue_size': self.queue_size,
+                'running': self._running,
+                'queue_depth': max(self._pending - self._running, 0),
+                'peak_pending': self._peak_pending,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_hash_ms': round(self._total_seconds / self._completed * 1000, 2) if self._completed else 0.0,
+                'max_hash_ms': round(self._max_seconds * 1000, 2),
+            }
+
+
+hashing_executor = HashingExecutor(
+    slots=settings.PASSWORD_HASHING_SLOTS,
+    queue_size=settings.PASSWORD_HASHING_QUEUE_SIZE,
+    timeout=settings.PASSWORD_HASHING_TIMEOUT_SECONDS,
+    retry_after=settings.PASSWORD_HASHING_RETRY_AFTER_SECONDS,
+)
+
+
+class BoundedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's default PBKDF2 hasher, run through the bounded executor.
+    Keeps the 'pbkdf2_sha256' algorithm name so existing hashes verify as before;
+    verify() and harden_runtime() both go through encode(), so only encode is wrapped.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        return hashing_executor.run(super().encode, password, salt, iterations)
+
+
+def hash_passwords(passwords):
+    """
+    Hash a batch of raw passwords; blank entries get an unusable password.
+    Runs inside the bulk-import process pool, which is already the
+    concurrency limit, so it uses the plain PBKDF2 hasher directly.
+    """
+    hasher = PBKDF2PasswordHasher()
+    return [
+        hasher.encode(password, hasher.salt()) if password else make_password(None)
+        for password in passwords
+    ]
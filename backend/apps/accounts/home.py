@@ -0,0 +1,75 @@
+"""
+Everything the student dashboard shows, in one response.
+
+The dashboard used to call my-enrollments/, my-schedule/, my-meetings/,
+my-subscription/ and my-payments/ separately. Here the student row is
+loaded once with the subscription joined in, and each list section is one
+sliced Prefetch. Django limits a sliced prefetch per parent with a window
+function, so a fixed five queries cover the whole dashboard. Each section
+uses the same filters, ordering and serializer as its standalone endpoint,
+capped at STUDENT_HOME_LIMITS rows. One extra row is fetched per section so
+`has_more` tells the client when to link to the full list.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+
+from apps.courses.models import Enrollment
+from apps.courses.serializers import EnrollmentStudentSerializer
+from apps.payments.models import Payment, Subscription
+from apps.payments.serializers import PaymentSerializer, SubscriptionSerializer
+from apps.schedules.models import Schedule
+from apps.schedules.serializers import ScheduleSerializer
+from apps.zoom_meetings.models import ZoomMeeting
+from apps.zoom_meetings.serializers import StudentZoomMeetingSerializer
+
+User = get_user_model()
+
+# section -> (related name, queryset, serializer)
+SECTIONS = {
+    'enrollments': (
+        'enrollments',
+        Enrollment.objects.filter(is_active=True).select_related('course', 'course__created_by', 'teacher')
+        .order_by('-enrolled_at', '-id'),
+        EnrollmentStudentSerializer,
+    ),
+    'schedule': (
+        'learning_schedules',
+        Schedule.objects.filter(is_active=True).select_related('teacher', 'enrollment')
+        .order_by('day_of_week', 'start_time', 'id'),
+        ScheduleSerializer,
+    ),
+    'meetings': (
+        'zoom_meetings_as_student',
+        ZoomMeeting.objects.filter(is_active=True).select_related('teacher').order_by('-scheduled_at', '-id'),
+        StudentZoomMeetingSerializer,
+    ),
+    'payments': (
+        'payments',
+        Payment.objects.order_by('-payment_date', '-id'),
+        PaymentSerializer,
+    ),
+}
+
+
+def student_home(user_id, context):
+    limits = settings.STUDENT_HOME_LIMITS
+    student = User.objects.select_related('subscription').prefetch_related(*[
+        Prefetch(related_name, queryset=queryset[:limits[section] + 1], to_attr=f'home_{section}')
+        for section, (related_name, queryset, _) in SECTIONS.items()
+    ]).get(pk=user_id)
+
+    try:
+        subscription = student.subscription
+    except Subscription.DoesNotExist:
+        subscription = None
+    home = {
+        'subscription': SubscriptionSerializer(subscription, context=context).data if subscription else None,
+    }
+    for section, (_, _, serializer_class) in SECTIONS.items():
+        rows = getattr(student, f'home_{section}')
+        home[section] = {
+            'results': serializer_class(rows[:limits[section]], many=True, context=context).data,
+            'has_more': len(rows) > limits[section],
+        }
+    return home
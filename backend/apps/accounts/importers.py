@@ -0,0 +1,241 @@
+"""
+Streaming bulk import of students or teachers from CSV.
+
+Rows are read lazily and processed in chunks. For each chunk:
+
+1. Rows are validated with the *ImportRowSerializer for the role, and
+   emails are checked against the rest of the file and against existing
+   users with a single IN query.
+2. Passwords are hashed on a process pool. Later chunks are hashed while
+   earlier ones are written.
+3. User and profile rows are inserted with bulk_create inside one
+   transaction per chunk.
+
+The result is a summary plus a per-row error report that uses the CSV's
+1-based data row numbers.
+
+The admin API never runs an import inside the request. It stores the
+upload as a UserImportJob and answers 202; run_next_job() is called by
+`manage.py import_users --worker`, a separate process started by start.sh.
+A job still running USER_IMPORT_JOB_TIMEOUT_SECONDS after it started is
+taken to belong to a worker that died and is marked failed. It is not
+rerun, because the chunks it committed would come back as duplicate emails.
+"""
+import csv
+import io
+import itertools
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.response_cache import bump_model_version
+
+from .hashers import hash_passwords
+from .models import User, StudentProfile, TeacherProfile, UserImportJob
+from .serializers import StudentImportRowSerializer, TeacherImportRowSerializer
+
+ROLE_CONFIG = {
+    User.Role.STUDENT: (StudentImportRowSerializer, StudentProfile, 'total_students'),
+    User.Role.TEACHER: (TeacherImportRowSerializer, TeacherProfile, 'total_teachers'),
+}
+USER_FIELDS = ('email', 'full_name', 'phone')
+
+logger = logging.getLogger(__name__)
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, row_number, email, errors):
+        self.errors.append({'row': row_number, 'email': email, 'errors': errors})
+
+    def as_dict(self):
+        errors = sorted(self.errors, key=lambda error: error['row'])
+        return {'created': self.created, 'failed': len(errors), 'errors': errors}
+
+
+class UserImporter:
+    def __init__(self, role, chunk_size=None, processes=None):
+        if role not in ROLE_CONFIG:
+            raise ValueError(f'Unsupported import role: {role}')
+        self.role = role
+        self.row_serializer, self.profile_model, self.stats_field = ROLE_CONFIG[role]
+        self.chunk_size = chunk_size or settings.USER_IMPORT_CHUNK_SIZE
+        self.processes = processes or settings.USER_IMPORT_PROCESSES
+        self.report = ImportReport()
+        self._seen_emails = set()
+
+    def run(self, text_stream):
+        rows = enumerate(csv.DictReader(text_stream), start=1)
+        chunks = iter(lambda: list(itertools.islice(rows, self.chunk_size)), [])
+
+        # spawn rather than fork, so the children never share the parent's
+        # database connection; hash_passwords only needs settings.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=context) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                valid = self._validate(chunk)
+                passwords = [data.pop('password') for _, data in valid]
+                in_flight.append((valid, self._submit_hashes(pool, passwords)))
+                # Keep at most two chunks hashing so memory stays bounded.
+                if len(in_flight) > 1:
+                    self._write(*in_flight.popleft())
+            while in_flight:
+                self._write(*in_flight.popleft())
+        return self.report.as_dict()
+
+    def _submit_hashes(self, pool, passwords):
+        size = max(1, -(-len(passwords) // self.processes))
+        return [
+            pool.submit(hash_passwords, passwords[start:start + size])
+            for start in range(0, len(passwords), size)
+        ]
+
+    def _validate(self, chunk):
+        candidates = []
+        for row_number, row in chunk:
+            # Blank cells mean "use the default", not "empty value".
+            data = {
+                key.strip(): value.strip()
+                for key, value in row.items()
+                if key and isinstance(value, str) and value.strip()
+            }
+            serializer = self.row_serializer(data=data)
+            if not serializer.is_valid():
+                self.report.add_error(row_number, data.get('email', ''), serializer.errors)
+                continue
+            validated = dict(serializer.validated_data)
+            validated['email'] = User.objects.normalize_email(validated['email'])
+            if validated['email'] in self._seen_emails:
+                self.report.add_error(row_number, validated['email'], {'email': ['Duplicate email in file.']})
+                continue
+            self._seen_emails.add(validated['email'])
+            candidates.append((row_number, validated))
+
+        existing = set(
+            User.objects.filter(
+                email__in=[data['email'] for _, data in candidates]
+            ).values_list('email', flat=True)
+        )
+        valid = []
+        for row_number, data in candidates:
+            if data['email'] in existing:
+                self.report.add_error(row_number, data['email'], {'email': ['A user with this email already exists.']})
+            else:
+                valid.append((row_number, data))
+        return valid
+
+    def _build(self, data, password_hash):
+        user = User(
+            role=self.role,
+            password=password_hash,
+            **{field: data[field] for field in USER_FIELDS}
+        )
+        profile_data = {key: value for key, value in data.items() if key not in USER_FIELDS}
+        return user, profile_data
+
+    def _write(self, valid, hash_futures):
+        if not valid:
+            return
+        hashes = list(itertools.chain.from_iterable(future.result() for future in hash_futures))
+        built = [self._build(data, password_hash) for (_, data), password_hash in zip(valid, hashes)]
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create([user for user, _ in built])
+                self.profile_model.objects.bulk_create([
+                    self.profile_model(user=user, **profile_data)
+                    for user, (_, profile_data) in zip(users, built)
+                ])
+                self._record_created(len(users))
+        except IntegrityError:
+            # Someone created a conflicting user since validation; retry the
+            # chunk row by row so only the conflicting rows are reported.
+            for (row_number, data), (user, profile_data) in zip(valid, built):
+                user.pk = None
+                try:
+                    with transaction.atomic():
+                        user.save()
+                        self.profile_model.objects.create(user=user, **profile_data)
+                except IntegrityError:
+                    self.report.add_error(row_number, data['email'], {'email': ['A user with this email already exists.']})
+                else:
+                    self.report.created += 1
+            if self.report.created:
+                bump_model_version(User)
+                bump_model_version(self.profile_model)
+
+    def _record_created(self, count):
+        # bulk_create skips the post_save signals that keep the dashboard
+        # snapshot current, so apply the delta for the whole chunk here.
+        from apps.analytics.models import StatsSnapshot
+        StatsSnapshot.apply_delta(**{self.stats_field: count})
+        bump_model_version(User)
+        bump_model_version(self.profile_model)
+        self.report.created += count
+
+
+def fail_stale_jobs():
+    """Mark imports left running by a worker that died as failed; returns them."""
+    cutoff = timezone.now() - timedelta(seconds=settings.USER_IMPORT_JOB_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        stale = list(UserImportJob.objects.select_for_update(skip_locked=True).filter(
+            status=UserImportJob.Status.RUNNING, started_at__lt=cutoff,
+        ))
+        for job in stale:
+            logger.warning('User import job %s stopped without finishing.', job.pk)
+            job.status = UserImportJob.Status.FAILED
+            job.error = (
+                'The import worker stopped before finishing. Rows imported before that were kept; '
+                'upload the remaining rows again.'
+            )
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+    for job in stale:
+        job.file.delete(save=False)
+    return stale
+
+
+def claim_next_job():
+    """Mark the oldest queued import as running and return it, or None."""
+    fail_stale_jobs()
+    with transaction.atomic():
+        job = (
+            UserImportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=UserImportJob.Status.QUEUED).order_by('created_at', 'id').first()
+        )
+        if job is None:
+            return None
+        job.status = UserImportJob.Status.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_next_job():
+    """Run the oldest queued import, if any, and return its job."""
+    job = claim_next_job()
+    if job is None:
+        return None
+    try:
+        with job.file.open('rb') as upload:
+            stream = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+            job.report = UserImporter(job.role).run(stream)
+        job.status = UserImportJob.Status.DONE
+    except Exception as exc:
+        logger.exception('User import job %s failed.', job.pk)
+        job.status = UserImportJob.Status.FAILED
+        job.error = str(exc)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'report', 'error', 'finished_at'])
+    # The rows now live in the users table; do not keep the passwords on disk.
+    job.file.delete(save=False)
+    return job
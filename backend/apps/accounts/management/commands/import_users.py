@@ -0,0 +1,68 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections
+
+from apps.accounts.importers import UserImporter, ROLE_CONFIG, run_next_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-create students or teachers (with their profiles) from a CSV file. '
+        'With --worker, run the imports queued through the admin API instead (start.sh runs it this way).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', nargs='?')
+        parser.add_argument('--role', choices=sorted(ROLE_CONFIG), default='student')
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--processes', type=int, default=None, help='Password hashing processes.')
+        parser.add_argument('--report', help='Write the per-row error report to this JSON file.')
+        parser.add_argument(
+            '--worker', action='store_true',
+            help='Run queued imports forever, checking every USER_IMPORT_POLL_SECONDS.',
+        )
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.work()
+            return
+        if not options['csv_path']:
+            raise CommandError('Give a CSV path, or --worker to run the queued imports.')
+
+        importer = UserImporter(
+            options['role'],
+            chunk_size=options['chunk_size'],
+            processes=options['processes'],
+        )
+        try:
+            with open(options['csv_path'], encoding='utf-8-sig', newline='') as stream:
+                report = importer.run(stream)
+        except OSError as exc:
+            raise CommandError(f'Cannot read {options["csv_path"]}: {exc}')
+
+        if options['report']:
+            with open(options['report'], 'w') as output:
+                json.dump(report['errors'], output, indent=2)
+        else:
+            for error in report['errors']:
+                self.stdout.write(self.style.WARNING(f"Row {error['row']} ({error['email']}): {error['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} {options['role']}(s); {report['failed']} row(s) failed."
+        ))
+
+    def work(self):
+        while True:
+            close_old_connections()
+            try:
+                job = run_next_job()
+            except DatabaseError as exc:
+                # Keep the worker alive through a database restart.
+                self.stderr.write(f'Import worker failed: {exc}')
+                job = None
+            if job is None:
+                time.sleep(settings.USER_IMPORT_POLL_SECONDS)
+            else:
+                self.stdout.write(f'Import job {job.pk}: {job.status}.')
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding and blacklisted refresh tokens in small batches, '
+        'each in its own transaction, so the tables are never locked for long.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='Seconds to pause between batches to let other writers in.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        cutoff = aware_utcnow()
+        expired = OutstandingToken.objects.filter(expires_at__lte=cutoff).order_by('id')
+        outstanding_deleted = blacklisted_deleted = 0
+
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                blacklisted_deleted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding_deleted += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            if len(ids) < batch_size:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Pruned {outstanding_deleted} outstanding and {blacklisted_deleted} blacklisted token(s).'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='google_photo_url',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,81 @@
+"""
+The users search index behind apps.accounts.search.IndexedSearchFilter.
+
+SQLite gets an FTS5 trigram table mirroring users.email/full_name/phone,
+kept in sync by triggers; PostgreSQL gets GIN trigram indexes. Other
+databases get nothing. A database that cannot build the index (no FTS5
+trigram tokenizer, no permission for pg_trgm) is migrated without it and
+searches fall back to icontains.
+
+SQLite drops a table's triggers when a migration rebuilds it, so a later
+migration that alters the users table must repeat these operations.
+"""
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'users_fts'
+INDEXED_COLUMNS = ('email', 'full_name', 'phone')
+
+FORWARD = {
+    'sqlite': [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            email, full_name, phone, content='users', content_rowid='id', tokenize='trigram'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON users BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, email, full_name, phone)
+            VALUES (new.id, new.email, new.full_name, new.phone);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON users BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, email, full_name, phone)
+            VALUES ('delete', old.id, old.email, old.full_name, old.phone);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF email, full_name, phone ON users BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, email, full_name, phone)
+            VALUES ('delete', old.id, old.email, old.full_name, old.phone);
+            INSERT INTO {FTS_TABLE}(rowid, email, full_name, phone)
+            VALUES (new.id, new.email, new.full_name, new.phone);
+        END""",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ],
+    'postgresql': ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+        f'CREATE INDEX IF NOT EXISTS users_{column}_trgm ON users USING gin (UPPER({column}) gin_trgm_ops)'
+        for column in INDEXED_COLUMNS
+    ],
+}
+
+REVERSE = {
+    'sqlite': [f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au')] + [
+        f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    ],
+    # pg_trgm stays installed; other schemas may use it.
+    'postgresql': [f'DROP INDEX IF EXISTS users_{column}_trgm' for column in INDEXED_COLUMNS],
+}
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        try:
+            with transaction.atomic(using=connection.alias):
+                for statement in statements.get(connection.vendor, []):
+                    schema_editor.execute(statement, params=None)
+        except DatabaseError:
+            logger.warning(
+                'Could not build the %s users search index; searches fall back to icontains.',
+                connection.vendor, exc_info=True,
+            )
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_google_photo_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sql(FORWARD), run_sql(REVERSE)),
+    ]
@@ -1,7 +1,10 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.db import models
+from django.db.models import Count, Q
 from django.utils import timezone
 
+from core.loaded_state import LoadedStateMixin
+
 
 class UserManager(BaseUserManager):
     """Custom manager for User model with email as unique identifier."""
@@ -29,12 +32,15 @@ class UserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(LoadedStateMixin, AbstractBaseUser, PermissionsMixin):
     """
     Custom User model supporting three roles: Admin, Teacher, Student.
     Uses email as the unique identifier instead of username.
     """
 
+    # Previous values for the dashboard stats deltas (apps/analytics/signals.py).
+    loaded_state_fields = ('role', 'is_active')
+
     class Role(models.TextChoices):
         ADMIN = 'admin', 'Admin'
         TEACHER = 'teacher', 'Teacher'
@@ -45,6 +51,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     phone = models.CharField(max_length=20, blank=True)
     role = models.CharField(max_length=10, choices=Role.choices, default=Role.STUDENT)
     profile_photo = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    # Remote avatar from Google sign-in; profile_photo only holds uploads.
+    google_photo_url = models.URLField(max_length=500, blank=True)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
@@ -60,6 +68,10 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-date_joined']
+        indexes = [
+            # Keyset pagination (core/pagination.py) seeks on (ordering, id).
+            models.Index(fields=['date_joined', 'id'], name='users_date_joined_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.full_name} ({self.email}) - {self.role}"
@@ -77,6 +89,23 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.role == self.Role.STUDENT
 
 
+def active_student_count(prefix=''):
+    """
+    Annotation counting a teacher's active enrollments.
+    `prefix` is the path from the queried model to the teacher User
+    (e.g. 'user__' when querying TeacherProfile).
+    """
+    return Count(
+        f'{prefix}enrollments_as_teacher',
+        filter=Q(**{f'{prefix}enrollments_as_teacher__is_active': True}),
+    )
+
+
+class TeacherProfileQuerySet(models.QuerySet):
+    def with_student_counts(self):
+        return self.annotate(active_student_count=active_student_count('user__'))
+
+
 class TeacherProfile(models.Model):
     """
     Extended profile for Teacher role.
@@ -97,6 +126,8 @@ class TeacherProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TeacherProfileQuerySet.as_manager()
+
     class Meta:
         db_table = 'teachers'
         verbose_name = 'Teacher Profile'
@@ -107,6 +138,12 @@ class TeacherProfile(models.Model):
 
     @property
     def total_students(self):
+        # List querysets annotate the count (on the profile or on the User it
+        # was selected with) so rows don't each issue their own COUNT.
+        if hasattr(self, 'active_student_count'):
+            return self.active_student_count
+        if hasattr(self.user, 'active_student_count'):
+            return self.user.active_student_count
         return self.user.enrollments_as_teacher.filter(is_active=True).count()
 
     @property
@@ -175,3 +212,41 @@ class Lead(models.Model):
 
     def __str__(self):
         return f"Inquiry from {self.full_name} ({self.phone_number})"
+
+
+class UserImportJob(models.Model):
+    """
+    A CSV uploaded through the admin import API. The upload is stored and
+    queued; `manage.py import_users --worker` (started by start.sh) runs it
+    outside the request and records the report here.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    role = models.CharField(max_length=10, choices=User.Role.choices)
+    file = models.FileField(upload_to='user_imports/')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    report = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='user_import_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'user_import_jobs'
+        verbose_name = 'User Import Job'
+        verbose_name_plural = 'User Import Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            # The worker claims the oldest queued job.
+            models.Index(fields=['status', 'created_at'], name='user_import_jobs_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Import of {self.role}s #{self.pk} ({self.status})"
@@ -1,55 +1,54 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from .authentication import load_active_user
+
+
+def has_role(user, *roles):
+    """
+    Whether the authenticated user has one of `roles`. The role on
+    request.user may come from the token (ClaimsUser), so it is confirmed
+    against the account, through the user cache: a deactivated user fails
+    with a 401 and a changed role is honoured, rather than the token being
+    trusted until it expires.
+    """
+    if not (user and user.is_authenticated and user.role in roles):
+        return False
+    return load_active_user(user.pk).role in roles
+
 
 class IsAdminUser(BasePermission):
     """Allow access only to Admin role users."""
 
     def has_permission(self, request, view):
-        return bool(
-            request.user and
-            request.user.is_authenticated and
-            request.user.role == 'admin'
-        )
+        return has_role(request.user, 'admin')
 
 
 class IsTeacherUser(BasePermission):
     """Allow access only to Teacher role users."""
 
     def has_permission(self, request, view):
-        return bool(
-            request.user and
-            request.user.is_authenticated and
-            request.user.role == 'teacher'
-        )
+        return has_role(request.user, 'teacher')
 
 
 class IsStudentUser(BasePermission):
     """Allow access only to Student role users."""
 
     def has_permission(self, request, view):
-        return bool(
-            request.user and
-            request.user.is_authenticated and
-            request.user.role == 'student'
-        )
+        return has_role(request.user, 'student')
 
 
 class IsAdminOrTeacher(BasePermission):
     """Allow access to Admin or Teacher role users."""
 
     def has_permission(self, request, view):
-        return bool(
-            request.user and
-            request.user.is_authenticated and
-            request.user.role in ('admin', 'teacher')
-        )
+        return has_role(request.user, 'admin', 'teacher')
 
 
 class IsOwnerOrAdmin(BasePermission):
     """Allow object-level access to the owner or admin."""
 
     def has_object_permission(self, request, view, obj):
-        if request.user.role == 'admin':
+        if has_role(request.user, 'admin'):
             return True
         if hasattr(obj, 'user'):
             return obj.user == request.user
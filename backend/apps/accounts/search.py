@@ -0,0 +1,159 @@
+"""
+Indexed search for the admin user and enrollment lists.
+
+DRF's SearchFilter turns `?search=` into an OR-chain of icontains lookups,
+which no B-tree index can serve. IndexedSearchFilter keeps the same
+semantics (every term must match at least one search field) but runs them
+against an index when the search fields are columns of User:
+
+* SQLite: an FTS5 table (`users_fts`, trigram tokenizer) that mirrors
+  users.email/full_name/phone and is kept in sync by triggers. The table is
+  joined once and results are ordered by its bm25 rank.
+* PostgreSQL: GIN trigram indexes on UPPER(column). These serve the
+  UPPER(col) LIKE UPPER(%term%) SQL that icontains generates. Results are
+  ranked by trigram similarity.
+
+The index is created by migration accounts/0006_user_search_index. Any
+other search, or any database without the index, falls back to
+SearchFilter unchanged.
+"""
+import logging
+import operator
+from functools import reduce
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+from rest_framework.filters import SearchFilter
+
+logger = logging.getLogger(__name__)
+
+INDEXED_COLUMNS = ('email', 'full_name', 'phone')
+FTS_TABLE = 'users_fts'
+# The trigram tokenizer cannot match terms shorter than three characters.
+MIN_FTS_TERM_LENGTH = 3
+
+_index_available = None
+
+
+def index_available():
+    """Whether the default database has the search index; checked once per process."""
+    global _index_available
+    if _index_available is None:
+        if connection.vendor == 'sqlite':
+            # Without all three triggers the table would return stale rows.
+            sql, params, expected = (
+                "SELECT COUNT(*) FROM sqlite_master WHERE (type = 'table' AND name = %s) "
+                "OR (type = 'trigger' AND name IN (%s, %s, %s))",
+                [FTS_TABLE, f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'],
+                4,
+            )
+        elif connection.vendor == 'postgresql':
+            sql, params, expected = 'SELECT COUNT(*) FROM pg_extension WHERE extname = %s', ['pg_trgm'], 1
+        else:
+            _index_available = False
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            _index_available = cursor.fetchone()[0] == expected
+        if not _index_available:
+            logger.warning('The %s users search index is missing; searches fall back to icontains.', connection.vendor)
+    return _index_available
+
+
+def fts_phrase(term):
+    return '"{}"'.format(term.replace('"', '""'))
+
+
+class IndexedSearchFilter(SearchFilter):
+    """SearchFilter that uses the users search index when it can, ranked by relevance."""
+
+    def split_user_fields(self, queryset, search_fields):
+        """
+        Return (prefix, columns) when every search field is an indexed User
+        column reached through the same relation prefix ('' or e.g. 'student__').
+        """
+        User = get_user_model()
+        prefixes, columns = set(), []
+        for field in search_fields:
+            if field[0] in self.lookup_prefixes:
+                return None
+            prefix, _, column = field.rpartition('__')
+            prefix = f'{prefix}__' if prefix else ''
+            model = queryset.model
+            for part in filter(None, prefix.split('__')):
+                model = model._meta.get_field(part).related_model
+            if model is not User or column not in INDEXED_COLUMNS:
+                return None
+            prefixes.add(prefix)
+            columns.append(column)
+        if len(prefixes) != 1:
+            return None
+        return prefixes.pop(), columns
+
+    def user_id_column(self, queryset, prefix):
+        """SQL for the User id on the base table, for one-level prefixes only."""
+        quote = connection.ops.quote_name
+        table = quote(queryset.model._meta.db_table)
+        if not prefix:
+            return f'{table}.{quote(queryset.model._meta.pk.column)}'
+        relation = prefix[:-2]
+        if '__' in relation:
+            return None
+        return f'{table}.{quote(queryset.model._meta.get_field(relation).column)}'
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        split = self.split_user_fields(queryset, search_fields)
+        if split is None or not index_available():
+            return super().filter_queryset(request, queryset, view)
+        prefix, columns = split
+
+        if connection.vendor == 'sqlite':
+            return self.filter_sqlite(queryset, search_fields, prefix, columns, search_terms)
+        queryset = super().filter_queryset(request, queryset, view)
+        return self.rank_postgres(queryset, search_fields, search_terms)
+
+    def filter_sqlite(self, queryset, search_fields, prefix, columns, search_terms):
+        indexed = [term for term in search_terms if len(term) >= MIN_FTS_TERM_LENGTH]
+        short = [term for term in search_terms if len(term) < MIN_FTS_TERM_LENGTH]
+        if short:
+            # The trigram index cannot serve these; match them with icontains.
+            lookups = [self.construct_search(field, queryset) for field in search_fields]
+            queryset = queryset.filter(*(
+                reduce(operator.or_, (Q(**{lookup: term}) for lookup in lookups)) for term in short
+            ))
+        if not indexed:
+            return queryset
+
+        match = '{%s} : (%s)' % (' '.join(columns), ' AND '.join(fts_phrase(term) for term in indexed))
+        id_column = self.user_id_column(queryset, prefix)
+        if id_column is None:
+            return queryset.filter(**{
+                f'{prefix}pk__in': RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+            })
+        # Join the FTS table once: the MATCH runs a single time and each hit
+        # is joined to its row by rowid. FTS5 rank is bm25(), where more
+        # negative means more relevant.
+        return queryset.extra(
+            select={'search_rank': f'-{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {id_column}', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).order_by('-search_rank', *queryset.query.order_by or queryset.model._meta.ordering)
+
+    def rank_postgres(self, queryset, search_fields, search_terms):
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        text = ' '.join(search_terms)
+        similarities = [TrigramSimilarity(field, text) for field in search_fields]
+        rank = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+        return queryset.annotate(search_rank=rank).order_by(
+            '-search_rank', *queryset.query.order_by or queryset.model._meta.ordering
+        )
@@ -1,7 +1,14 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
-from .models import TeacherProfile, StudentProfile, Lead
+
+from core.images import ImageVariantsField
+
+from .cache import user_cache
+from .models import TeacherProfile, StudentProfile, Lead, UserImportJob
+from .tokens import FilteredRefreshToken, rotation_detects_reuse
 
 
 class LeadSerializer(serializers.ModelSerializer):
@@ -37,6 +44,42 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that relies on rotation to detect reuse: blacklisting
+    the presented token fails to create a row if it was already blacklisted
+    (by rotation or logout on any worker), so no separate lookup is needed.
+    Also refuses to refresh for deactivated or deleted users.
+    """
+    token_class = FilteredRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        try:
+            user = user_cache.get_or_load(refresh[api_settings.USER_ID_CLAIM])
+        except (KeyError, User.DoesNotExist):
+            raise TokenError('User not found')
+        if not user.is_active:
+            raise TokenError('User is inactive')
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                _, created = refresh.blacklist()
+                if not created and rotation_detects_reuse():
+                    raise TokenError('Token is blacklisted')
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data['refresh'] = str(refresh)
+
+        return data
+
+
 class StudentProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = StudentProfile
@@ -66,15 +109,16 @@ class UserSerializer(serializers.ModelSerializer):
     """Full user serializer (for admin use)."""
     student_profile = StudentProfileSerializer(read_only=True)
     teacher_profile = TeacherProfileSerializer(read_only=True)
+    profile_photo_variants = ImageVariantsField('avatar', source='profile_photo')
 
     class Meta:
         model = User
         fields = [
             'id', 'email', 'full_name', 'phone', 'role',
-            'profile_photo', 'is_active', 'date_joined',
+            'profile_photo', 'profile_photo_variants', 'google_photo_url', 'is_active', 'date_joined',
             'student_profile', 'teacher_profile'
         ]
-        read_only_fields = ['id', 'date_joined']
+        read_only_fields = ['id', 'google_photo_url', 'date_joined']
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -168,3 +212,45 @@ class ChangePasswordSerializer(serializers.Serializer):
         if attrs['new_password'] != attrs['new_password_confirm']:
             raise serializers.ValidationError({'new_password': 'New passwords do not match.'})
         return attrs
+
+
+class UserImportRowSerializer(serializers.Serializer):
+    """One CSV row of a bulk user import. Email uniqueness is checked per chunk by the importer."""
+    email = serializers.EmailField(max_length=254)
+    full_name = serializers.CharField(max_length=150)
+    phone = serializers.CharField(max_length=20, required=False, default='')
+    password = serializers.CharField(min_length=8, required=False, default='', write_only=True)
+
+
+class StudentImportRowSerializer(UserImportRowSerializer):
+    preferred_time_slot = serializers.ChoiceField(
+        choices=StudentProfile.TimeSlot.choices,
+        required=False,
+        default=StudentProfile.TimeSlot.MORNING
+    )
+    age = serializers.IntegerField(min_value=0, required=False, default=None)
+    country = serializers.CharField(max_length=100, required=False, default='')
+    city = serializers.CharField(max_length=100, required=False, default='')
+    guardian_name = serializers.CharField(max_length=150, required=False, default='')
+    guardian_phone = serializers.CharField(max_length=20, required=False, default='')
+    notes = serializers.CharField(required=False, default='')
+
+
+class TeacherImportRowSerializer(UserImportRowSerializer):
+    bio = serializers.CharField(required=False, default='')
+    specialization = serializers.CharField(max_length=200, required=False, default='')
+    qualifications = serializers.CharField(required=False, default='')
+    experience_years = serializers.IntegerField(min_value=0, required=False, default=0)
+    zoom_personal_link = serializers.URLField(required=False, default='')
+    is_available = serializers.BooleanField(required=False, default=True)
+
+
+class UserImportRequestSerializer(serializers.Serializer):
+    role = serializers.ChoiceField(choices=[User.Role.STUDENT, User.Role.TEACHER])
+    file = serializers.FileField()
+
+
+class UserImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserImportJob
+        fields = ['id', 'role', 'status', 'report', 'error', 'created_at', 'started_at', 'finished_at']
@@ -0,0 +1,301 @@
+import datetime
+import tempfile
+from unittest import mock, skipUnless
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, Enrollment
+from core.response_cache import model_versions
+
+from .cache import user_cache
+from .hashers import PasswordHashingBusy, hashing_executor
+from .importers import UserImporter, run_next_job
+from .models import StudentProfile, TeacherProfile, User, UserImportJob
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.student = User.objects.create_user('student@example.com', 'password123', full_name='Student')
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/auth/login/', {'email': 'student@example.com', 'password': 'password123'}, format='json',
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        user_cache.clear()
+
+    def test_valid_token_is_accepted(self):
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 200)
+        self.assertEqual(self.client.get('/api/courses/my-enrollments/').status_code, 200)
+
+    def test_deleted_user_is_rejected(self):
+        self.student.delete()
+        user_cache.clear()
+        for url in ('/api/auth/me/', '/api/courses/my-enrollments/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 401, url)
+            self.assertEqual(response.data['code'], 'user_not_found')
+
+    def test_role_permission_rechecks_the_account(self):
+        User.objects.create_user('admin@example.com', 'password123', full_name='Admin', role='admin')
+        response = self.client.post(
+            '/api/auth/login/', {'email': 'admin@example.com', 'password': 'password123'}, format='json',
+        )
+        admin = APIClient()
+        admin.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        user_cache.clear()
+        self.assertEqual(admin.get('/api/auth/admin/users/').status_code, 200)
+        # Deactivated by another worker: the token still says admin.
+        User.objects.filter(email='admin@example.com').update(is_active=False)
+        user_cache.clear()
+        response = admin.get('/api/auth/admin/users/')
+        self.assertEqual((response.status_code, response.data['code']), (401, 'user_inactive'))
+        User.objects.filter(email='admin@example.com').update(is_active=True, role='teacher')
+        user_cache.clear()
+        self.assertEqual(admin.get('/api/auth/admin/users/').status_code, 403)
+
+    def test_inactive_user_is_rejected(self):
+        # update() skips the signal that would drop the cached row, like a
+        # write made by another worker.
+        User.objects.filter(pk=self.student.pk).update(is_active=False)
+        for url in ('/api/auth/me/', '/api/courses/my-enrollments/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 401, url)
+            self.assertEqual(response.data['code'], 'user_inactive')
+
+
+class TeacherStudentCountQueryTests(TestCase):
+    """Teacher lists annotate total_students instead of counting per row."""
+
+    def setUp(self):
+        user_cache.clear()
+        cache.clear()
+        self.course = Course.objects.create(title='Quran', description='Reading', max_students=100)
+        self.teacher_count = 0
+        User.objects.create_superuser('admin@example.com', 'password123', full_name='Admin')
+        self.admin = APIClient()
+        response = self.admin.post(
+            '/api/auth/login/', {'email': 'admin@example.com', 'password': 'password123'}, format='json',
+        )
+        self.admin.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def add_teachers(self, count):
+        for _ in range(count):
+            self.teacher_count += 1
+            number = self.teacher_count
+            teacher = User.objects.create_user(
+                f'teacher{number}@example.com', None, full_name=f'Teacher {number}', role='teacher',
+            )
+            TeacherProfile.objects.get_or_create(user=teacher)
+            for index in range(2):
+                student = User.objects.create_user(
+                    f'student{number}-{index}@example.com', None, full_name='Student',
+                )
+                Enrollment.objects.create(student=student, course=self.course, teacher=teacher)
+
+    def count_queries(self, client, url):
+        # Warm the user cache, which the role permission reads on a miss.
+        client.get(url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def listed_ids(self, url, **params):
+        response = self.admin.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_queryset_counts_in_one_query(self):
+        self.add_teachers(3)
+        with self.assertNumQueries(1):
+            totals = [profile.total_students for profile in TeacherProfile.objects.with_student_counts()]
+        self.assertEqual(totals, [2, 2, 2])
+
+    def test_list_queries_do_not_grow_with_teachers(self):
+        for client, url in ((APIClient(), '/api/auth/teachers/'), (self.admin, '/api/auth/admin/teachers/')):
+            with self.subTest(url=url):
+                self.add_teachers(2)
+                few = self.count_queries(client, url)
+                self.add_teachers(4)
+                self.assertEqual(self.count_queries(client, url), few)
+
+    def test_admin_lists_are_ordered_newest_first(self):
+        self.add_teachers(8)
+        # Same date_joined for all: the id breaks the tie, so pages never overlap.
+        User.objects.update(date_joined=timezone.now())
+        newest_first = list(User.objects.order_by('-date_joined', '-id').values_list('id', flat=True))
+        teachers = [pk for pk in newest_first if User.objects.get(pk=pk).role == 'teacher']
+        self.assertEqual(self.listed_ids('/api/auth/admin/teachers/'), teachers)
+
+        pages = self.listed_ids('/api/auth/admin/users/') + self.listed_ids('/api/auth/admin/users/', page=2)
+        self.assertEqual(len(newest_first), 25)
+        self.assertEqual(pages, newest_first)
+
+    def test_admin_user_list_queries_at_full_page_size(self):
+        self.add_teachers(1)
+        few = self.count_queries(self.admin, '/api/auth/admin/users/')
+        self.add_teachers(7)
+        self.assertEqual(User.objects.count(), 25)
+        self.assertEqual(self.count_queries(self.admin, '/api/auth/admin/users/'), few)
+
+
+class PasswordHashingBusyTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        User.objects.create_user('student@example.com', 'password123', full_name='Student')
+        self.busy = mock.patch.object(hashing_executor, 'run', side_effect=PasswordHashingBusy(wait=7))
+
+    def test_api_answers_503_with_retry_after(self):
+        with self.busy:
+            response = APIClient().post(
+                '/api/auth/login/', {'email': 'student@example.com', 'password': 'password123'}, format='json',
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertEqual(response.data['detail'].code, 'password_hashing_busy')
+
+    def test_hasher_raises_a_plain_exception(self):
+        with self.busy, self.assertRaises(PasswordHashingBusy) as raised:
+            make_password('password123')
+        self.assertNotIsInstance(raised.exception, APIException)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), USER_IMPORT_PROCESSES=1)
+class UserImportTests(TestCase):
+    CSV = (
+        'email,full_name,password\n'
+        'one@example.com,One,password123\n'
+        'two@example.com,Two,\n'
+        'taken@example.com,Taken,password123\n'
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('admin@example.com', None, full_name='Admin', role='admin')
+        User.objects.create_user('taken@example.com', None, full_name='Taken')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_api_queues_the_import_for_the_worker(self):
+        upload = SimpleUploadedFile('students.csv', self.CSV.encode(), content_type='text/csv')
+        response = self.client.post('/api/auth/admin/users/import/', {'role': 'student', 'file': upload})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertFalse(User.objects.filter(email='one@example.com').exists())
+
+        job = run_next_job()
+        self.assertEqual(job.pk, response.data['id'])
+        self.assertIsNone(run_next_job())
+
+        response = self.client.get(f"/api/auth/admin/users/import/{job.pk}/")
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['report']['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['report']['errors']], [3])
+        self.assertEqual(StudentProfile.objects.filter(user__email__in=['one@example.com', 'two@example.com']).count(), 2)
+        stored = UserImportJob.objects.get(pk=job.pk).file
+        self.assertFalse(stored.storage.exists(stored.name))
+
+    def test_jobs_left_running_by_a_dead_worker_are_failed(self):
+        jobs = [
+            UserImportJob.objects.create(
+                role='student', created_by=self.admin, status=UserImportJob.Status.RUNNING,
+                started_at=timezone.now() - datetime.timedelta(minutes=minutes),
+                file=SimpleUploadedFile('students.csv', self.CSV.encode()),
+            )
+            for minutes in (90, 10)
+        ]
+        self.assertIsNone(run_next_job())
+        stale, running = (UserImportJob.objects.get(pk=job.pk) for job in jobs)
+        self.assertEqual((stale.status, running.status), ('failed', 'running'))
+        self.assertIn('stopped before finishing', stale.error)
+        self.assertIsNotNone(stale.finished_at)
+        self.assertFalse(jobs[0].file.storage.exists(jobs[0].file.name))
+        running.file.delete(save=False)
+
+    def test_row_by_row_fallback_bumps_the_list_versions(self):
+        importer = UserImporter(User.Role.STUDENT)
+        valid = [
+            (1, {'email': 'new@example.com', 'full_name': 'New', 'phone': ''}),
+            (2, {'email': 'taken@example.com', 'full_name': 'Taken', 'phone': ''}),
+        ]
+        before = model_versions([User._meta.label_lower, StudentProfile._meta.label_lower])
+        with self.captureOnCommitCallbacks(execute=True):
+            importer._write(valid, [mock.Mock(result=lambda: ['!', '!'])])
+        self.assertEqual(importer.report.created, 1)
+        self.assertEqual(importer.report.as_dict()['failed'], 1)
+        after = model_versions([User._meta.label_lower, StudentProfile._meta.label_lower])
+        self.assertTrue(all(new > old for new, old in zip(after, before)))
+
+
+class GoogleLoginPhotoTests(TestCase):
+    PICTURE = 'https://lh3.googleusercontent.com/a/' + 'x' * 200 + '=s96-c'
+
+    def setUp(self):
+        user_cache.clear()
+
+    def sign_in(self, picture):
+        claims = {'email': 'student@example.com', 'name': 'Student', 'picture': picture}
+        with mock.patch('apps.accounts.firebase.verify_id_token', return_value=claims):
+            return APIClient().post('/api/auth/google/', {'id_token': 'token'}, format='json')
+
+    def test_picture_is_kept_out_of_the_image_field(self):
+        response = self.sign_in(self.PICTURE)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['profile_photo'], self.PICTURE)
+        user = User.objects.get(email='student@example.com')
+        self.assertFalse(user.profile_photo)
+        self.assertEqual(user.google_photo_url, self.PICTURE)
+
+        self.sign_in(self.PICTURE + '-new')
+        user.refresh_from_db()
+        self.assertFalse(user.profile_photo)
+        self.assertEqual(user.google_photo_url, self.PICTURE + '-new')
+
+
+class IndexedSearchTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        cache.clear()
+        self.admin = User.objects.create_user('admin@example.com', None, full_name='Admin', role='admin')
+        for email, name in [
+            ('amina@example.com', 'Amina Yusuf'),
+            ('yusuf@example.com', 'Yusuf Amin'),
+            ('omar@example.com', 'Omar Farooq'),
+        ]:
+            User.objects.create_user(email, None, full_name=name)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def search(self, term):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/auth/admin/users/', {'search': term})
+        self.assertEqual(response.status_code, 200)
+        return [row['email'] for row in response.data['results']], queries
+
+    def test_matches_every_term_and_follows_edits(self):
+        emails, _ = self.search('yusuf')
+        self.assertCountEqual(emails, ['amina@example.com', 'yusuf@example.com'])
+        self.assertEqual(self.search('yusuf amina')[0], ['amina@example.com'])
+
+        User.objects.filter(email='omar@example.com').update(full_name='Omar Yusuf')
+        self.assertIn('omar@example.com', self.search('yusuf')[0])
+        User.objects.filter(email='omar@example.com').delete()
+        self.assertNotIn('omar@example.com', self.search('yusuf')[0])
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite FTS5 index')
+    def test_fts_table_is_matched_once_per_query(self):
+        _, queries = self.search('yusuf')
+        listing = [query['sql'] for query in queries if 'MATCH' in query['sql']]
+        self.assertTrue(listing)
+        for sql in listing:
+            self.assertEqual(sql.count('MATCH'), 1, sql)
@@ -0,0 +1,90 @@
+"""
+Refresh tokens with an in-memory pre-check in front of the blacklist table.
+
+Every refresh used to run a blacklist lookup before rotating. With
+ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION enabled, the rotation
+itself already tells us whether the token was blacklisted (blacklist()
+reports whether it created the row), so the separate lookup is only
+needed for JTIs this worker has recently blacklisted. A Bloom filter of
+those JTIs answers "definitely not blacklisted here" without touching
+the database; a filter hit is confirmed against the table.
+"""
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RecentBlacklist:
+    """
+    Per-process set of recently blacklisted JTIs. It only speeds up
+    rejection, so when it fills up it is simply started afresh.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(capacity, error_rate)
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter.count >= self.capacity:
+                self._filter = BloomFilter(self.capacity, self.error_rate)
+            self._filter.add(jti)
+
+    def might_contain(self, jti):
+        return jti in self._filter
+
+
+recent_blacklist = RecentBlacklist(
+    capacity=settings.TOKEN_BLACKLIST_FILTER_CAPACITY,
+    error_rate=settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE,
+)
+
+
+def rotation_detects_reuse():
+    return api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken that skips the blacklist query when reuse is caught by rotation."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if rotation_detects_reuse() and not recent_blacklist.might_contain(jti):
+            return
+        super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        recent_blacklist.add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -21,13 +21,17 @@ urlpatterns = [
 
     # Student-specific
     path('student/profile/', views.StudentProfileView.as_view(), name='student-profile'),
+    path('student/home/', views.StudentHomeView.as_view(), name='student-home'),
 
     # Admin-only endpoints
     path('admin/users/', views.AdminUserListView.as_view(), name='admin-users'),
+    path('admin/users/import/', views.AdminUserImportView.as_view(), name='admin-user-import'),
+    path('admin/users/import/<int:pk>/', views.AdminUserImportJobView.as_view(), name='admin-user-import-job'),
     path('admin/users/<int:pk>/', views.AdminUserDetailView.as_view(), name='admin-user-detail'),
     path('admin/users/<int:pk>/toggle-active/', views.AdminUserToggleActiveView.as_view(), name='admin-user-toggle'),
     path('admin/teachers/create/', views.AdminCreateTeacherView.as_view(), name='admin-create-teacher'),
     path('admin/students/', views.AdminStudentListView.as_view(), name='admin-students'),
     path('admin/teachers/', views.AdminTeacherListView.as_view(), name='admin-teachers'),
     path('admin/dashboard-stats/', views.DashboardStatsView.as_view(), name='admin-dashboard-stats'),
+    path('admin/hashing-metrics/', views.PasswordHashingMetricsView.as_view(), name='admin-hashing-metrics'),
 ]
@@ -1,13 +1,19 @@
 from rest_framework import generics, status, permissions
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
 
-from .models import TeacherProfile, StudentProfile
+from core.pagination import OptionalCursorPagination
+from core.response_cache import VersionedCacheMixin
+from core.sparse_fields import SparseFieldsetMixin
+
+from .models import TeacherProfile, StudentProfile, UserImportJob, active_student_count
+from .search import IndexedSearchFilter
 from .serializers import (
     CustomTokenObtainPairSerializer,
     RegisterSerializer,
@@ -18,8 +24,11 @@ from .serializers import (
     StudentProfileSerializer,
     ChangePasswordSerializer,
     LeadSerializer,
+    UserImportRequestSerializer,
+    UserImportJobSerializer,
 )
 from .permissions import IsAdminUser, IsTeacherUser, IsStudentUser, IsAdminOrTeacher
+from .tokens import FilteredRefreshToken
 
 User = get_user_model()
 
@@ -76,14 +85,14 @@ class LogoutView(APIView):
                     {'error': 'Refresh token is required.'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
             return Response({'message': 'Logged out successfully.'}, status=status.HTTP_200_OK)
         except Exception:
             return Response({'error': 'Invalid token.'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class MeView(generics.RetrieveUpdateAPIView):
+class MeView(SparseFieldsetMixin, generics.RetrieveUpdateAPIView):
     """
     GET  /api/auth/me/   → Return current user profile
     PATCH /api/auth/me/  → Update current user profile
@@ -123,19 +132,21 @@ class ChangePasswordView(APIView):
 
 # ─────────────────────────── ADMIN VIEWS ────────────────────────────────── #
 
-class AdminUserListView(generics.ListAPIView):
+class AdminUserListView(SparseFieldsetMixin, generics.ListAPIView):
     """
     GET /api/auth/admin/users/
     Lists all users (admin only).
     """
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    pagination_class = OptionalCursorPagination
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
     filterset_fields = ['role', 'is_active']
     search_fields = ['email', 'full_name', 'phone']
+    # The Count makes this a GROUP BY query, which drops Meta.ordering.
     queryset = User.objects.all().select_related(
         'student_profile', 'teacher_profile'
-    )
+    ).annotate(active_student_count=active_student_count()).order_by('-date_joined', '-id')
 
 
 class AdminCreateTeacherView(generics.CreateAPIView):
@@ -159,7 +170,38 @@ class AdminCreateTeacherView(generics.CreateAPIView):
         )
 
 
-class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AdminUserImportView(APIView):
+    """
+    POST /api/auth/admin/users/import/
+    Admin bulk-creates students or teachers from an uploaded CSV
+    (multipart: `role`, `file`). The import is queued for the import
+    worker; returns 202 with the job to poll for the per-row error report.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        serializer = UserImportRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = UserImportJob.objects.create(
+            role=serializer.validated_data['role'],
+            file=serializer.validated_data['file'],
+            created_by=request.user,
+        )
+        return Response(UserImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class AdminUserImportJobView(generics.RetrieveAPIView):
+    """
+    GET /api/auth/admin/users/import/<id>/
+    Admin polls a queued import for its status and per-row error report.
+    """
+    serializer_class = UserImportJobSerializer
+    permission_classes = [IsAdminUser]
+    queryset = UserImportJob.objects.all()
+
+
+class AdminUserDetailView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     GET/PATCH/DELETE /api/auth/admin/users/<id>/
     Admin manages any user.
@@ -181,6 +223,16 @@ class AdminUserToggleActiveView(APIView):
             user = User.objects.get(pk=pk)
             user.is_active = not user.is_active
             user.save()
+            if not user.is_active:
+                # Access tokens are validated from their claims, so stop the
+                # session from being refreshed past the current token.
+                outstanding = OutstandingToken.objects.filter(
+                    user=user, blacklistedtoken__isnull=True
+                )
+                BlacklistedToken.objects.bulk_create(
+                    [BlacklistedToken(token=token) for token in outstanding],
+                    ignore_conflicts=True,
+                )
             return Response({
                 'message': f"User {'activated' if user.is_active else 'deactivated'} successfully.",
                 'is_active': user.is_active
@@ -203,14 +255,17 @@ class TeacherProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user.teacher_profile
 
 
-class TeacherListView(generics.ListAPIView):
+class TeacherListView(VersionedCacheMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
     GET /api/auth/teachers/
-    Public list of available teachers.
+    Public list of available teachers, served from the versioned response cache.
     """
     serializer_class = TeacherProfileSerializer
     permission_classes = [permissions.AllowAny]
-    queryset = TeacherProfile.objects.filter(is_available=True).select_related('user')
+    cache_models = ['accounts.TeacherProfile', 'accounts.User', 'courses.Enrollment']
+    queryset = TeacherProfile.objects.filter(
+        is_available=True
+    ).select_related('user').with_student_counts().order_by('id')
 
 
 # ─────────────────────────── STUDENT VIEWS ───────────────────────────────── #
@@ -227,27 +282,49 @@ class StudentProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user.student_profile
 
 
-class AdminStudentListView(generics.ListAPIView):
+class StudentHomeView(APIView):
+    """
+    GET /api/auth/student/home/
+    Student dashboard in one round trip: subscription, enrollments,
+    weekly schedule, meetings and recent payments, each capped per section.
+    """
+    permission_classes = [IsStudentUser]
+
+    def get(self, request):
+        from .home import student_home
+
+        return Response(student_home(request.user.pk, self.get_serializer_context()))
+
+    def get_serializer_context(self):
+        return {'request': self.request, 'format': self.format_kwarg, 'view': self}
+
+
+class AdminStudentListView(SparseFieldsetMixin, generics.ListAPIView):
     """
     GET /api/auth/admin/students/
     Admin views all student profiles.
     """
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
-    queryset = User.objects.filter(role='student').select_related('student_profile')
-    filter_backends = [SearchFilter]
+    queryset = User.objects.filter(role='student').select_related(
+        'student_profile', 'teacher_profile'
+    )
+    filter_backends = [IndexedSearchFilter]
     search_fields = ['email', 'full_name']
 
 
-class AdminTeacherListView(generics.ListAPIView):
+class AdminTeacherListView(SparseFieldsetMixin, generics.ListAPIView):
     """
     GET /api/auth/admin/teachers/
     Admin views all teacher profiles.
     """
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
-    queryset = User.objects.filter(role='teacher').select_related('teacher_profile')
-    filter_backends = [SearchFilter]
+    # The Count makes this a GROUP BY query, which drops Meta.ordering.
+    queryset = User.objects.filter(role='teacher').select_related(
+        'student_profile', 'teacher_profile'
+    ).annotate(active_student_count=active_student_count()).order_by('-date_joined', '-id')
+    filter_backends = [IndexedSearchFilter]
     search_fields = ['email', 'full_name']
 
 
@@ -259,28 +336,38 @@ class DashboardStatsView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        from apps.payments.models import Subscription, Payment
-        from django.db.models import Sum
+        from apps.analytics.models import StatsSnapshot
         from django.conf import settings
 
-        total_students = User.objects.filter(role='student', is_active=True).count()
-        total_teachers = User.objects.filter(role='teacher', is_active=True).count()
-        active_subscriptions = Subscription.objects.filter(status='active').count()
-        total_revenue = Payment.objects.filter(
-            status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        stats = StatsSnapshot.load()
+        total_students = stats.total_students
         platform_profit = total_students * settings.PLATFORM_PROFIT_PER_STUDENT
 
         return Response({
             'total_students': total_students,
-            'total_teachers': total_teachers,
-            'active_subscriptions': active_subscriptions,
-            'total_revenue': float(total_revenue),
+            'total_teachers': stats.total_teachers,
+            'active_subscriptions': stats.active_subscriptions,
+            'total_revenue': float(stats.total_revenue),
             'platform_profit_mtd': float(platform_profit),
             'teacher_payouts_mtd': float(total_students * settings.TEACHER_EARNING_PER_STUDENT),
+            'stats_updated_at': stats.updated_at,
+            'stats_verified_at': stats.verified_at,
+            'stats_age_seconds': stats.age_seconds,
         })
 
 
+class PasswordHashingMetricsView(APIView):
+    """
+    GET /api/auth/admin/hashing-metrics/
+    Queue depth and timing of this worker's password-hashing executor.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        from .hashers import hashing_executor
+        return Response(hashing_executor.metrics())
+
+
 class LeadCreateView(generics.CreateAPIView):
     """
     POST /api/auth/inquiry/
@@ -302,38 +389,57 @@ class LeadCreateView(generics.CreateAPIView):
 class GoogleLoginView(APIView):
     """
     POST /api/auth/google/
-    Accepts Firebase user info, creates or updates user, and returns JWT.
+    Accepts a Firebase ID token, verifies it locally, creates the student
+    account on first sign-in, and returns JWT.
     """
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        email = request.data.get('email')
-        full_name = request.data.get('full_name', '')
-        profile_photo = request.data.get('profile_photo', '')
-
-        if not email:
-            return Response({'error': 'Email is required.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Create or Get user
-        user, created = User.objects.get_or_create(
-            email=email,
-            defaults={
-                'full_name': full_name,
-                'role': User.Role.STUDENT
-            }
-        )
+        from django.db import IntegrityError, transaction
+        from .firebase import verify_id_token, FirebaseTokenError, KeySetUnavailable
 
-        # If user exists but photo is missing, update it
-        if not created and profile_photo and not user.profile_photo:
-            user.profile_photo = profile_photo
-            user.save()
+        id_token = request.data.get('id_token')
+        if not id_token:
+            return Response({'error': 'id_token is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Generate tokens
-        refresh = RefreshToken.for_user(user)
-        # Add custom claims
-        refresh['email'] = user.email
-        refresh['full_name'] = user.full_name
-        refresh['role'] = user.role
+        try:
+            claims = verify_id_token(id_token)
+        except KeySetUnavailable:
+            return Response(
+                {'error': 'Google sign-in is starting up. Please try again shortly.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '5'}
+            )
+        except FirebaseTokenError:
+            return Response({'error': 'Invalid Google credentials.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        email = User.objects.normalize_email(claims['email'])
+        picture = claims.get('picture', '')
+        if len(picture) > User._meta.get_field('google_photo_url').max_length:
+            picture = ''
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            try:
+                with transaction.atomic():
+                    user = User.objects.create(
+                        email=email,
+                        full_name=claims.get('name') or email.split('@')[0],
+                        role=User.Role.STUDENT,
+                        google_photo_url=picture,
+                        password=make_password(None),
+                    )
+                    StudentProfile.objects.create(user=user)
+            except IntegrityError:
+                # A concurrent sign-in created the account first.
+                user = User.objects.get(email=email)
+        elif picture and picture != user.google_photo_url:
+            user.google_photo_url = picture
+            user.save(update_fields=['google_photo_url', 'updated_at'])
+
+        if not user.is_active:
+            return Response({'error': 'This account has been deactivated.'}, status=status.HTTP_403_FORBIDDEN)
+
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
 
         return Response({
             'access': str(refresh.access_token),
@@ -343,6 +449,6 @@ class GoogleLoginView(APIView):
                 'email': user.email,
                 'full_name': user.full_name,
                 'role': user.role,
-                'profile_photo': user.profile_photo
+                'profile_photo': user.profile_photo.name if user.profile_photo else user.google_photo_url or None
             }
         })
@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import StatsSnapshot, MonthlyRevenue
+
+
+@admin.register(StatsSnapshot)
+class StatsSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['total_students', 'total_teachers', 'active_subscriptions', 'total_revenue', 'updated_at', 'verified_at']
+    readonly_fields = ['updated_at', 'verified_at']
+
+
+@admin.register(MonthlyRevenue)
+class MonthlyRevenueAdmin(admin.ModelAdmin):
+    list_display = ['month', 'total', 'payments']
+    ordering = ['-month']
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.analytics.seeding import Rollback, seed_hot_tables
+from apps.courses.models import Enrollment
+from apps.courses.serializers import EnrollmentAdminSerializer
+from apps.payments.models import Payment
+from apps.payments.serializers import PaymentSerializer
+from apps.schedules.models import Schedule
+from apps.schedules.serializers import ScheduleSerializer
+from apps.zoom_meetings.models import ZoomMeeting
+from apps.zoom_meetings.serializers import ZoomMeetingSerializer
+from core.values_serializers import ValuesSerializer
+
+
+def list_querysets(rows):
+    """The admin list querysets, as the views build them, cut to `rows` rows."""
+    return [
+        (EnrollmentAdminSerializer, Enrollment.objects.select_related('student', 'course', 'teacher')[:rows]),
+        (ScheduleSerializer, Schedule.objects.select_related('teacher', 'student', 'enrollment')[:rows]),
+        (PaymentSerializer, Payment.objects.select_related('student', 'subscription')[:rows]),
+        (ZoomMeetingSerializer, ZoomMeeting.objects.select_related('teacher', 'student')[:rows]),
+    ]
+
+
+def best_of(repeat, render):
+    timings, body = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render()
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare rows/sec of the ModelSerializer and the .values() fast path for the '
+        'high-volume list endpoints, and fail if their JSON differs by a single byte. '
+        'Seed rows are written in a transaction that is always rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Rows per list (default 10000).')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per serializer; the best is reported.')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        renderer = JSONRenderer()
+        mismatches = []
+        try:
+            with transaction.atomic():
+                seed_hot_tables(rows, max(1, rows // 50))
+                for serializer_class, queryset in list_querysets(rows):
+                    values_serializer = ValuesSerializer.for_serializer(serializer_class)
+                    slow, expected = best_of(repeat, lambda: renderer.render(
+                        serializer_class(list(queryset.all()), many=True).data
+                    ))
+                    fast, actual = best_of(repeat, lambda: renderer.render(
+                        values_serializer.to_representation(values_serializer.values(queryset.all()))
+                    ))
+                    if actual != expected:
+                        mismatches.append(serializer_class.__name__)
+                    count = queryset.count()
+                    self.stdout.write(
+                        f'{serializer_class.__name__:<28} {count} rows  '
+                        f'serializer {count / slow:>9,.0f} rows/s  '
+                        f'values {count / fast:>9,.0f} rows/s  '
+                        f'x{slow / fast:.1f}'
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+
+        if mismatches:
+            raise CommandError('Fast path output differs for: ' + ', '.join(mismatches))
+        self.stdout.write(self.style.SUCCESS('Fast path output is byte-identical.'))
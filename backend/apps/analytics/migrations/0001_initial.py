@@ -0,0 +1,49 @@
+# Generated by Django 5.0.3 on 2026-10-18 07:36
+
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('payments', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Monthly Revenue',
+                'verbose_name_plural': 'Monthly Revenue',
+                'db_table': 'stats_monthly_revenue',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_students', models.PositiveIntegerField(default=0)),
+                ('total_teachers', models.PositiveIntegerField(default=0)),
+                ('active_subscriptions', models.PositiveIntegerField(default=0)),
+                ('completed_payments', models.PositiveIntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('verified_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Stats Snapshot',
+                'verbose_name_plural': 'Stats Snapshot',
+                'db_table': 'stats_snapshot',
+            },
+        ),
+    ]
@@ -0,0 +1,146 @@
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Count, Sum, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+class StatsSnapshot(models.Model):
+    """
+    Single-row table holding the platform totals shown on the admin dashboard.
+    Kept current by the delta signals in signals.py and verified against the
+    source tables by `manage.py recompute_stats`, which start.sh runs at boot
+    and then every STATS_RECOMPUTE_INTERVAL_SECONDS.
+    """
+    SINGLETON_ID = 1
+
+    total_students = models.PositiveIntegerField(default=0)
+    total_teachers = models.PositiveIntegerField(default=0)
+    active_subscriptions = models.PositiveIntegerField(default=0)
+    completed_payments = models.PositiveIntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    updated_at = models.DateTimeField(default=timezone.now)
+    verified_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'stats_snapshot'
+        verbose_name = 'Stats Snapshot'
+        verbose_name_plural = 'Stats Snapshot'
+
+    def __str__(self):
+        return f"Stats as of {self.updated_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def age_seconds(self):
+        """Seconds since the snapshot was last verified by a full recompute."""
+        return int((timezone.now() - self.verified_at).total_seconds())
+
+    @classmethod
+    def load(cls):
+        """Return the snapshot, building it from the source tables on first use."""
+        snapshot = cls.objects.filter(pk=cls.SINGLETON_ID).first()
+        if snapshot is None:
+            snapshot, _ = cls.recompute()
+        return snapshot
+
+    @classmethod
+    def apply_delta(cls, **deltas):
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+        cls.objects.filter(pk=cls.SINGLETON_ID).update(
+            updated_at=timezone.now(),
+            **{field: F(field) + value for field, value in deltas.items()}
+        )
+
+    @staticmethod
+    def source_querysets():
+        """The payments and subscriptions querysets that recompute() reads."""
+        from apps.payments.models import Subscription, Payment
+
+        completed = Payment.objects.filter(status=Payment.Status.COMPLETED)
+        return {
+            'completed_payments': completed,
+            'monthly_revenue': (
+                completed
+                .annotate(month=TruncMonth('payment_date', output_field=models.DateField()))
+                .values('month')
+                .annotate(total=Sum('amount'), count=Count('id'))
+            ),
+            'active_subscriptions': Subscription.objects.filter(status=Subscription.Status.ACTIVE),
+        }
+
+    @classmethod
+    def recompute(cls):
+        """
+        Rebuild the snapshot and the monthly revenue rows from scratch.
+        Returns (snapshot, drift) where drift maps each field that disagreed
+        with the stored value to its (stored, actual) pair.
+        """
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+
+        with transaction.atomic():
+            # Lock the row before reading the source tables. A delta from a
+            # write still in flight then waits for this transaction and lands
+            # on top of the new totals instead of being overwritten by them.
+            previous = cls.objects.select_for_update().filter(pk=cls.SINGLETON_ID).first()
+            role_counts = dict(
+                User.objects.filter(is_active=True)
+                .values('role')
+                .annotate(total=Count('id'))
+                .values_list('role', 'total')
+            )
+            sources = cls.source_querysets()
+            revenue = sources['completed_payments'].aggregate(total=Sum('amount'), count=Count('id'))
+            monthly = sources['monthly_revenue']
+            actual = {
+                'total_students': role_counts.get(User.Role.STUDENT, 0),
+                'total_teachers': role_counts.get(User.Role.TEACHER, 0),
+                'active_subscriptions': sources['active_subscriptions'].count(),
+                'completed_payments': revenue['count'],
+                'total_revenue': revenue['total'] or Decimal('0'),
+            }
+            drift = {}
+            if previous is not None:
+                drift = {
+                    field: (getattr(previous, field), value)
+                    for field, value in actual.items()
+                    if getattr(previous, field) != value
+                }
+            now = timezone.now()
+            snapshot, _ = cls.objects.update_or_create(
+                pk=cls.SINGLETON_ID,
+                defaults={**actual, 'updated_at': now, 'verified_at': now},
+            )
+            MonthlyRevenue.objects.all().delete()
+            MonthlyRevenue.objects.bulk_create([
+                MonthlyRevenue(month=row['month'], total=row['total'], payments=row['count'])
+                for row in monthly
+            ])
+        return snapshot, drift
+
+
+class MonthlyRevenue(models.Model):
+    """Completed-payment totals per calendar month, maintained alongside StatsSnapshot."""
+    month = models.DateField(unique=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    payments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'stats_monthly_revenue'
+        verbose_name = 'Monthly Revenue'
+        verbose_name_plural = 'Monthly Revenue'
+        ordering = ['-month']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: ₹{self.total}"
+
+    @classmethod
+    def apply_delta(cls, month, total, payments):
+        cls.objects.get_or_create(month=month)
+        cls.objects.filter(month=month).update(
+            total=F('total') + total,
+            payments=F('payments') + payments,
+        )
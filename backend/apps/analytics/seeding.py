@@ -0,0 +1,86 @@
+"""
+Throwaway data at realistic table sizes, for the query-plan tests and the
+serializer throughput command.
+"""
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.courses.models import Course, Enrollment
+from apps.payments.models import Payment, Subscription
+from apps.schedules.models import Schedule
+from apps.zoom_meetings.models import ZoomMeeting
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    """Raised inside transaction.atomic() to discard the seeded rows."""
+
+
+def seed_hot_tables(student_count, teacher_count):
+    """
+    Bulk-insert students and teachers, each student with an enrollment,
+    schedule, Zoom meeting, subscription and three monthly payments.
+    Returns (students, teachers). Callers run it against the test database or
+    roll the transaction back.
+    """
+    now = timezone.now()
+    teachers = User.objects.bulk_create([
+        User(email=f'seed-teacher-{i}@example.invalid', full_name=f'Teacher {i}', role='teacher', password='!')
+        for i in range(teacher_count)
+    ])
+    students = User.objects.bulk_create([
+        User(email=f'seed-student-{i}@example.invalid', full_name=f'Student {i}', role='student', password='!')
+        for i in range(student_count)
+    ])
+    courses = Course.objects.bulk_create([
+        Course(title=f'Course {i}', description='Seeded throwaway data') for i in range(10)
+    ])
+    enrollments = Enrollment.objects.bulk_create([
+        Enrollment(
+            student=student, course=courses[i % len(courses)], teacher=teachers[i % teacher_count],
+            is_active=i % 5 != 0,
+        )
+        for i, student in enumerate(students)
+    ])
+    # Each teacher's classes get distinct (day, hour) slots, so the seed never
+    # trips the PostgreSQL no-overlap constraints (up to 7 * 16 per teacher).
+    Schedule.objects.bulk_create([
+        Schedule(
+            enrollment=enrollment, student_id=enrollment.student_id, teacher_id=enrollment.teacher_id,
+            day_of_week=(i // teacher_count) % 7, time_slot=Schedule.TimeSlot.EVENING,
+            start_time=datetime.time(6 + (i // teacher_count // 7) % 16),
+            end_time=datetime.time(7 + (i // teacher_count // 7) % 16),
+            is_active=enrollment.is_active,
+        )
+        for i, enrollment in enumerate(enrollments)
+    ])
+    ZoomMeeting.objects.bulk_create([
+        ZoomMeeting(
+            enrollment=enrollment, student_id=enrollment.student_id, teacher_id=enrollment.teacher_id,
+            title='Seeded class', zoom_link='https://zoom.us/j/0',
+            scheduled_at=now + datetime.timedelta(days=i % 30), is_active=enrollment.is_active,
+        )
+        for i, enrollment in enumerate(enrollments)
+    ])
+    subscriptions = Subscription.objects.bulk_create([
+        Subscription(
+            student=student, start_date=now.date(), end_date=now.date() + datetime.timedelta(days=30),
+            status=Subscription.Status.EXPIRED if i % 4 else Subscription.Status.ACTIVE,
+        )
+        for i, student in enumerate(students)
+    ])
+    statuses = list(Payment.Status.values)
+    Payment.objects.bulk_create([
+        Payment(
+            student_id=subscription.student_id, subscription=subscription, amount=Decimal('500.00'),
+            status=statuses[(i + month) % len(statuses)],
+            payment_date=now - datetime.timedelta(days=30 * month),
+        )
+        for i, subscription in enumerate(subscriptions)
+        for month in range(3)
+    ])
+    return students, teachers
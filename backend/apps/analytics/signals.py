@@ -0,0 +1,98 @@
+"""
+Keep StatsSnapshot and MonthlyRevenue current with per-row deltas.
+
+Each tracked model maps an instance to its "contribution" to the totals.
+The previous contribution comes from the values the row was loaded with
+(core.loaded_state), and on save the difference between the old and new
+contribution is applied with F() updates, so the dashboard never has to
+scan the source tables.
+"""
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_delete, pre_save, post_save, post_delete
+from django.utils import timezone
+
+from apps.payments.models import Subscription, Payment
+from .models import StatsSnapshot, MonthlyRevenue
+
+User = get_user_model()
+
+EMPTY = {}
+
+
+def user_contribution(user):
+    if not user.is_active:
+        return EMPTY
+    if user.role == User.Role.STUDENT:
+        return {'total_students': 1}
+    if user.role == User.Role.TEACHER:
+        return {'total_teachers': 1}
+    return EMPTY
+
+
+def subscription_contribution(subscription):
+    if subscription.status == Subscription.Status.ACTIVE:
+        return {'active_subscriptions': 1}
+    return EMPTY
+
+
+def payment_contribution(payment):
+    if payment.status != Payment.Status.COMPLETED or payment.amount is None:
+        return EMPTY
+    month = timezone.localtime(payment.payment_date).date().replace(day=1)
+    return {'completed_payments': 1, 'total_revenue': payment.amount, 'month': month}
+
+
+TRACKED = {
+    User: (('role', 'is_active'), user_contribution),
+    Subscription: (('status',), subscription_contribution),
+    Payment: (('status', 'amount', 'payment_date'), payment_contribution),
+}
+
+
+def _apply(contribution, sign):
+    if not contribution:
+        return
+    StatsSnapshot.apply_delta(**{
+        field: sign * value for field, value in contribution.items() if field != 'month'
+    })
+    if 'month' in contribution:
+        MonthlyRevenue.apply_delta(
+            contribution['month'],
+            sign * contribution['total_revenue'],
+            sign * contribution['completed_payments'],
+        )
+
+
+def previous_contribution(sender, instance):
+    fields, contribution = TRACKED[sender]
+    state = instance.loaded_state(fields)
+    return contribution(SimpleNamespace(**state)) if state else EMPTY
+
+
+def load_previous_contribution(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._stats_contribution = previous_contribution(sender, instance)
+
+
+def apply_save_delta(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _, contribution = TRACKED[sender]
+    previous = instance._stats_contribution
+    current = contribution(instance)
+    if previous != current:
+        _apply(previous, -1)
+        _apply(current, 1)
+
+
+def apply_delete_delta(sender, instance, **kwargs):
+    _apply(instance._stats_contribution, -1)
+
+
+for model in TRACKED:
+    pre_save.connect(load_previous_contribution, sender=model)
+    post_save.connect(apply_save_delta, sender=model)
+    pre_delete.connect(load_previous_contribution, sender=model)
+    post_delete.connect(apply_delete_delta, sender=model)
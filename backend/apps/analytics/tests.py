@@ -0,0 +1,151 @@
+import datetime
+import re
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.accounts.models import User
+from apps.courses.views import StudentEnrollmentView, TeacherEnrollmentView
+from apps.payments.models import Payment, Subscription
+from apps.payments.views import StudentPaymentHistoryView
+from apps.schedules.conflicts import overlapping
+from apps.schedules.views import StudentScheduleView, TeacherScheduleView
+from apps.zoom_meetings.views import AdminZoomMeetingListCreateView, StudentZoomMeetingView
+
+from .models import MonthlyRevenue, StatsSnapshot
+from .seeding import seed_hot_tables
+
+# Plan lines that mean a table is read end to end.
+SEQ_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (\w+)\b(?! USING)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+
+class StatsSnapshotDeltaTests(TestCase):
+    def setUp(self):
+        StatsSnapshot.recompute()
+
+    def assertSnapshotMatchesSource(self):
+        snapshot = StatsSnapshot.objects.get()
+        stored = {
+            field: getattr(snapshot, field)
+            for field in ('total_students', 'total_teachers', 'active_subscriptions', 'completed_payments', 'total_revenue')
+        }
+        # Deltas can leave an emptied month behind; recompute drops it.
+        months = set(MonthlyRevenue.objects.exclude(payments=0).values_list('month', 'total', 'payments'))
+        _, drift = StatsSnapshot.recompute()
+        self.assertEqual(drift, {})
+        self.assertEqual(set(MonthlyRevenue.objects.values_list('month', 'total', 'payments')), months)
+        return stored
+
+    def test_user_role_and_active_changes(self):
+        student = User.objects.create_user('student@example.com', None, full_name='Student')
+        teacher = User.objects.create_user('teacher@example.com', None, full_name='Teacher', role='teacher')
+        self.assertEqual(self.assertSnapshotMatchesSource()['total_students'], 1)
+
+        student = User.objects.get(pk=student.pk)
+        student.role = User.Role.TEACHER
+        student.save()
+        student.is_active = False
+        student.save()
+        teacher.delete()
+        stored = self.assertSnapshotMatchesSource()
+        self.assertEqual((stored['total_students'], stored['total_teachers']), (0, 0))
+
+    def test_deferred_load_reads_the_stored_row(self):
+        User.objects.create_user('student@example.com', None, full_name='Student')
+        student = User.objects.only('id', 'email').get()
+        student.is_active = False
+        student.save()
+        self.assertEqual(self.assertSnapshotMatchesSource()['total_students'], 0)
+
+    def test_payments_and_subscriptions(self):
+        student = User.objects.create_user('student@example.com', None, full_name='Student')
+        today = timezone.localdate()
+        subscription = Subscription.objects.create(
+            student=student, start_date=today, end_date=today + datetime.timedelta(days=30),
+        )
+        payment = Payment.objects.create(
+            student=student, subscription=subscription, amount=Decimal('500.00'), status=Payment.Status.PENDING,
+        )
+        self.assertEqual(self.assertSnapshotMatchesSource()['active_subscriptions'], 1)
+
+        payment = Payment.objects.get(pk=payment.pk)
+        payment.status = Payment.Status.COMPLETED
+        payment.save()
+        payment.amount = Decimal('750.00')
+        payment.save()
+        stored = self.assertSnapshotMatchesSource()
+        self.assertEqual((stored['completed_payments'], stored['total_revenue']), (1, Decimal('750.00')))
+
+        Payment.objects.get(pk=payment.pk).delete()
+        subscription.status = Subscription.Status.EXPIRED
+        subscription.save()
+        stored = self.assertSnapshotMatchesSource()
+        self.assertEqual((stored['completed_payments'], stored['active_subscriptions']), (0, 0))
+
+    def test_list_loads_run_no_handlers(self):
+        User.objects.create_user('student@example.com', None, full_name='Student')
+        with self.assertNumQueries(1):
+            users = list(User.objects.all())
+        self.assertEqual(users[0]._loaded_state, {'role': 'student', 'is_active': True})
+
+
+class HotQueryPlanTests(TestCase):
+    """The composite indexes keep the hot list querysets off sequential scans."""
+
+    @classmethod
+    def setUpTestData(cls):
+        students, teachers = seed_hot_tables(2000, 40)
+        cls.student, cls.teacher = students[1], teachers[1]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def view_queryset(self, view_class, user):
+        """The queryset `view_class` builds for a list request from `user`."""
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        view = view_class()
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        return view.get_queryset()
+
+    def hot_querysets(self):
+        student, teacher = self.student, self.teacher
+        sources = StatsSnapshot.source_querysets()
+        querysets = {
+            view_class.__name__: self.view_queryset(view_class, user) for view_class, user in (
+                (StudentEnrollmentView, student),
+                (TeacherEnrollmentView, teacher),
+                (StudentScheduleView, student),
+                (TeacherScheduleView, teacher),
+                (StudentZoomMeetingView, student),
+                (AdminZoomMeetingListCreateView, teacher),
+                (StudentPaymentHistoryView, student),
+            )
+        }
+        return {
+            **querysets,
+            # find_conflicts() runs this filter before reading the rows as values.
+            'Schedule conflict check': overlapping(
+                0, datetime.time(18), datetime.time(19)
+            ).filter(Q(teacher_id=teacher.pk) | Q(student_id=student.pk)),
+            'StatsSnapshot.recompute (revenue)': sources['completed_payments'].values('amount'),
+            'StatsSnapshot.recompute (monthly)': sources['monthly_revenue'],
+            # count() drops the default ordering, so the plan is checked without it.
+            'StatsSnapshot.recompute (subscriptions)': sources['active_subscriptions'].order_by().values('id'),
+        }
+
+    def test_no_sequential_scans(self):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            self.skipTest(f'No plan checks for the {connection.vendor} backend.')
+        for label, queryset in self.hot_querysets().items():
+            with self.subTest(label):
+                plan = queryset.explain()
+                self.assertEqual(sorted(set(pattern.findall(plan))), [], plan)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course, Enrollment
+from .models import Course, Enrollment, WaitlistEntry
 
 
 @admin.register(Course)
@@ -16,3 +16,11 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_filter = ['status', 'is_active', 'course']
     search_fields = ['student__full_name', 'student__email', 'course__title']
     raw_id_fields = ['student', 'teacher']
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['student', 'course', 'created_at']
+    list_filter = ['course']
+    search_fields = ['student__full_name', 'student__email', 'course__title']
+    raw_id_fields = ['student', 'teacher']
@@ -0,0 +1,138 @@
+"""
+Capacity-enforced course admission with a FIFO waitlist.
+
+A seat is reserved by a single conditional UPDATE on Course.enrolled_count
+(`... WHERE enrolled_count < max_students`). The database serialises
+concurrent updates of the row, so two requests can never both take the last
+seat, and no COUNT over enrollments is needed. The Enrollment created for a
+reserved seat is flagged so the enrolled_count signal does not count it a
+second time. An existing enrollment that starts holding a seat again
+(reactivated, or moved to another course while active) goes through the
+same admission in readmit(); without a free seat it stays inactive and the
+student is queued, and promotion later reactivates that same row.
+
+When the course is full, or others are already waiting, the student joins
+the course's waitlist. When a seat frees up (an enrollment is deactivated or
+deleted, or max_students is raised), the head of the queue is promoted
+after the freeing transaction commits. The head is one seek on
+(course, created_at, id).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from .models import Course, Enrollment, WaitlistEntry
+
+ENROLLED = 'enrolled'
+WAITLISTED = 'waitlisted'
+
+
+def reserve_seats(course_id, wanted=1):
+    """Atomically take up to `wanted` free seats; returns how many were taken."""
+    if wanted == 1:
+        return Course.objects.filter(
+            pk=course_id, enrolled_count__lt=F('max_students'),
+        ).update(enrolled_count=F('enrolled_count') + 1)
+    course = Course.objects.select_for_update().filter(pk=course_id).only('enrolled_count', 'max_students').first()
+    if course is None:
+        return 0
+    taken = max(0, min(wanted, course.max_students - course.enrolled_count))
+    if taken:
+        Course.objects.filter(pk=course_id).update(enrolled_count=F('enrolled_count') + taken)
+    return taken
+
+
+def release_seats(course_id, count=1):
+    Course.objects.filter(pk=course_id, enrolled_count__gte=count).update(
+        enrolled_count=F('enrolled_count') - count
+    )
+
+
+def seated_enrollment(**fields):
+    """An unsaved Enrollment whose seat has already been reserved."""
+    enrollment = Enrollment(**fields)
+    enrollment._seat_reserved = True
+    return enrollment
+
+
+def take_seat(course_id):
+    """Reserve a seat unless the course is full or others are already waiting."""
+    return not WaitlistEntry.objects.filter(course_id=course_id).exists() and bool(reserve_seats(course_id))
+
+
+def admit(student_id, course_id, teacher_id=None, notes=''):
+    """
+    Enroll the student if a seat is free and nobody is waiting ahead of
+    them; otherwise add them to the waitlist. Returns (status, obj).
+    """
+    fields = dict(student_id=student_id, course_id=course_id, teacher_id=teacher_id, notes=notes)
+    with transaction.atomic():
+        if take_seat(course_id):
+            enrollment = seated_enrollment(**fields)
+            enrollment.save()
+            return ENROLLED, enrollment
+        return WAITLISTED, WaitlistEntry.objects.create(**fields)
+
+
+def readmit(enrollment):
+    """
+    Save an existing enrollment that is about to hold a seat in its course
+    it did not hold before. Without a free seat it is saved inactive and the
+    student joins the waitlist. Returns (status, obj) like admit().
+    """
+    with transaction.atomic():
+        if take_seat(enrollment.course_id):
+            enrollment._seat_reserved = True
+            enrollment.save()
+            return ENROLLED, enrollment
+        enrollment.is_active = False
+        enrollment.save()
+        entry, _ = WaitlistEntry.objects.get_or_create(
+            student_id=enrollment.student_id, course_id=enrollment.course_id,
+            defaults={'teacher_id': enrollment.teacher_id, 'notes': enrollment.notes},
+        )
+        return WAITLISTED, entry
+
+
+def waitlist_position(entry):
+    """1-based place in the queue."""
+    return WaitlistEntry.objects.filter(course_id=entry.course_id).filter(
+        Q(created_at__lt=entry.created_at) | Q(created_at=entry.created_at, id__lte=entry.id)
+    ).count()
+
+
+def promote_waitlist(course_id):
+    """Move waiters into free seats, oldest first. Returns the new enrollments."""
+    promoted = []
+    while True:
+        with transaction.atomic():
+            entry = (
+                WaitlistEntry.objects.select_for_update(skip_locked=True)
+                .filter(course_id=course_id).order_by('created_at', 'id').first()
+            )
+            if entry is None or not reserve_seats(course_id):
+                return promoted
+            # A reactivated enrollment that was queued keeps its own row.
+            enrollment = Enrollment.objects.filter(
+                student_id=entry.student_id, course_id=course_id, is_active=False,
+            ).first()
+            if enrollment is None:
+                enrollment = seated_enrollment(
+                    student_id=entry.student_id, course_id=course_id,
+                    teacher_id=entry.teacher_id, notes=entry.notes,
+                )
+            else:
+                enrollment.is_active = True
+                enrollment._seat_reserved = True
+            try:
+                with transaction.atomic():
+                    enrollment.save()
+            except IntegrityError:
+                # Enrolled some other way while waiting: drop the entry, keep the seat free.
+                release_seats(course_id)
+            else:
+                promoted.append(enrollment)
+            entry.delete()
+
+
+def schedule_promotion(course_id):
+    transaction.on_commit(lambda: promote_waitlist(course_id))
@@ -0,0 +1,177 @@
+"""
+Automatic teacher assignment for unassigned enrollments.
+
+Everything the matcher needs is loaded with four set-based queries
+(pending enrollments with the student's preferred slot, available teachers,
+current loads per teacher, and the slots each teacher already teaches).
+The matching itself runs in memory.
+
+Students are taken in enrollment order (first come, first served). Each one
+goes to the least-loaded teacher who teaches their preferred time slot and
+still has room. If no such teacher exists, they go to the least-loaded
+teacher with room in any slot. Room means fewer than
+TEACHER_MAX_ACTIVE_STUDENTS active students. With the limit set to 0 a
+plan can still be previewed, but applying it must be asked for explicitly
+(allow_uncapped), since every student could land on one teacher.
+Course.max_students is the course-wide seat limit enforced at admission
+(admission.py); every pending enrollment already holds one of those seats,
+so it plays no part here.
+
+Least-loaded teachers come from a min-heap per slot, keyed on the teacher's
+current total load. Entries go stale once a teacher's load changes and are
+re-pushed lazily when popped. A plan is therefore
+O((students + teachers) log teachers), and 10k enrollments against a few
+hundred teachers take a few tens of milliseconds.
+"""
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from apps.accounts.models import TeacherProfile
+from apps.schedules.models import Schedule
+from core.response_cache import bump_model_version
+
+from .models import Enrollment
+
+ANY_SLOT = '*'
+
+
+class Matcher:
+    """In-memory heap-greedy matcher; knows nothing about the ORM."""
+
+    def __init__(self, teachers, loads, teacher_slots, teacher_capacity=0):
+        self.teachers = teachers
+        self.loads = loads
+        self.teacher_slots = teacher_slots
+        self.teacher_capacity = teacher_capacity
+        self.heaps = {}
+
+    def has_room(self, teacher_id):
+        return not self.teacher_capacity or self.loads[teacher_id] < self.teacher_capacity
+
+    def teaches(self, teacher_id, slot):
+        # Teachers without any schedule yet are open to every slot.
+        slots = self.teacher_slots.get(teacher_id)
+        return slot == ANY_SLOT or not slots or slot in slots
+
+    def heap(self, slot):
+        if slot not in self.heaps:
+            self.heaps[slot] = [
+                (self.loads[teacher_id], teacher_id) for teacher_id in self.teachers
+                if self.teaches(teacher_id, slot) and self.has_room(teacher_id)
+            ]
+            heapq.heapify(self.heaps[slot])
+        return self.heaps[slot]
+
+    def pop_teacher(self, slot):
+        heap = self.heap(slot)
+        while heap:
+            load, teacher_id = heapq.heappop(heap)
+            if not self.has_room(teacher_id):
+                continue
+            if load != self.loads[teacher_id]:
+                heapq.heappush(heap, (self.loads[teacher_id], teacher_id))
+                continue
+            return teacher_id
+        return None
+
+    def take(self, teacher_id, slot):
+        self.loads[teacher_id] += 1
+        if self.has_room(teacher_id):
+            heapq.heappush(self.heap(slot), (self.loads[teacher_id], teacher_id))
+
+    def match(self, slot):
+        """Return (teacher_id, slot_matched), or (None, False) when every teacher is full."""
+        teacher_id = self.pop_teacher(slot) if slot else None
+        if teacher_id is not None:
+            self.take(teacher_id, slot)
+            return teacher_id, True
+        teacher_id = self.pop_teacher(ANY_SLOT)
+        if teacher_id is not None:
+            self.take(teacher_id, ANY_SLOT)
+        return teacher_id, False
+
+
+def build_plan(pending, lock=False):
+    if lock:
+        # Lock the planned rows with the same filter that selects them, so a
+        # concurrent apply waits and then no longer sees them as unassigned.
+        # of=('self',): the profile join is an outer join, which cannot be locked.
+        pending = pending.select_for_update(of=('self',))
+    pending_rows = list(pending.order_by('enrolled_at', 'id').values(
+        'id', 'student_id', 'course_id', 'student__student_profile__preferred_time_slot',
+    ))
+    teacher_ids = list(TeacherProfile.objects.filter(
+        is_available=True, user__is_active=True,
+    ).order_by('user_id').values_list('user_id', flat=True))
+
+    loads = defaultdict(int)
+    for teacher_id, total in (
+        Enrollment.objects.filter(is_active=True, teacher_id__in=teacher_ids)
+        .order_by().values_list('teacher_id').annotate(total=Count('id'))
+    ):
+        loads[teacher_id] = total
+
+    teacher_slots = defaultdict(set)
+    for teacher_id, slot in (
+        Schedule.objects.filter(is_active=True, teacher_id__in=teacher_ids)
+        .order_by().values_list('teacher_id', 'time_slot').distinct()
+    ):
+        teacher_slots[teacher_id].add(slot)
+
+    matcher = Matcher(teacher_ids, loads, teacher_slots, teacher_capacity=settings.TEACHER_MAX_ACTIVE_STUDENTS)
+    assignments, unassigned = [], []
+    for row in pending_rows:
+        slot = row['student__student_profile__preferred_time_slot']
+        teacher_id, slot_matched = matcher.match(slot)
+        if teacher_id is None:
+            unassigned.append({'enrollment': row['id'], 'reason': 'No available teacher has room for another student.'})
+        else:
+            assignments.append({
+                'enrollment': row['id'],
+                'student': row['student_id'],
+                'course': row['course_id'],
+                'teacher': teacher_id,
+                'preferred_time_slot': slot,
+                'slot_matched': slot_matched,
+            })
+    return {
+        'assigned': len(assignments),
+        'unassigned': len(unassigned),
+        'slot_matched': sum(1 for item in assignments if item['slot_matched']),
+        'assignments': assignments,
+        'unassigned_enrollments': unassigned,
+    }
+
+
+def pending_enrollments(course_id=None):
+    pending = Enrollment.objects.filter(is_active=True, teacher__isnull=True)
+    if course_id is not None:
+        pending = pending.filter(course_id=course_id)
+    return pending
+
+
+def auto_assign(course_id=None, apply=False, allow_uncapped=False):
+    """
+    Plan teacher assignments for every active, unassigned enrollment
+    (optionally only one course). With apply=True the plan is written
+    with a single bulk_update; without a teacher cap that also needs
+    allow_uncapped=True.
+    """
+    if apply and not settings.TEACHER_MAX_ACTIVE_STUDENTS and not allow_uncapped:
+        raise ValueError('Refusing to apply an uncapped plan; pass allow_uncapped=True.')
+    if not apply:
+        return build_plan(pending_enrollments(course_id))
+    with transaction.atomic():
+        plan = build_plan(pending_enrollments(course_id), lock=True)
+        Enrollment.objects.bulk_update(
+            [Enrollment(pk=item['enrollment'], teacher_id=item['teacher']) for item in plan['assignments']],
+            ['teacher'],
+            batch_size=1000,
+        )
+        if plan['assignments']:
+            bump_model_version(Enrollment)
+    return plan
@@ -0,0 +1,180 @@
+"""
+Bulk enrollment and bulk teacher assignment.
+
+Both operations validate a whole batch with a fixed number of IN queries
+(user roles, courses, existing enrollments and waitlist entries), then write
+every valid item with a single bulk_create or bulk_update inside one
+transaction. Each item gets its own result entry, so one bad row does not
+reject the batch.
+
+Bulk enrollment goes through the same admission rules as admission.admit:
+seats are reserved per course with one locked counter update, and items
+beyond capacity (or behind existing waiters) join the waitlist in request
+order. bulk_create and bulk_update skip model signals, so the
+response-cache invalidation is done here, once per batch.
+"""
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from core.response_cache import bump_model_version
+
+from .admission import WAITLISTED, admit, reserve_seats, seated_enrollment
+from .models import Course, Enrollment, WaitlistEntry
+
+User = get_user_model()
+
+
+class BulkResult:
+    def __init__(self, size):
+        self.results = [None] * size
+
+    def ok(self, index, status, enrollment_id):
+        self.results[index] = {'index': index, 'status': status, 'enrollment': enrollment_id}
+
+    def waitlisted(self, index, entry_id):
+        self.results[index] = {'index': index, 'status': WAITLISTED, 'waitlist_entry': entry_id}
+
+    def error(self, index, errors):
+        self.results[index] = {'index': index, 'status': 'error', 'errors': errors}
+
+    def as_dict(self, status):
+        succeeded = sum(1 for result in self.results if result['status'] == status)
+        waitlisted = sum(1 for result in self.results if result['status'] == WAITLISTED)
+        report = {status: succeeded}
+        if waitlisted:
+            report[WAITLISTED] = waitlisted
+        report['failed'] = len(self.results) - succeeded - waitlisted
+        report['results'] = self.results
+        return report
+
+
+def user_roles(user_ids):
+    return dict(User.objects.filter(pk__in=user_ids).order_by().values_list('id', 'role'))
+
+
+def bulk_enroll(items):
+    """
+    Enroll each {'student', 'course', 'teacher', 'notes'} item (ids).
+    Returns {'created', 'waitlisted', 'failed', 'results'}.
+    """
+    result = BulkResult(len(items))
+    student_ids = {item['student'] for item in items}
+    roles = user_roles(student_ids | {item['teacher'] for item in items if item.get('teacher')})
+    course_ids = set(
+        Course.objects.filter(pk__in={item['course'] for item in items}).order_by().values_list('id', flat=True)
+    )
+    existing = set(
+        Enrollment.objects.filter(student_id__in=student_ids, course_id__in=course_ids)
+        .order_by().values_list('student_id', 'course_id')
+    )
+    waiting = set(
+        WaitlistEntry.objects.filter(student_id__in=student_ids, course_id__in=course_ids)
+        .order_by().values_list('student_id', 'course_id')
+    )
+
+    pending = []
+    for index, item in enumerate(items):
+        errors = {}
+        if roles.get(item['student']) != User.Role.STUDENT:
+            errors['student'] = ['Selected user is not a student.']
+        if item['course'] not in course_ids:
+            errors['course'] = ['Course not found.']
+        if item.get('teacher') and roles.get(item['teacher']) != User.Role.TEACHER:
+            errors['teacher'] = ['Selected user is not a teacher.']
+        key = (item['student'], item['course'])
+        if not errors and key in existing:
+            errors['non_field_errors'] = ['This student is already enrolled in this course.']
+        if not errors and key in waiting:
+            errors['non_field_errors'] = ['This student is already on the waitlist for this course.']
+        if errors:
+            result.error(index, errors)
+            continue
+        existing.add(key)
+        pending.append((index, dict(
+            student_id=item['student'],
+            course_id=item['course'],
+            teacher_id=item.get('teacher'),
+            notes=item.get('notes', ''),
+        )))
+
+    if pending:
+        try:
+            with transaction.atomic():
+                seated, queued = admit_batch(pending)
+                created = Enrollment.objects.bulk_create([seated_enrollment(**fields) for _, fields in seated])
+                entries = WaitlistEntry.objects.bulk_create([WaitlistEntry(**fields) for _, fields in queued])
+                bump_model_version(Enrollment)
+        except IntegrityError:
+            # Another request enrolled or queued one of these pairs after
+            # validation; admit row by row and report the conflicts.
+            for index, fields in pending:
+                try:
+                    status, obj = admit(**fields)
+                except IntegrityError:
+                    result.error(index, {'non_field_errors': ['This student is already enrolled or waitlisted for this course.']})
+                else:
+                    if status == WAITLISTED:
+                        result.waitlisted(index, obj.pk)
+                    else:
+                        result.ok(index, 'created', obj.pk)
+        else:
+            for (index, _), enrollment in zip(seated, created):
+                result.ok(index, 'created', enrollment.pk)
+            for (index, _), entry in zip(queued, entries):
+                result.waitlisted(index, entry.pk)
+    return result.as_dict('created')
+
+
+def admit_batch(pending):
+    """Split pending items into (seated, queued), reserving seats per course."""
+    by_course = defaultdict(list)
+    for index, fields in pending:
+        by_course[fields['course_id']].append((index, fields))
+    busy = set(
+        WaitlistEntry.objects.filter(course_id__in=by_course).order_by().values_list('course_id', flat=True).distinct()
+    )
+    seated, queued = [], []
+    for course_id, course_items in by_course.items():
+        # Nobody jumps ahead of students already waiting for this course.
+        free = 0 if course_id in busy else reserve_seats(course_id, len(course_items))
+        seated += course_items[:free]
+        queued += course_items[free:]
+    return seated, queued
+
+
+def bulk_assign_teachers(items):
+    """
+    Assign each {'enrollment', 'teacher'} item (ids; teacher may be None to unassign).
+    Returns {'updated', 'failed', 'results'}.
+    """
+    result = BulkResult(len(items))
+    enrollments = Enrollment.objects.only('id', 'teacher_id').in_bulk({item['enrollment'] for item in items})
+    roles = user_roles({item['teacher'] for item in items if item.get('teacher')})
+
+    changed, seen = [], set()
+    for index, item in enumerate(items):
+        enrollment = enrollments.get(item['enrollment'])
+        teacher_id = item.get('teacher')
+        errors = {}
+        if enrollment is None:
+            errors['enrollment'] = ['Enrollment not found.']
+        elif item['enrollment'] in seen:
+            errors['enrollment'] = ['Enrollment appears more than once in this request.']
+        if teacher_id and roles.get(teacher_id) != User.Role.TEACHER:
+            errors['teacher'] = ['Selected user is not a teacher.']
+        if errors:
+            result.error(index, errors)
+            continue
+        seen.add(enrollment.pk)
+        if enrollment.teacher_id != teacher_id:
+            enrollment.teacher_id = teacher_id
+            changed.append(enrollment)
+        result.ok(index, 'updated', enrollment.pk)
+
+    if changed:
+        with transaction.atomic():
+            Enrollment.objects.bulk_update(changed, ['teacher'])
+            bump_model_version(Enrollment)
+    return result.as_dict('updated')
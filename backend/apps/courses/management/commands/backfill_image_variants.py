@@ -0,0 +1,44 @@
+from django.apps import apps
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.management.base import BaseCommand
+from PIL import Image, UnidentifiedImageError
+
+from core.images import FORMATS, PRESETS, SOURCES, ensure_variant, is_external
+
+
+class Command(BaseCommand):
+    help = (
+        'Render every resized variant of existing course thumbnails and profile photos, '
+        'so first requests are served from storage. Variants that already exist are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--group', choices=sorted(PRESETS), action='append',
+            help='Only backfill this variant group (repeatable). Defaults to all groups.',
+        )
+
+    def handle(self, *args, **options):
+        rendered = failed = 0
+        for group in options['group'] or sorted(PRESETS):
+            label, field_name = SOURCES[group]
+            names = (
+                apps.get_model(label).objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .order_by().values_list(field_name, flat=True).distinct().iterator()
+            )
+            for name in names:
+                if is_external(name):
+                    continue
+                try:
+                    for size in PRESETS[group]:
+                        for fmt in FORMATS:
+                            ensure_variant(name, group, size, fmt)
+                except (OSError, SuspiciousFileOperation, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+                    failed += 1
+                    self.stderr.write(f'{group}: {name}: {exc}')
+                else:
+                    rendered += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Variants ready for {rendered} image(s); {failed} could not be read.'
+        ))
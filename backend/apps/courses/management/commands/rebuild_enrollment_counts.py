@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from apps.courses.models import Course, Enrollment
+from core.response_cache import bump_model_version
+
+
+class Command(BaseCommand):
+    help = 'Recompute Course.enrolled_count from the enrollments table to repair drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of courses written per UPDATE batch.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = dict(
+                Enrollment.objects.filter(is_active=True)
+                .values('course_id')
+                .annotate(total=Count('id'))
+                .values_list('course_id', 'total')
+            )
+            courses = list(Course.objects.select_for_update().only('id', 'enrolled_count'))
+            drifted = []
+            for course in courses:
+                expected = counts.get(course.id, 0)
+                if course.enrolled_count != expected:
+                    course.enrolled_count = expected
+                    drifted.append(course)
+            Course.objects.bulk_update(drifted, ['enrolled_count'], batch_size=options['batch_size'])
+            if drifted:
+                bump_model_version(Course)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {len(courses)} course(s), corrected {len(drifted)}.'
+        ))
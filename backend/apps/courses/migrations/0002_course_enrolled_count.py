@@ -0,0 +1,33 @@
+# Generated by Django 5.0.3 on 2026-10-18 07:34
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_enrolled_count(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    counts = (
+        Enrollment.objects.filter(is_active=True)
+        .values('course_id')
+        .annotate(total=Count('id'))
+        .values_list('course_id', 'total')
+    )
+    for course_id, total in counts:
+        Course.objects.filter(pk=course_id).update(enrolled_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_enrolled_count, migrations.RunPython.noop),
+    ]
@@ -30,6 +30,13 @@ class Course(models.Model):
     thumbnail = models.ImageField(upload_to='courses/', blank=True, null=True)
     syllabus = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
+    # Number of active enrollments, kept up to date by the Enrollment signals
+    # in signals.py. Repair drift with `manage.py rebuild_enrollment_counts`.
+    # "Active" means Enrollment.is_active, as everywhere else in the app
+    # (teacher loads, my-enrollments, seat reservation); Enrollment.status is
+    # informational, so a completed or cancelled enrollment keeps its seat
+    # until it is deactivated.
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
     created_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -49,9 +56,15 @@ class Course(models.Model):
     def __str__(self):
         return f"{self.title} ({self.course_type} - {self.level})"
 
-    @property
-    def enrolled_count(self):
-        return self.enrollments.filter(is_active=True).count()
+    def save(self, *args, **kwargs):
+        # enrolled_count only changes through F() updates (signals.py,
+        # admission.py); never write back the copy loaded with this instance.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'enrolled_count'
+            ]
+        super().save(*args, **kwargs)
 
 
 class Enrollment(models.Model):
@@ -96,6 +109,75 @@ class Enrollment(models.Model):
         verbose_name_plural = 'Enrollments'
         unique_together = [('student', 'course')]
         ordering = ['-enrolled_at']
+        indexes = [
+            # Keyset pagination (core/pagination.py) seeks on (ordering, id).
+            models.Index(fields=['enrolled_at', 'id'], name='enrollments_enrolled_id_idx'),
+            # my-students / my-enrollments and the teacher student counts.
+            models.Index(
+                fields=['teacher', '-enrolled_at'], condition=models.Q(is_active=True),
+                name='enroll_teacher_active_idx',
+            ),
+            models.Index(
+                fields=['student', '-enrolled_at'], condition=models.Q(is_active=True),
+                name='enroll_student_active_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which course this row counted towards when loaded, so the
+        # post_save signal can apply the right counter delta.
+        if 'course_id' in field_names and 'is_active' in field_names:
+            instance._counted_course_id = instance.counted_course_id
+        return instance
+
+    @property
+    def counted_course_id(self):
+        """The course whose enrolled_count includes this enrollment, if any (is_active only, not status)."""
+        return self.course_id if self.is_active else None
 
     def __str__(self):
         return f"{self.student.full_name} → {self.course.title} (Teacher: {self.teacher.full_name if self.teacher else 'Unassigned'})"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A student waiting for a seat in a full course. Entries are served first
+    come, first served; see admission.py.
+    """
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        limit_choices_to={'role': 'student'}
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='waitlist'
+    )
+    teacher = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        limit_choices_to={'role': 'teacher'}
+    )
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'course_waitlist'
+        verbose_name = 'Waitlist Entry'
+        verbose_name_plural = 'Waitlist Entries'
+        unique_together = [('student', 'course')]
+        ordering = ['created_at', 'id']
+        indexes = [
+            # The head of each course's queue is one index seek.
+            models.Index(fields=['course', 'created_at', 'id'], name='waitlist_course_fifo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.full_name} waiting for {self.course.title}"
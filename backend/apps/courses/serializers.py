@@ -1,6 +1,11 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Course, Enrollment
+
+from core.images import ImageVariantsField
+
+from .admission import WAITLISTED, readmit
+from .models import Course, Enrollment, WaitlistEntry
 
 User = get_user_model()
 
@@ -8,16 +13,17 @@ User = get_user_model()
 class CourseSerializer(serializers.ModelSerializer):
     enrolled_count = serializers.ReadOnlyField()
     created_by_name = serializers.CharField(source='created_by.full_name', read_only=True)
+    thumbnail_variants = ImageVariantsField('course', source='thumbnail')
 
     class Meta:
         model = Course
         fields = [
             'id', 'title', 'description', 'course_type', 'level',
             'duration_months', 'price_per_month', 'max_students',
-            'thumbnail', 'syllabus', 'is_active', 'enrolled_count',
+            'thumbnail', 'thumbnail_variants', 'syllabus', 'is_active', 'enrolled_count',
             'created_by_name', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'enrolled_count', 'created_by_name', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'enrolled_count', 'created_by_name', 'thumbnail_variants', 'created_at', 'updated_at']
 
 
 class EnrollmentStudentSerializer(serializers.ModelSerializer):
@@ -51,6 +57,23 @@ class EnrollmentAdminSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'enrolled_at']
 
+    def update(self, instance, validated_data):
+        # Reactivating, or moving an active enrollment to another course,
+        # takes a seat there, so it goes through admission like a new one.
+        course = validated_data.get('course', instance.course)
+        takes_seat = validated_data.get('is_active', instance.is_active) and (
+            not instance.is_active or course.pk != instance.course_id
+        )
+        self.waitlist_entry = None
+        if not takes_seat:
+            return super().update(instance, validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        admission, obj = readmit(instance)
+        if admission == WAITLISTED:
+            self.waitlist_entry = obj
+        return instance
+
 
 class CreateEnrollmentSerializer(serializers.ModelSerializer):
     """Serializer for admin to enroll a student in a course."""
@@ -69,9 +92,25 @@ class CreateEnrollmentSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'teacher': 'Selected user is not a teacher.'})
         if Enrollment.objects.filter(student=student, course=course).exists():
             raise serializers.ValidationError('This student is already enrolled in this course.')
+        if WaitlistEntry.objects.filter(student=student, course=course).exists():
+            raise serializers.ValidationError('This student is already on the waitlist for this course.')
         return attrs
 
 
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    course_title = serializers.CharField(source='course.title', read_only=True)
+    student_name = serializers.CharField(source='student.full_name', read_only=True)
+    student_email = serializers.CharField(source='student.email', read_only=True)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'student', 'student_name', 'student_email',
+            'course', 'course_title', 'teacher', 'notes', 'created_at'
+        ]
+        read_only_fields = fields
+
+
 class AssignTeacherSerializer(serializers.ModelSerializer):
     """Serializer for admin to assign/reassign a teacher to an enrollment."""
 
@@ -83,3 +122,47 @@ class AssignTeacherSerializer(serializers.ModelSerializer):
         if value and value.role != 'teacher':
             raise serializers.ValidationError('Selected user is not a teacher.')
         return value
+
+
+class BulkEnrollmentItemSerializer(serializers.Serializer):
+    # Plain ids: the bulk helper checks them all with IN queries instead of
+    # one PrimaryKeyRelatedField lookup per item.
+    student = serializers.IntegerField()
+    course = serializers.IntegerField()
+    teacher = serializers.IntegerField(required=False, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class BulkEnrollmentSerializer(serializers.Serializer):
+    enrollments = serializers.ListField(
+        child=BulkEnrollmentItemSerializer(),
+        allow_empty=False,
+        max_length=settings.BULK_ENROLLMENT_MAX_ITEMS,
+    )
+
+
+class BulkAssignTeacherItemSerializer(serializers.Serializer):
+    enrollment = serializers.IntegerField()
+    teacher = serializers.IntegerField(allow_null=True)
+
+
+class BulkAssignTeacherSerializer(serializers.Serializer):
+    assignments = serializers.ListField(
+        child=BulkAssignTeacherItemSerializer(),
+        allow_empty=False,
+        max_length=settings.BULK_ENROLLMENT_MAX_ITEMS,
+    )
+
+
+class AutoAssignTeachersSerializer(serializers.Serializer):
+    course = serializers.IntegerField(required=False, allow_null=True)
+    apply = serializers.BooleanField(default=False)
+    allow_uncapped = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data['apply'] and not settings.TEACHER_MAX_ACTIVE_STUDENTS and not data['allow_uncapped']:
+            raise serializers.ValidationError(
+                'TEACHER_MAX_ACTIVE_STUDENTS is 0, so teachers have no cap. '
+                'Send "allow_uncapped": true to apply the plan anyway.'
+            )
+        return data
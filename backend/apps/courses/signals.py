@@ -0,0 +1,74 @@
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from core.response_cache import bump_model_version
+
+from .admission import schedule_promotion
+from .models import Course, Enrollment
+
+
+def adjust_enrolled_count(course_id, delta):
+    if course_id is None:
+        return
+    courses = Course.objects.filter(pk=course_id)
+    if delta < 0:
+        courses = courses.filter(enrolled_count__gte=-delta)
+    courses.update(enrolled_count=F('enrolled_count') + delta)
+
+
+@receiver(pre_save, sender=Enrollment)
+def remember_counted_course(sender, instance, **kwargs):
+    if instance._state.adding:
+        # Admission reserves the seat before saving, so it is already counted.
+        seat_reserved = getattr(instance, '_seat_reserved', False)
+        instance._counted_course_id = instance.counted_course_id if seat_reserved else None
+    elif not hasattr(instance, '_counted_course_id'):
+        # Loaded with deferred fields: read the previous state before it is overwritten.
+        previous = Enrollment.objects.filter(pk=instance.pk).values('course_id', 'is_active').first()
+        if previous and previous['is_active']:
+            instance._counted_course_id = previous['course_id']
+        else:
+            instance._counted_course_id = None
+
+
+@receiver(post_save, sender=Enrollment)
+def update_enrolled_count_on_save(sender, instance, **kwargs):
+    previous = instance._counted_course_id
+    current = instance.counted_course_id
+    # Admission (readmit, promotion) reserved the seat in `current` already.
+    seat_reserved = getattr(instance, '_seat_reserved', False)
+    instance._seat_reserved = False
+    if previous != current:
+        adjust_enrolled_count(previous, -1)
+        if not seat_reserved:
+            adjust_enrolled_count(current, 1)
+        if previous is not None:
+            schedule_promotion(previous)
+    instance._counted_course_id = current
+
+
+@receiver(post_delete, sender=Enrollment)
+def update_enrolled_count_on_delete(sender, instance, **kwargs):
+    counted = getattr(instance, '_counted_course_id', instance.counted_course_id)
+    adjust_enrolled_count(counted, -1)
+    if counted is not None:
+        schedule_promotion(counted)
+    instance._counted_course_id = None
+
+
+@receiver(post_save, sender=Course)
+def promote_waitlist_on_course_change(sender, instance, created, **kwargs):
+    # Raising max_students opens seats for whoever is waiting.
+    if not created:
+        schedule_promotion(instance.pk)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_cached_responses(sender, **kwargs):
+    # Enrollment writes change Course.enrolled_count and teacher student
+    # counts through update(), which sends no signals of its own.
+    bump_model_version(sender)
@@ -0,0 +1,224 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts.models import TeacherProfile, User
+
+from .assignment import auto_assign
+from .models import Course, Enrollment, WaitlistEntry
+
+
+def make_student(number):
+    return User.objects.create_user(f'student{number}@example.com', None, full_name=f'Student {number}')
+
+
+class EnrolledCountTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(title='Quran', description='Reading', max_students=10)
+        self.other = Course.objects.create(title='Tajweed', description='Rules', max_students=10)
+
+    def count(self, course):
+        course.refresh_from_db(fields=['enrolled_count'])
+        return course.enrolled_count
+
+    def test_create_deactivate_reactivate_delete(self):
+        enrollment = Enrollment.objects.create(student=make_student(1), course=self.course)
+        self.assertEqual(self.count(self.course), 1)
+        enrollment.is_active = False
+        enrollment.save()
+        self.assertEqual(self.count(self.course), 0)
+        enrollment.is_active = True
+        enrollment.save()
+        self.assertEqual(self.count(self.course), 1)
+        enrollment.delete()
+        self.assertEqual(self.count(self.course), 0)
+
+    def test_move_to_other_course(self):
+        enrollment = Enrollment.objects.create(student=make_student(1), course=self.course)
+        enrollment = Enrollment.objects.get(pk=enrollment.pk)
+        enrollment.course = self.other
+        enrollment.save()
+        self.assertEqual((self.count(self.course), self.count(self.other)), (0, 1))
+
+    def test_status_does_not_change_the_count(self):
+        enrollment = Enrollment.objects.create(student=make_student(1), course=self.course)
+        enrollment.status = Enrollment.Status.COMPLETED
+        enrollment.save()
+        self.assertEqual(self.count(self.course), 1)
+
+    def test_deferred_load_and_course_save_keep_the_count(self):
+        Enrollment.objects.create(student=make_student(1), course=self.course)
+        enrollment = Enrollment.objects.only('id', 'notes').get()
+        enrollment.course_id = self.other.pk
+        enrollment.save()
+        self.assertEqual((self.count(self.course), self.count(self.other)), (0, 1))
+        stale = Course.objects.get(pk=self.other.pk)
+        Enrollment.objects.create(student=make_student(2), course=self.other)
+        stale.title = 'Tajweed rules'
+        stale.save()
+        self.assertEqual(self.count(self.other), 2)
+
+    def test_rebuild_repairs_drift(self):
+        Enrollment.objects.create(student=make_student(1), course=self.course)
+        Course.objects.filter(pk=self.course.pk).update(enrolled_count=7)
+        call_command('rebuild_enrollment_counts', stdout=StringIO())
+        self.assertEqual(self.count(self.course), 1)
+
+
+@override_settings(SHARED_CACHE=True)
+class PublicCourseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Course.objects.bulk_create(
+            Course(title=f'Course {number}', description='Reading', max_students=10) for number in range(25)
+        )
+
+    def test_host_is_part_of_the_cache_key(self):
+        client = APIClient()
+        forged = client.get('/api/courses/', HTTP_HOST='attacker.example')
+        self.assertIn('attacker.example', forged.data['next'])
+        response = client.get('/api/courses/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'attacker.example', response.content)
+        self.assertIn(b'http://testserver/', response.content)
+        response = client.get('/api/courses/', secure=True)
+        self.assertIn(b'https://testserver/', response.content)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_process_local_cache_is_not_used(self):
+        # Another worker's bump would never reach this process's cache, so
+        # a write without a local bump must still show up.
+        client = APIClient()
+        client.get('/api/courses/')
+        Course.objects.filter(title='Course 24').update(title='Renamed')
+        self.assertIn(b'Renamed', client.get('/api/courses/').content)
+
+
+class AutoAssignTests(TestCase):
+    def setUp(self):
+        # max_students is the course-wide seat limit; it does not cap a teacher.
+        self.course = Course.objects.create(title='Quran', description='Reading', max_students=5)
+        self.teachers = []
+        for number in range(2):
+            teacher = User.objects.create_user(
+                f'teacher{number}@example.com', None, full_name=f'Teacher {number}', role='teacher',
+            )
+            TeacherProfile.objects.get_or_create(user=teacher)
+            self.teachers.append(teacher)
+        self.enrollments = [
+            Enrollment.objects.create(student=make_student(number), course=self.course) for number in range(4)
+        ]
+
+    def test_balances_load_and_applies(self):
+        Enrollment.objects.create(student=make_student(9), course=self.course, teacher=self.teachers[0])
+        plan = auto_assign(apply=True)
+        self.assertEqual((plan['assigned'], plan['unassigned']), (4, 0))
+        loads = [Enrollment.objects.filter(teacher=teacher).count() for teacher in self.teachers]
+        self.assertEqual(sorted(loads), [2, 3])
+        self.assertFalse(Enrollment.objects.filter(teacher__isnull=True).exists())
+        self.assertEqual(auto_assign(apply=True)['assigned'], 0)
+
+    @override_settings(TEACHER_MAX_ACTIVE_STUDENTS=1)
+    def test_teacher_limit_leaves_the_rest_unassigned(self):
+        plan = auto_assign()
+        self.assertEqual((plan['assigned'], plan['unassigned']), (2, 2))
+        self.assertEqual(
+            [item['enrollment'] for item in plan['unassigned_enrollments']],
+            [enrollment.pk for enrollment in self.enrollments[2:]],
+        )
+
+    @override_settings(TEACHER_MAX_ACTIVE_STUDENTS=0)
+    def test_uncapped_apply_needs_the_explicit_flag(self):
+        admin = APIClient()
+        admin.force_authenticate(User.objects.create_user('admin@example.com', None, full_name='Admin', role='admin'))
+        url = '/api/courses/enrollments/auto-assign/'
+        self.assertEqual(admin.post(url, {}, format='json').data['assigned'], 4)
+        self.assertEqual(admin.post(url, {'apply': True}, format='json').status_code, 400)
+        self.assertTrue(Enrollment.objects.filter(teacher__isnull=True).exists())
+        with self.assertRaises(ValueError):
+            auto_assign(apply=True)
+        response = admin.post(url, {'apply': True, 'allow_uncapped': True}, format='json')
+        self.assertEqual((response.status_code, response.data['assigned']), (200, 4))
+
+
+class AdmissionTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(title='Quran', description='Reading', max_students=1)
+        self.admin = APIClient()
+        self.admin.force_authenticate(User.objects.create_user('admin@example.com', None, full_name='Admin', role='admin'))
+
+    def enroll(self, student):
+        client = APIClient()
+        client.force_authenticate(student)
+        return client.post(f'/api/courses/{self.course.pk}/enroll/')
+
+    def test_full_course_waitlists_and_promotes_in_order(self):
+        first, second, third = (make_student(number) for number in range(3))
+        self.assertEqual(self.enroll(first).status_code, 201)
+        response = self.enroll(second)
+        self.assertEqual((response.status_code, response.data['position']), (202, 1))
+        self.assertEqual(self.enroll(third).data['position'], 2)
+        self.assertEqual(self.enroll(second).status_code, 400)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            enrollment = Enrollment.objects.get(student=first)
+            enrollment.is_active = False
+            enrollment.save()
+        self.assertTrue(Enrollment.objects.filter(student=second, course=self.course, is_active=True).exists())
+        self.assertEqual(list(WaitlistEntry.objects.values_list('student_id', flat=True)), [third.pk])
+        self.course.refresh_from_db(fields=['enrolled_count'])
+        self.assertEqual(self.course.enrolled_count, 1)
+
+    def seats_taken(self):
+        self.course.refresh_from_db(fields=['enrolled_count'])
+        return self.course.enrolled_count
+
+    def test_reactivation_takes_a_seat_or_waits_for_one(self):
+        first, second = make_student(1), make_student(2)
+        self.enroll(first)
+        with self.captureOnCommitCallbacks(execute=True):
+            enrollment = Enrollment.objects.get(student=first)
+            enrollment.is_active = False
+            enrollment.save()
+        self.enroll(second)
+        self.assertEqual(self.seats_taken(), 1)
+
+        url = f'/api/courses/enrollments/{enrollment.pk}/'
+        response = self.admin.patch(url, {'is_active': True, 'notes': 'Back from travel'}, format='json')
+        self.assertEqual((response.status_code, response.data['position']), (202, 1))
+        enrollment.refresh_from_db()
+        self.assertEqual((enrollment.is_active, enrollment.notes), (False, 'Back from travel'))
+        self.assertEqual(self.seats_taken(), 1)
+
+        # The queued row itself is reactivated when the seat frees up.
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.admin.patch(
+                f'/api/courses/enrollments/{Enrollment.objects.get(student=second).pk}/',
+                {'is_active': False}, format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        enrollment.refresh_from_db()
+        self.assertTrue(enrollment.is_active)
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.assertEqual(self.seats_taken(), 1)
+
+        # With a free seat, reactivating reserves it.
+        self.course.max_students = 2
+        self.course.save()
+        response = self.admin.patch(
+            f'/api/courses/enrollments/{Enrollment.objects.get(student=second).pk}/', {'is_active': True}, format='json',
+        )
+        self.assertEqual((response.status_code, response.data['is_active']), (200, True))
+        self.assertEqual(self.seats_taken(), 2)
+
+    def test_admin_create_reports_a_concurrent_duplicate(self):
+        payload = {'student': make_student(1).pk, 'course': self.course.pk}
+        with mock.patch('apps.courses.views.admit', side_effect=IntegrityError):
+            response = self.admin.post('/api/courses/enrollments/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.admin.post('/api/courses/enrollments/', payload, format='json').status_code, 201)
@@ -8,13 +8,18 @@ urlpatterns = [
     # Admin courses
     path('admin/', views.AdminCourseListCreateView.as_view(), name='admin-course-list-create'),
     path('admin/<int:pk>/', views.AdminCourseDetailView.as_view(), name='admin-course-detail'),
+    path('admin/<int:pk>/waitlist/', views.AdminCourseWaitlistView.as_view(), name='admin-course-waitlist'),
 
     # Admin enrollments
     path('enrollments/', views.AdminEnrollmentListCreateView.as_view(), name='admin-enrollment-list'),
+    path('enrollments/bulk/', views.AdminBulkEnrollmentView.as_view(), name='admin-enrollment-bulk'),
+    path('enrollments/bulk-assign-teacher/', views.AdminBulkAssignTeacherView.as_view(), name='bulk-assign-teacher'),
+    path('enrollments/auto-assign/', views.AdminAutoAssignTeachersView.as_view(), name='auto-assign-teachers'),
     path('enrollments/<int:pk>/', views.AdminEnrollmentDetailView.as_view(), name='admin-enrollment-detail'),
     path('enrollments/<int:pk>/assign-teacher/', views.AdminAssignTeacherView.as_view(), name='assign-teacher'),
 
     # Student
+    path('<int:pk>/enroll/', views.StudentCourseEnrollView.as_view(), name='course-enroll'),
     path('my-enrollments/', views.StudentEnrollmentView.as_view(), name='my-enrollments'),
 
     # Teacher
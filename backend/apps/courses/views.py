@@ -1,41 +1,53 @@
+from django.db import IntegrityError
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter
 
-from .models import Course, Enrollment
+from .admission import WAITLISTED, admit, waitlist_position
+from .models import Course, Enrollment, WaitlistEntry
 from .serializers import (
     CourseSerializer,
     EnrollmentStudentSerializer,
     EnrollmentAdminSerializer,
     CreateEnrollmentSerializer,
     AssignTeacherSerializer,
+    BulkEnrollmentSerializer,
+    BulkAssignTeacherSerializer,
+    AutoAssignTeachersSerializer,
+    WaitlistEntrySerializer,
 )
 from apps.accounts.permissions import IsAdminUser, IsTeacherUser, IsStudentUser, IsAdminOrTeacher
+from apps.accounts.search import IndexedSearchFilter
+from core.pagination import OptionalCursorPagination
+from core.response_cache import VersionedCacheMixin
+from core.sparse_fields import SparseFieldsetMixin
+from core.values_serializers import ValuesListMixin
 
 
-class PublicCourseListView(generics.ListAPIView):
-    """GET /api/courses/ — Public list of active courses."""
+class PublicCourseListView(VersionedCacheMixin, SparseFieldsetMixin, generics.ListAPIView):
+    """GET /api/courses/ — Public list of active courses, served from the versioned response cache."""
     serializer_class = CourseSerializer
     permission_classes = [permissions.AllowAny]
-    queryset = Course.objects.filter(is_active=True)
+    cache_models = ['courses.Course', 'courses.Enrollment', 'accounts.User']
+    queryset = Course.objects.filter(is_active=True).select_related('created_by')
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_fields = ['course_type', 'level']
     search_fields = ['title', 'description']
 
 
-class AdminCourseListCreateView(generics.ListCreateAPIView):
+class AdminCourseListCreateView(SparseFieldsetMixin, generics.ListCreateAPIView):
     """Admin: list all courses or create new one."""
     serializer_class = CourseSerializer
     permission_classes = [IsAdminUser]
-    queryset = Course.objects.all()
+    queryset = Course.objects.all().select_related('created_by')
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
-class AdminCourseDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AdminCourseDetailView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Admin: retrieve, update, or delete a specific course."""
     serializer_class = CourseSerializer
     permission_classes = [IsAdminUser]
@@ -44,10 +56,23 @@ class AdminCourseDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # ─────────────────────────── ENROLLMENT VIEWS ─────────────────────────────── #
 
-class AdminEnrollmentListCreateView(generics.ListCreateAPIView):
+def admission_response(admission, obj):
+    """201 with the enrollment, or 202 with the waitlist entry and its position."""
+    if admission == WAITLISTED:
+        return Response({
+            'status': WAITLISTED,
+            'position': waitlist_position(obj),
+            'waitlist_entry': WaitlistEntrySerializer(obj).data,
+        }, status=status.HTTP_202_ACCEPTED)
+    enrollment = Enrollment.objects.select_related('student', 'course', 'teacher').get(pk=obj.pk)
+    return Response(EnrollmentAdminSerializer(enrollment).data, status=status.HTTP_201_CREATED)
+
+
+class AdminEnrollmentListCreateView(SparseFieldsetMixin, ValuesListMixin, generics.ListCreateAPIView):
     """Admin: list all enrollments or enroll a student."""
     permission_classes = [IsAdminUser]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    pagination_class = OptionalCursorPagination
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
     filterset_fields = ['status', 'is_active', 'course', 'teacher']
     search_fields = ['student__full_name', 'student__email']
 
@@ -64,19 +89,43 @@ class AdminEnrollmentListCreateView(generics.ListCreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        enrollment = serializer.save()
-        return Response(
-            EnrollmentAdminSerializer(enrollment).data,
-            status=status.HTTP_201_CREATED
-        )
+        data = serializer.validated_data
+        try:
+            admission, obj = admit(
+                student_id=data['student'].pk,
+                course_id=data['course'].pk,
+                teacher_id=data['teacher'].pk if data.get('teacher') else None,
+                notes=data.get('notes', ''),
+            )
+        except IntegrityError:
+            # Enrolled or waitlisted by a concurrent request since validation.
+            return Response(
+                {'error': 'This student is already enrolled in or waiting for this course.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return admission_response(admission, obj)
 
 
-class AdminEnrollmentDetailView(generics.RetrieveUpdateDestroyAPIView):
-    """Admin: retrieve, update, or delete a specific enrollment."""
+class AdminEnrollmentDetailView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    Admin: retrieve, update, or delete a specific enrollment.
+    Reactivating it in a full course leaves it inactive and answers 202
+    with the student's new waitlist entry, as enrolling does.
+    """
     serializer_class = EnrollmentAdminSerializer
     permission_classes = [IsAdminUser]
     queryset = Enrollment.objects.all().select_related('student', 'course', 'teacher')
 
+    def perform_update(self, serializer):
+        serializer.save()
+        self.waitlist_entry = serializer.waitlist_entry
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        if self.waitlist_entry is not None:
+            return admission_response(WAITLISTED, self.waitlist_entry)
+        return response
+
 
 class AdminAssignTeacherView(APIView):
     """
@@ -100,7 +149,100 @@ class AdminAssignTeacherView(APIView):
         })
 
 
-class StudentEnrollmentView(generics.ListAPIView):
+class AdminBulkEnrollmentView(APIView):
+    """
+    POST /api/courses/enrollments/bulk/
+    Admin enrolls many students at once: {"enrollments": [{student, course, teacher, notes}, ...]}.
+    Returns a result for every item.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        from .bulk import bulk_enroll
+
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = bulk_enroll(serializer.validated_data['enrollments'])
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
+
+class AdminBulkAssignTeacherView(APIView):
+    """
+    POST /api/courses/enrollments/bulk-assign-teacher/
+    Admin assigns teachers to many enrollments at once: {"assignments": [{enrollment, teacher}, ...]}.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        from .bulk import bulk_assign_teachers
+
+        serializer = BulkAssignTeacherSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = bulk_assign_teachers(serializer.validated_data['assignments'])
+        return Response(report, status=status.HTTP_200_OK if report['updated'] else status.HTTP_400_BAD_REQUEST)
+
+
+class AdminAutoAssignTeachersView(APIView):
+    """
+    POST /api/courses/enrollments/auto-assign/
+    Admin plans teachers for every unassigned enrollment (optionally one `course`),
+    balancing teacher load and preferred time slots.
+    Dry run by default; send `"apply": true` to save the plan. Applying
+    without a teacher cap (TEACHER_MAX_ACTIVE_STUDENTS = 0) also needs
+    `"allow_uncapped": true`.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        from .assignment import auto_assign
+
+        serializer = AutoAssignTeachersSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        plan = auto_assign(
+            course_id=serializer.validated_data.get('course'),
+            apply=serializer.validated_data['apply'],
+            allow_uncapped=serializer.validated_data['allow_uncapped'],
+        )
+        return Response({'applied': serializer.validated_data['apply'], **plan})
+
+
+class AdminCourseWaitlistView(generics.ListAPIView):
+    """
+    GET /api/courses/admin/<id>/waitlist/
+    Admin views a course's waitlist in queue order.
+    """
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        return WaitlistEntry.objects.filter(
+            course_id=self.kwargs['pk']
+        ).select_related('student', 'course')
+
+
+class StudentCourseEnrollView(APIView):
+    """
+    POST /api/courses/<id>/enroll/
+    Student takes a seat in an active course, or joins its waitlist when it is full.
+    """
+    permission_classes = [IsStudentUser]
+
+    def post(self, request, pk):
+        course = Course.objects.filter(pk=pk, is_active=True).only('id').first()
+        if course is None:
+            return Response({'error': 'Course not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if Enrollment.objects.filter(student_id=request.user.pk, course=course).exists():
+            return Response({'error': 'You are already enrolled in this course.'}, status=status.HTTP_400_BAD_REQUEST)
+        if WaitlistEntry.objects.filter(student_id=request.user.pk, course=course).exists():
+            return Response({'error': 'You are already on the waitlist for this course.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            admission, obj = admit(student_id=request.user.pk, course_id=course.pk)
+        except IntegrityError:
+            return Response({'error': 'You are already enrolled in this course.'}, status=status.HTTP_400_BAD_REQUEST)
+        return admission_response(admission, obj)
+
+
+class StudentEnrollmentView(SparseFieldsetMixin, generics.ListAPIView):
     """
     GET /api/courses/my-enrollments/
     Student views their own enrollments with course and teacher info.
@@ -112,10 +254,10 @@ class StudentEnrollmentView(generics.ListAPIView):
         return Enrollment.objects.filter(
             student=self.request.user,
             is_active=True
-        ).select_related('course', 'teacher')
+        ).select_related('course', 'course__created_by', 'teacher')
 
 
-class TeacherEnrollmentView(generics.ListAPIView):
+class TeacherEnrollmentView(SparseFieldsetMixin, ValuesListMixin, generics.ListAPIView):
     """
     GET /api/courses/my-students/
     Teacher views all students assigned to them.
@@ -2,14 +2,19 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from core.loaded_state import LoadedStateMixin
+
 User = get_user_model()
 
 
-class Subscription(models.Model):
+class Subscription(LoadedStateMixin, models.Model):
     """
     Tracks a student's monthly subscription status.
     """
 
+    # Previous values for the dashboard stats deltas (apps/analytics/signals.py).
+    loaded_state_fields = ('status',)
+
     class Status(models.TextChoices):
         ACTIVE = 'active', 'Active'
         EXPIRED = 'expired', 'Expired'
@@ -35,6 +40,9 @@ class Subscription(models.Model):
         verbose_name = 'Subscription'
         verbose_name_plural = 'Subscriptions'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status'], name='subscriptions_status_idx'),
+        ]
 
     def __str__(self):
         return f"Subscription: {self.student.full_name} ({self.status})"
@@ -50,12 +58,15 @@ class Subscription(models.Model):
         return 0
 
 
-class Payment(models.Model):
+class Payment(LoadedStateMixin, models.Model):
     """
     Individual payment records for subscriptions.
     Structured to support real payment gateway integration.
     """
 
+    # Previous values for the dashboard stats deltas (apps/analytics/signals.py).
+    loaded_state_fields = ('status', 'amount', 'payment_date')
+
     class Status(models.TextChoices):
         PENDING = 'pending', 'Pending'
         COMPLETED = 'completed', 'Completed'
@@ -97,6 +108,14 @@ class Payment(models.Model):
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
         ordering = ['-payment_date']
+        indexes = [
+            # Keyset pagination (core/pagination.py) seeks on (ordering, id).
+            models.Index(fields=['payment_date', 'id'], name='payments_date_id_idx'),
+            # Revenue totals and the monthly breakdown over completed payments.
+            models.Index(fields=['status', 'payment_date'], name='payments_status_date_idx'),
+            # Student payment history.
+            models.Index(fields=['student', '-payment_date'], name='payments_student_date_idx'),
+        ]
 
     def __str__(self):
         return f"Payment ₹{self.amount} by {self.student.full_name} ({self.status})"
@@ -1,9 +1,12 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Sum, Count
 from django.conf import settings
 
+from core.pagination import OptionalCursorPagination
+from core.sparse_fields import SparseFieldsetMixin
+from core.values_serializers import ValuesListMixin
+
 from .models import Subscription, Payment
 from .serializers import (
     SubscriptionSerializer,
@@ -54,9 +57,10 @@ class StudentSubscriptionView(generics.RetrieveAPIView):
             raise NotFound('No active subscription found.')
 
 
-class AdminPaymentListCreateView(generics.ListCreateAPIView):
+class AdminPaymentListCreateView(SparseFieldsetMixin, ValuesListMixin, generics.ListCreateAPIView):
     """Admin: list all payments or record a new payment."""
     permission_classes = [IsAdminUser]
+    pagination_class = OptionalCursorPagination
     queryset = Payment.objects.all().select_related('student', 'subscription')
 
     def get_serializer_class(self):
@@ -74,10 +78,11 @@ class AdminPaymentListCreateView(generics.ListCreateAPIView):
         )
 
 
-class StudentPaymentHistoryView(generics.ListAPIView):
+class StudentPaymentHistoryView(SparseFieldsetMixin, ValuesListMixin, generics.ListAPIView):
     """Student: view their own payment history."""
     serializer_class = PaymentSerializer
     permission_classes = [IsStudentUser]
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
         return Payment.objects.filter(student=self.request.user)
@@ -91,31 +96,24 @@ class AdminRevenueReportView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-
-        total_revenue = Payment.objects.filter(
-            status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        monthly_breakdown = (
-            Payment.objects
-            .filter(status='completed')
-            .extra(select={'month': "strftime('%%Y-%%m', payment_date)"})
-            .values('month')
-            .annotate(total=Sum('amount'), count=Count('id'))
-            .order_by('-month')[:12]
-        )
+        from apps.analytics.models import StatsSnapshot, MonthlyRevenue
 
-        active_students = User.objects.filter(role='student', is_active=True).count()
-        active_subscriptions = Subscription.objects.filter(status='active').count()
+        stats = StatsSnapshot.load()
+        active_students = stats.total_students
+        monthly_breakdown = [
+            {'month': row.month.strftime('%Y-%m'), 'total': row.total, 'count': row.payments}
+            for row in MonthlyRevenue.objects.all()[:12]
+        ]
 
         return Response({
-            'total_revenue_inr': float(total_revenue),
-            'active_subscriptions': active_subscriptions,
+            'total_revenue_inr': float(stats.total_revenue),
+            'active_subscriptions': stats.active_subscriptions,
             'active_students': active_students,
             'monthly_revenue_inr': float(active_students * settings.SUBSCRIPTION_PRICE_INR),
             'teacher_payouts_inr': float(active_students * settings.TEACHER_EARNING_PER_STUDENT),
             'platform_profit_inr': float(active_students * settings.PLATFORM_PROFIT_PER_STUDENT),
-            'monthly_breakdown': list(monthly_breakdown),
+            'monthly_breakdown': monthly_breakdown,
+            'stats_updated_at': stats.updated_at,
+            'stats_verified_at': stats.verified_at,
+            'stats_age_seconds': stats.age_seconds,
         })
@@ -5,3 +5,6 @@ class SchedulesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.schedules'
     verbose_name = 'Schedules'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,115 @@
+"""
+Free teaching windows across all available teachers.
+
+Two queries load everything: the available teachers with their active
+student counts, and the active schedules inside the requested time slot for
+those teachers (plus the student's own classes when a student is given, so
+windows they are already busy in are left out).
+
+Each teacher and day is then a sweep line over the busy intervals sorted by
+start: a cursor walks from the start of the slot, every gap of at least
+`duration` minutes before the next busy interval is a free window, and the
+cursor jumps to that interval's end. Times are minutes after midnight, so
+hundreds of teachers take a few milliseconds once the rows are loaded.
+
+Teachers are ranked by current load (active students), then by how much
+free time they have in the slot.
+"""
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+
+from apps.accounts.models import TeacherProfile
+
+from .models import Schedule
+
+# The hours behind the Schedule.TimeSlot labels.
+SLOT_RANGES = {
+    Schedule.TimeSlot.MORNING: (datetime.time(6), datetime.time(12)),
+    Schedule.TimeSlot.EVENING: (datetime.time(12), datetime.time(18)),
+    Schedule.TimeSlot.NIGHT: (datetime.time(18), datetime.time(22)),
+}
+ALL_DAYS = tuple(Schedule.DayOfWeek.values)
+
+
+def slot_for(start_time):
+    """The TimeSlot whose hours contain `start_time`, or None."""
+    return next((slot for slot, (opens, closes) in SLOT_RANGES.items() if opens <= start_time < closes), None)
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def to_time(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def free_windows(busy, opens, closes, duration):
+    """Gaps of at least `duration` in [opens, closes) around busy (start, end) pairs sorted by start."""
+    windows, cursor = [], opens
+    for start, end in busy:
+        if start - cursor >= duration:
+            windows.append((cursor, start))
+        cursor = max(cursor, end)
+        if cursor >= closes:
+            return windows
+    if closes - cursor >= duration:
+        windows.append((cursor, closes))
+    return windows
+
+
+def teacher_availability(time_slot, duration, days=ALL_DAYS, student_id=None):
+    """
+    Teachers with at least one free window of `duration` minutes in
+    `time_slot`, best first: [{teacher, teacher_name, active_students,
+    free_minutes, windows: [{day_of_week, start_time, end_time}]}].
+    """
+    slot_start, slot_end = SLOT_RANGES[time_slot]
+    opens, closes = to_minutes(slot_start), to_minutes(slot_end)
+
+    teachers = TeacherProfile.objects.filter(is_available=True, user__is_active=True)
+    loads = {
+        teacher_id: (name, load)
+        for teacher_id, name, load in teachers.with_student_counts().order_by().values_list(
+            'user_id', 'user__full_name', 'active_student_count',
+        )
+        if not settings.TEACHER_MAX_ACTIVE_STUDENTS or load < settings.TEACHER_MAX_ACTIVE_STUDENTS
+    }
+
+    people = Q(teacher_id__in=teachers.values('user_id'))
+    if student_id is not None:
+        people |= Q(student_id=student_id)
+    busy = defaultdict(list)
+    student_busy = defaultdict(list)
+    for teacher_id, student, day, start, end in Schedule.objects.filter(
+        people, is_active=True, day_of_week__in=days, start_time__lt=slot_end, end_time__gt=slot_start,
+    ).order_by().values_list('teacher_id', 'student_id', 'day_of_week', 'start_time', 'end_time'):
+        interval = (to_minutes(start), to_minutes(end))
+        busy[teacher_id, day].append(interval)
+        if student_id is not None and student == student_id:
+            student_busy[day].append(interval)
+
+    results = []
+    for teacher_id, (name, load) in loads.items():
+        windows = []
+        for day in days:
+            intervals = sorted(busy.get((teacher_id, day), []) + student_busy.get(day, []))
+            windows += [
+                {'day_of_week': day, 'start_time': to_time(start), 'end_time': to_time(end)}
+                for start, end in free_windows(intervals, opens, closes, duration)
+            ]
+        if windows:
+            results.append({
+                'teacher': teacher_id,
+                'teacher_name': name,
+                'active_students': load,
+                'free_minutes': sum(
+                    to_minutes(window['end_time']) - to_minutes(window['start_time']) for window in windows
+                ),
+                'windows': windows,
+            })
+    results.sort(key=lambda row: (row['active_students'], -row['free_minutes'], row['teacher']))
+    return results
@@ -0,0 +1,154 @@
+"""
+Bulk timetable generation from enrollments.
+
+One request applies a weekly pattern ([{day_of_week, start_time, end_time}])
+to many enrollments. Each enrollment supplies its own teacher and student.
+The enrollments are loaded with one IN query. The existing classes of every
+teacher and student involved, on the pattern's days, are loaded with one
+more query into a TimetableIndex (conflicts.py). Each new row is checked
+against that index and then added to it, so rows in the same request are
+checked against each other too.
+
+The batch is all-or-nothing by default: if any row fails, nothing is
+created and the per-row report says why (rows that passed are 'skipped').
+With partial=True every row that passes is created and only the failures
+are left out. Either way the rows are inserted with a single bulk_create
+inside one transaction. bulk_create skips model signals, so the calendar
+caches of the affected teachers and students are invalidated here.
+"""
+from django.db import IntegrityError, transaction
+
+from apps.courses.models import Enrollment
+
+from .calendar import bump_calendars
+from .conflicts import OVERLAP_CONSTRAINTS, STUDENT, TEACHER, TimetableIndex, conflict_messages
+from .models import Schedule
+
+
+class BulkScheduleResult:
+    def __init__(self):
+        self.results = []
+
+    def add(self, enrollment_id, pattern_index):
+        entry = {'index': len(self.results), 'enrollment': enrollment_id, 'pattern': pattern_index}
+        self.results.append(entry)
+        return entry
+
+    def ok(self, entry, schedule_id):
+        entry.update(status='created', schedule=schedule_id)
+
+    def error(self, entry, errors):
+        entry.update(status='error', errors=errors)
+
+    def skip(self, entry):
+        entry.update(status='skipped')
+
+    def count(self, status):
+        return sum(1 for entry in self.results if entry.get('status') == status)
+
+    def as_dict(self):
+        return {
+            'created': self.count('created'),
+            'failed': self.count('error'),
+            'skipped': self.count('skipped'),
+            'results': self.results,
+        }
+
+
+def bulk_create_schedules(enrollment_ids, pattern, notes='', partial=False):
+    """
+    Create one schedule per enrollment and pattern row; unless partial is
+    set, create none of them when any row fails. Returns {'created',
+    'failed', 'skipped', 'results'}; results are in enrollment order, with
+    the pattern rows of each enrollment in order.
+    """
+    result = BulkScheduleResult()
+    enrollment_ids = list(dict.fromkeys(enrollment_ids))
+    enrollments = {
+        row['id']: row for row in Enrollment.objects.filter(pk__in=enrollment_ids).order_by().values(
+            'id', 'student_id', 'teacher_id', 'is_active',
+        )
+    }
+    index = TimetableIndex.load(
+        teacher_ids={row['teacher_id'] for row in enrollments.values() if row['teacher_id']},
+        student_ids={row['student_id'] for row in enrollments.values()},
+        days={item['day_of_week'] for item in pattern},
+    )
+
+    pending = []
+    for enrollment_id in enrollment_ids:
+        enrollment = enrollments.get(enrollment_id)
+        errors = None
+        if enrollment is None:
+            errors = {'enrollment': ['Enrollment not found.']}
+        elif not enrollment['is_active']:
+            errors = {'enrollment': ['This enrollment is not active.']}
+        elif enrollment['teacher_id'] is None:
+            errors = {'enrollment': ['This enrollment has no teacher assigned yet.']}
+        for pattern_index, item in enumerate(pattern):
+            entry = result.add(enrollment_id, pattern_index)
+            if errors:
+                result.error(entry, errors)
+                continue
+            args = (
+                enrollment['teacher_id'], enrollment['student_id'],
+                item['day_of_week'], item['start_time'], item['end_time'],
+            )
+            conflicts = index.conflicts(*args)
+            if conflicts:
+                result.error(entry, {'non_field_errors': conflict_messages(conflicts)})
+                continue
+            index.add(*args, item=entry['index'])
+            pending.append((entry, Schedule(
+                enrollment_id=enrollment_id,
+                teacher_id=enrollment['teacher_id'],
+                student_id=enrollment['student_id'],
+                day_of_week=item['day_of_week'],
+                time_slot=item['time_slot'],
+                start_time=item['start_time'],
+                end_time=item['end_time'],
+                notes=notes,
+            )))
+
+    if result.count('error') and not partial:
+        for entry, _ in pending:
+            result.skip(entry)
+    elif pending:
+        try:
+            with transaction.atomic():
+                created = Schedule.objects.bulk_create([schedule for _, schedule in pending])
+                bump_calendars(TEACHER, {schedule.teacher_id for schedule in created})
+                bump_calendars(STUDENT, {schedule.student_id for schedule in created})
+        except IntegrityError:
+            # Another write booked one of these times after validation (the
+            # PostgreSQL exclusion constraints); save row by row instead.
+            save_each(result, pending, partial)
+        else:
+            for (entry, _), schedule in zip(pending, created):
+                result.ok(entry, schedule.pk)
+    return result.as_dict()
+
+
+def save_each(result, pending, partial):
+    """Save the rows one by one, reporting clashes; roll all back on a clash unless partial."""
+    with transaction.atomic():
+        saved = []
+        for entry, schedule in pending:
+            try:
+                with transaction.atomic():
+                    schedule.save()
+            except IntegrityError as exc:
+                role = next((role for name, role in OVERLAP_CONSTRAINTS.items() if name in str(exc)), None)
+                if role is None:
+                    raise
+                result.error(entry, {'non_field_errors': [f'The {role} already has a class at this time.']})
+            else:
+                saved.append((entry, schedule))
+        if not partial and len(saved) < len(pending):
+            # Rolled back with the saves, so their on_commit bumps never run.
+            transaction.set_rollback(True)
+            for entry, _ in saved:
+                result.skip(entry)
+            return
+        for entry, schedule in saved:
+            result.ok(entry, schedule.pk)
@@ -0,0 +1,213 @@
+"""
+Concrete class dates from weekly schedules.
+
+A Schedule is a weekly pattern (day_of_week, start_time, end_time) in the
+school's zone, settings.TIME_ZONE. The calendar expands active patterns into
+dated occurrences for a range and merges in the Zoom meetings that fall
+inside it. The result is in the zone the client asks for, in time order.
+
+Expanded weeks are cached per teacher and week. Each teacher and student
+has a calendar version counter (core.response_cache) that is bumped when
+one of their schedules or meetings changes, so a change orphans only that
+person's cached weeks and feeds. A bump reaches other workers only through
+a shared cache, so without one (settings.SHARED_CACHE) weeks are expanded
+on every request. Cold weeks for any number of teachers cost one query.
+
+The response is streamed. Occurrences are produced by generators and
+written out in batches, so a month for a busy teacher is never built up as
+one big list. Only the small per-week blocks are in memory.
+"""
+import datetime
+import heapq
+import json
+from collections import defaultdict
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.zoom_meetings.models import ZoomMeeting
+from core.response_cache import bump_version, model_versions
+
+from .conflicts import STUDENT, TEACHER
+from .models import Schedule
+
+User = get_user_model()
+
+WEEK_KEY = 'calendar:week:{}:{}:{}'
+STREAM_BATCH = 200
+# The people whose calendars a schedule or meeting appears in.
+CALENDAR_PEOPLE = ('teacher_id', 'student_id')
+
+
+def calendar_label(role, person_id):
+    return f'calendar:{role}:{person_id}'
+
+
+def person_label(user_id):
+    """Bumped when the user's account changes; feeds that show their name depend on it."""
+    return f'calendar:person:{user_id}'
+
+
+def course_label(course_id):
+    """Bumped when the course changes; feeds that show its title depend on it."""
+    return f'calendar:course:{course_id}'
+
+
+def bump_calendars(role, person_ids):
+    """Drop the cached calendars of these teachers or students once the current write commits."""
+    for person_id in {person_id for person_id in person_ids if person_id is not None}:
+        bump_version(calendar_label(role, person_id))
+
+
+def stored_people(instance):
+    """The row's teacher and student as stored ({} for a new row); call before the write."""
+    return instance.loaded_state(CALENDAR_PEOPLE) or {}
+
+
+def bump_people_calendars(instance, stored):
+    """Bump the calendars of the row's teacher and student, and of the ones it was moved from."""
+    bump_calendars(TEACHER, [instance.teacher_id, stored.get('teacher_id')])
+    bump_calendars(STUDENT, [instance.student_id, stored.get('student_id')])
+
+
+def school_zone():
+    return ZoneInfo(settings.TIME_ZONE)
+
+
+def week_start(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def expand_week(patterns, monday):
+    """One teacher's patterns as (date, start, end, schedule, teacher, student, enrollment), sorted."""
+    return sorted(
+        (
+            monday + datetime.timedelta(days=row['day_of_week']), row['start_time'], row['end_time'],
+            row['id'], row['teacher_id'], row['student_id'], row['enrollment_id'],
+        )
+        for row in patterns
+    )
+
+
+def week_blocks(teacher_ids, mondays):
+    """{(teacher_id, monday): expanded week}, from the cache or one query for the misses."""
+    versions = dict(zip(teacher_ids, model_versions([calendar_label(TEACHER, teacher_id) for teacher_id in teacher_ids])))
+    keys = {
+        (teacher_id, monday): WEEK_KEY.format(teacher_id, monday.isoformat(), versions[teacher_id])
+        for teacher_id in teacher_ids for monday in mondays
+    }
+    blocks = cache.get_many(keys.values()) if settings.SHARED_CACHE else {}
+    missing = {teacher_id for (teacher_id, _), key in keys.items() if key not in blocks}
+    if missing:
+        patterns = defaultdict(list)
+        for row in Schedule.objects.filter(is_active=True, teacher_id__in=missing).order_by().values(
+            'id', 'teacher_id', 'student_id', 'enrollment_id', 'day_of_week', 'start_time', 'end_time',
+        ):
+            patterns[row['teacher_id']].append(row)
+        fresh = {
+            key: expand_week(patterns[teacher_id], monday)
+            for (teacher_id, monday), key in keys.items() if key not in blocks
+        }
+        if settings.SHARED_CACHE:
+            cache.set_many(fresh, timeout=settings.CALENDAR_CACHE_SECONDS)
+        blocks.update(fresh)
+    return {pair: blocks[key] for pair, key in keys.items()}
+
+
+class CalendarRange:
+    """A [start, end] range of dates in the viewer's zone, with the scope to expand."""
+
+    def __init__(self, start, end, zone, teacher_ids, student_id=None, meetings=None):
+        self.zone = zone
+        self.starts_at = datetime.datetime.combine(start, datetime.time.min, tzinfo=zone)
+        self.ends_at = datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min, tzinfo=zone)
+        self.teacher_ids = sorted(teacher_ids)
+        self.student_id = student_id
+        self.meetings = (meetings if meetings is not None else ZoomMeeting.objects.none()).filter(
+            is_active=True, scheduled_at__gte=self.starts_at, scheduled_at__lt=self.ends_at,
+        ).order_by('scheduled_at', 'id')
+        # School-zone dates may differ from the viewer's by a day at either end.
+        school = school_zone()
+        first = self.starts_at.astimezone(school).date()
+        last = self.ends_at.astimezone(school).date()
+        monday, self.mondays = week_start(first), []
+        while monday <= last:
+            self.mondays.append(monday)
+            monday += datetime.timedelta(days=7)
+        self.blocks = week_blocks(self.teacher_ids, self.mondays)
+        self.names = self.load_names()
+
+    def load_names(self):
+        user_ids = set(self.teacher_ids)
+        for block in self.blocks.values():
+            user_ids.update(occurrence[5] for occurrence in block)
+        for teacher_id, student_id in self.meetings.values_list('teacher_id', 'student_id').iterator():
+            user_ids.update((teacher_id, student_id))
+        user_ids.discard(None)
+        return dict(User.objects.filter(pk__in=user_ids).values_list('id', 'full_name'))
+
+    def classes(self):
+        school = school_zone()
+        for monday in self.mondays:
+            for day, start_time, end_time, schedule_id, teacher_id, student_id, enrollment_id in heapq.merge(
+                *(self.blocks[teacher_id, monday] for teacher_id in self.teacher_ids)
+            ):
+                if self.student_id is not None and student_id != self.student_id:
+                    continue
+                starts_at = datetime.datetime.combine(day, start_time, tzinfo=school)
+                if not self.starts_at <= starts_at < self.ends_at:
+                    continue
+                yield starts_at, {
+                    'type': 'class',
+                    'schedule': schedule_id,
+                    'enrollment': enrollment_id,
+                    'teacher': teacher_id,
+                    'teacher_name': self.names.get(teacher_id),
+                    'student': student_id,
+                    'student_name': self.names.get(student_id),
+                    'start': starts_at.astimezone(self.zone),
+                    'end': datetime.datetime.combine(day, end_time, tzinfo=school).astimezone(self.zone),
+                }
+
+    def zoom_meetings(self):
+        rows = self.meetings.values(
+            'id', 'title', 'meeting_type', 'zoom_link', 'zoom_password', 'teacher_id', 'student_id',
+            'scheduled_at', 'duration_minutes',
+        )
+        for row in rows.iterator(chunk_size=STREAM_BATCH):
+            starts_at = row['scheduled_at']
+            yield starts_at, {
+                'type': 'meeting',
+                'meeting': row['id'],
+                'title': row['title'],
+                'meeting_type': row['meeting_type'],
+                'zoom_link': row['zoom_link'],
+                'zoom_password': row['zoom_password'],
+                'teacher': row['teacher_id'],
+                'teacher_name': self.names.get(row['teacher_id']),
+                'student': row['student_id'],
+                'student_name': self.names.get(row['student_id']),
+                'start': starts_at.astimezone(self.zone),
+                'end': (starts_at + datetime.timedelta(minutes=row['duration_minutes'])).astimezone(self.zone),
+            }
+
+    def occurrences(self):
+        """Classes and meetings, merged in start-time order."""
+        for _, occurrence in heapq.merge(self.classes(), self.zoom_meetings(), key=lambda pair: pair[0]):
+            yield occurrence
+
+    def stream(self, header):
+        """The JSON document {**header, "occurrences": [...]}, in chunks."""
+        yield json.dumps(header, cls=DjangoJSONEncoder)[:-1] + ', "occurrences": ['
+        batch, separator = [], ''
+        for occurrence in self.occurrences():
+            batch.append(json.dumps(occurrence, cls=DjangoJSONEncoder))
+            if len(batch) == STREAM_BATCH:
+                yield separator + ', '.join(batch)
+                batch, separator = [], ', '
+        if batch:
+            yield separator + ', '.join(batch)
+        yield ']}'
@@ -0,0 +1,144 @@
+"""
+Double-booking detection for weekly schedules.
+
+Two active schedules conflict when they share a teacher or a student, fall on
+the same day_of_week and their [start_time, end_time) ranges overlap.
+Back-to-back classes (one ends at 18:00, the next starts at 18:00) are fine.
+
+A single create or update runs one range query. The partial
+(teacher|student, day_of_week, start_time) indexes narrow it to that
+person's classes that day starting before the new end time.
+
+A whole proposed timetable is checked with TimetableIndex. The existing
+classes of every teacher and student involved are loaded with one query
+into per-person, per-day lists sorted by start time. Each proposed row is
+then checked with a bisect and added, so rows in the same proposal are
+checked against each other too.
+
+On PostgreSQL the same rule is enforced by two exclusion constraints
+(migration 0003), which also close the race between check and insert.
+"""
+import bisect
+from collections import defaultdict
+
+from django.db.models import Q
+
+from .models import Schedule
+
+TEACHER = 'teacher'
+STUDENT = 'student'
+# Exclusion constraints added by migration 0003 (PostgreSQL only).
+OVERLAP_CONSTRAINTS = {
+    'schedule_teacher_no_overlap': TEACHER,
+    'schedule_student_no_overlap': STUDENT,
+}
+
+
+def overlapping(day_of_week, start_time, end_time):
+    return Schedule.objects.filter(
+        is_active=True, day_of_week=day_of_week, start_time__lt=end_time, end_time__gt=start_time,
+    )
+
+
+def find_conflicts(teacher_id, student_id, day_of_week, start_time, end_time, exclude_pk=None):
+    """Active schedules that would double-book the teacher or the student."""
+    conflicts = overlapping(day_of_week, start_time, end_time).filter(
+        Q(teacher_id=teacher_id) | Q(student_id=student_id)
+    )
+    if exclude_pk is not None:
+        conflicts = conflicts.exclude(pk=exclude_pk)
+    return [
+        conflict_entry(TEACHER if row['teacher_id'] == teacher_id else STUDENT, row)
+        for row in conflicts.order_by('start_time').values(
+            'id', 'teacher_id', 'student_id', 'day_of_week', 'start_time', 'end_time',
+        )
+    ]
+
+
+def conflict_entry(role, row):
+    return {
+        'role': role,
+        'schedule': row['id'],
+        'day_of_week': row['day_of_week'],
+        'start_time': row['start_time'],
+        'end_time': row['end_time'],
+    }
+
+
+def conflict_messages(conflicts):
+    days = dict(Schedule.DayOfWeek.choices)
+    return [
+        f"The {entry['role']} already has a class on {days[entry['day_of_week']]} "
+        f"{entry['start_time']:%H:%M}-{entry['end_time']:%H:%M}"
+        + (f" (item {entry['item']} of this timetable)." if 'item' in entry else f" (schedule #{entry['schedule']}).")
+        for entry in conflicts
+    ]
+
+
+class TimetableIndex:
+    """Per-person, per-day interval lists sorted by start time."""
+
+    def __init__(self):
+        self.starts = defaultdict(list)
+        self.entries = defaultdict(list)
+
+    @classmethod
+    def load(cls, teacher_ids, student_ids, days=None, exclude_ids=()):
+        """Index the active schedules of these teachers and students, in one query."""
+        index = cls()
+        rows = Schedule.objects.filter(is_active=True).filter(
+            Q(teacher_id__in=teacher_ids) | Q(student_id__in=student_ids)
+        )
+        if days is not None:
+            rows = rows.filter(day_of_week__in=days)
+        if exclude_ids:
+            rows = rows.exclude(pk__in=exclude_ids)
+        for row in rows.order_by().values('id', 'teacher_id', 'student_id', 'day_of_week', 'start_time', 'end_time'):
+            index.add(row['teacher_id'], row['student_id'], row['day_of_week'],
+                      row['start_time'], row['end_time'], schedule_id=row['id'])
+        return index
+
+    def add(self, teacher_id, student_id, day_of_week, start_time, end_time, schedule_id=None, item=None):
+        entry = {
+            'schedule': schedule_id, 'day_of_week': day_of_week,
+            'start_time': start_time, 'end_time': end_time,
+        }
+        if item is not None:
+            entry['item'] = item
+        for key in ((TEACHER, teacher_id, day_of_week), (STUDENT, student_id, day_of_week)):
+            position = bisect.bisect_right(self.starts[key], start_time)
+            self.starts[key].insert(position, start_time)
+            self.entries[key].insert(position, entry)
+
+    def conflicts(self, teacher_id, student_id, day_of_week, start_time, end_time):
+        found = []
+        for key in ((TEACHER, teacher_id, day_of_week), (STUDENT, student_id, day_of_week)):
+            # Only intervals starting before end_time can overlap.
+            stop = bisect.bisect_left(self.starts[key], end_time)
+            found += [
+                {'role': key[0], **entry} for entry in self.entries[key][:stop]
+                if entry['end_time'] > start_time
+            ]
+        return found
+
+
+def check_timetable(items):
+    """
+    Validate proposed schedules ({teacher, student, day_of_week, start_time,
+    end_time, id?}) against the stored timetable and each other. An `id`
+    marks an update of that schedule, which is then not checked against its
+    old times. Returns one {'index', 'conflicts'} per item, in order.
+    """
+    index = TimetableIndex.load(
+        teacher_ids={item['teacher'] for item in items},
+        student_ids={item['student'] for item in items},
+        days={item['day_of_week'] for item in items},
+        exclude_ids={item['id'] for item in items if item.get('id')},
+    )
+    results = []
+    for position, item in enumerate(items):
+        args = (item['teacher'], item['student'], item['day_of_week'], item['start_time'], item['end_time'])
+        conflicts = index.conflicts(*args)
+        results.append({'index': position, 'conflicts': conflicts})
+        index.add(*args, schedule_id=item.get('id'), item=position)
+    return results
@@ -0,0 +1,246 @@
+"""
+iCalendar subscription feeds for teachers and students.
+
+Each user gets a secret feed URL (CalendarFeed.token) to add to a phone or
+desktop calendar. A weekly Schedule becomes one event with a weekly RRULE
+in the school's zone, so the feed stays small no matter how far ahead the
+calendar app looks. Zoom meetings become one-off events in UTC.
+
+Calendar apps poll every few minutes, so a poll usually costs no queries:
+
+* the token resolves to a user id through the cache. A rotated token is
+  then dropped for every worker;
+* the rendered feed is cached under the user's calendar versions (see
+  calendar.py), which are bumped only when one of their schedules or
+  meetings, or their own account, changes. Class titles also name the
+  course and the other person, so the entry records the versions of those
+  courses and people (person_label, course_label) and is rebuilt when one
+  of them has moved on;
+* ETag and Last-Modified come with the cached body, so an unchanged feed
+  is answered with 304 Not Modified.
+
+Both caches are used only when the cache is shared (settings.SHARED_CACHE,
+set by REDIS_URL). A per-process cache cannot be cleared or bumped from the
+other workers, so without one each poll checks the token with one indexed
+query and rebuilds the feed.
+
+A changed feed is rebuilt with four queries. Last-Modified is the latest
+updated_at of the rows in the feed. Deleting a row does not move that
+value, so when a rebuilt feed differs from the last one without a newer
+updated_at, the rebuild time is used instead.
+"""
+import datetime
+import hashlib
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from apps.zoom_meetings.models import ZoomMeeting
+from core.response_cache import model_versions
+
+from .calendar import calendar_label, course_label, person_label
+from .conflicts import STUDENT, TEACHER
+from .models import CalendarFeed, Schedule
+
+User = get_user_model()
+
+TOKEN_KEY = 'calendar:feed-token:{}'
+FEED_KEY = 'calendar:feed-entry:{}:{}'
+LAST_FEED_KEY = 'calendar:feed-last:{}'
+NO_USER = 0
+PRODID = '-//Bismi Academy//Timetable//EN'
+UID_DOMAIN = 'bismi-academy'
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+def token_key(token):
+    return TOKEN_KEY.format(hashlib.sha256(token.encode()).hexdigest())
+
+
+def lookup_token(token):
+    return CalendarFeed.objects.filter(token=token).values_list('user_id', flat=True).first() or NO_USER
+
+
+def feed_user_id(token):
+    """The user id behind a feed token, or None. Unknown tokens are cached too."""
+    if not settings.SHARED_CACHE:
+        return lookup_token(token) or None
+    key = token_key(token)
+    user_id = cache.get(key)
+    if user_id is None:
+        user_id = lookup_token(token)
+        # add(), so a lookup that raced a rotation cannot replace its tombstone.
+        cache.add(key, user_id, settings.CALENDAR_FEED_CACHE_SECONDS)
+    return user_id or None
+
+
+def forget_token(token):
+    cache.set(token_key(token), NO_USER, settings.CALENDAR_FEED_CACHE_SECONDS)
+
+
+def feed_dependencies(user_id):
+    """Version labels of the courses and people named in the user's class titles."""
+    labels = set()
+    for teacher_id, student_id, course_id in Schedule.objects.filter(
+        Q(teacher_id=user_id) | Q(student_id=user_id), is_active=True,
+    ).order_by().values_list('teacher_id', 'student_id', 'enrollment__course_id').distinct():
+        labels.add(person_label(student_id if teacher_id == user_id else teacher_id))
+        labels.add(course_label(course_id))
+    return sorted(labels)
+
+
+def get_feed(user_id):
+    """(etag, last_modified, body) for the user's feed, or None if the user cannot have one."""
+    if not settings.SHARED_CACHE:
+        return build_feed(user_id)
+    versions = model_versions([calendar_label(TEACHER, user_id), calendar_label(STUDENT, user_id)])
+    key = FEED_KEY.format(user_id, '.'.join(str(version) for version in versions))
+    cached = cache.get(key)
+    if cached is not None:
+        feed, labels, seen = cached
+        if model_versions(labels) == seen:
+            return feed or None
+    # Versions are read before the rows, so a rename that commits during the
+    # build leaves a newer version behind and the next poll rebuilds.
+    labels = feed_dependencies(user_id)
+    seen = model_versions(labels)
+    feed = build_feed(user_id) or ()
+    cache.set(key, (feed, labels, seen), settings.CALENDAR_FEED_CACHE_SECONDS)
+    return feed or None
+
+
+def build_feed(user_id):
+    user = User.objects.filter(pk=user_id, is_active=True).values('role', 'full_name').first()
+    if user is None:
+        return None
+    role = STUDENT if user['role'] == 'student' else TEACHER
+    other = TEACHER if role == STUDENT else STUDENT
+
+    schedules = list(Schedule.objects.filter(**{f'{role}_id': user_id}).order_by('id').values(
+        'id', 'day_of_week', 'start_time', 'end_time', 'is_active', 'created_at', 'updated_at',
+        'enrollment__course__title', f'{other}__full_name',
+    ))
+    since = timezone.now() - datetime.timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+    meetings = list(ZoomMeeting.objects.filter(**{f'{role}_id': user_id}, scheduled_at__gte=since).order_by(
+        'scheduled_at', 'id',
+    ).values(
+        'id', 'title', 'zoom_link', 'zoom_password', 'scheduled_at', 'duration_minutes', 'is_active', 'updated_at',
+    ))
+
+    stamps = [row['updated_at'] for row in schedules + meetings]
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape(user["full_name"])} - Bismi classes',
+        f'X-WR-TIMEZONE:{settings.TIME_ZONE}',
+        *vtimezone(ZoneInfo(settings.TIME_ZONE)),
+    ]
+    for row in schedules:
+        if row['is_active']:
+            lines += schedule_event(row, row[f'{other}__full_name'])
+    for row in meetings:
+        if row['is_active']:
+            lines += meeting_event(row)
+    lines.append('END:VCALENDAR')
+    body = ''.join(fold(line) + '\r\n' for line in lines).encode()
+
+    etag = quote_etag(hashlib.sha256(body).hexdigest())
+    last_modified = int(max(stamps).timestamp()) if stamps else 0
+    previous = cache.get(LAST_FEED_KEY.format(user_id))
+    if previous is not None and previous[0] != etag and last_modified <= previous[1]:
+        # Something was deleted or aged out of the window.
+        last_modified = int(timezone.now().timestamp())
+    cache.set(LAST_FEED_KEY.format(user_id), (etag, last_modified), None)
+    return etag, last_modified, body
+
+
+def schedule_event(row, other_name):
+    zone = ZoneInfo(settings.TIME_ZONE)
+    created = timezone.localtime(row['created_at'], zone).date()
+    first = created + datetime.timedelta(days=(row['day_of_week'] - created.weekday()) % 7)
+    title = row['enrollment__course__title']
+    return [
+        'BEGIN:VEVENT',
+        f'UID:schedule-{row["id"]}@{UID_DOMAIN}',
+        f'DTSTAMP:{utc_stamp(row["updated_at"])}',
+        f'LAST-MODIFIED:{utc_stamp(row["updated_at"])}',
+        f'DTSTART;TZID={settings.TIME_ZONE}:{datetime.datetime.combine(first, row["start_time"]):%Y%m%dT%H%M%S}',
+        f'DTEND;TZID={settings.TIME_ZONE}:{datetime.datetime.combine(first, row["end_time"]):%Y%m%dT%H%M%S}',
+        f'RRULE:FREQ=WEEKLY;BYDAY={WEEKDAYS[row["day_of_week"]]}',
+        f'SUMMARY:{escape(f"{title} with {other_name}")}',
+        'STATUS:CONFIRMED',
+        'END:VEVENT',
+    ]
+
+
+def meeting_event(row):
+    description = f'Join: {row["zoom_link"]}'
+    if row['zoom_password']:
+        description += f'\nPassword: {row["zoom_password"]}'
+    ends_at = row['scheduled_at'] + datetime.timedelta(minutes=row['duration_minutes'])
+    return [
+        'BEGIN:VEVENT',
+        f'UID:meeting-{row["id"]}@{UID_DOMAIN}',
+        f'DTSTAMP:{utc_stamp(row["updated_at"])}',
+        f'LAST-MODIFIED:{utc_stamp(row["updated_at"])}',
+        f'DTSTART:{utc_stamp(row["scheduled_at"])}',
+        f'DTEND:{utc_stamp(ends_at)}',
+        f'SUMMARY:{escape(row["title"])}',
+        f'LOCATION:{escape(row["zoom_link"])}',
+        f'URL:{row["zoom_link"]}',
+        f'DESCRIPTION:{escape(description)}',
+        'STATUS:CONFIRMED',
+        'END:VEVENT',
+    ]
+
+
+def vtimezone(zone):
+    # One STANDARD rule with the zone's current offset: exact for fixed-offset
+    # zones such as Asia/Kolkata. Calendar apps also resolve the IANA TZID.
+    now = datetime.datetime.now(zone)
+    offset = now.strftime('%z')
+    return [
+        'BEGIN:VTIMEZONE',
+        f'TZID:{zone.key}',
+        'BEGIN:STANDARD',
+        'DTSTART:19700101T000000',
+        f'TZOFFSETFROM:{offset}',
+        f'TZOFFSETTO:{offset}',
+        f'TZNAME:{now.tzname()}',
+        'END:STANDARD',
+        'END:VTIMEZONE',
+    ]
+
+
+def utc_stamp(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Split a content line into 75-octet pieces (RFC 5545 section 3.1)."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    pieces, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # do not split a UTF-8 character
+        pieces.append(encoded[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(pieces)
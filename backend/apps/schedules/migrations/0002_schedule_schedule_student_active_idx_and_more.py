@@ -0,0 +1,24 @@
+# Generated by Django 5.0.3 on 2026-10-18 09:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_enrollment_enroll_teacher_active_idx_and_more'),
+        ('schedules', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['student', 'day_of_week', 'start_time'], name='schedule_student_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['teacher', 'day_of_week', 'start_time'], name='schedule_teacher_active_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.3 on 2026-10-18 14:05
+
+from django.db import migrations
+
+# Times are placed on a fixed date so they can form a tsrange; '[)' bounds
+# let one class end exactly when the next one starts.
+PERIOD = "tsrange(DATE '2000-01-01' + start_time, DATE '2000-01-01' + end_time)"
+CONSTRAINTS = {
+    'schedule_teacher_no_overlap': 'teacher_id',
+    'schedule_student_no_overlap': 'student_id',
+}
+
+
+def add_exclusion_constraints(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    for name, column in CONSTRAINTS.items():
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT a.id, b.id FROM schedules a JOIN schedules b '
+                f'ON a.{column} = b.{column} AND a.day_of_week = b.day_of_week AND a.id < b.id '
+                f'AND a.start_time < b.end_time AND b.start_time < a.end_time '
+                f'WHERE a.is_active AND b.is_active LIMIT 20'
+            )
+            clashes = cursor.fetchall()
+        if clashes:
+            raise RuntimeError(
+                f'Cannot add {name}: these active schedules overlap: '
+                + ', '.join(f'#{a}/#{b}' for a, b in clashes)
+                + '. Deactivate or move them, then migrate again.'
+            )
+        schema_editor.execute(
+            f'ALTER TABLE schedules ADD CONSTRAINT {name} EXCLUDE USING gist '
+            f'({column} WITH =, day_of_week WITH =, {PERIOD} WITH &&) WHERE (is_active)'
+        )
+
+
+def drop_exclusion_constraints(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in CONSTRAINTS:
+        schema_editor.execute(f'ALTER TABLE schedules DROP CONSTRAINT IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0002_schedule_schedule_student_active_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_exclusion_constraints, drop_exclusion_constraints),
+    ]
@@ -1,15 +1,21 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from apps.courses.models import Enrollment
+from core.loaded_state import LoadedStateMixin
 
 User = get_user_model()
 
 
-class Schedule(models.Model):
+class Schedule(LoadedStateMixin, models.Model):
     """
     Represents a recurring class schedule for a student-teacher pair.
     """
 
+    # Previous teacher and student for the calendar invalidation (apps/schedules/calendar.py).
+    loaded_state_fields = ('teacher_id', 'student_id')
+
     class DayOfWeek(models.IntegerChoices):
         MONDAY = 0, 'Monday'
         TUESDAY = 1, 'Tuesday'
@@ -55,9 +61,48 @@ class Schedule(models.Model):
         verbose_name = 'Schedule'
         verbose_name_plural = 'Schedules'
         ordering = ['day_of_week', 'start_time']
+        indexes = [
+            # Student and teacher timetables: active rows in weekly order.
+            models.Index(
+                fields=['student', 'day_of_week', 'start_time'], condition=models.Q(is_active=True),
+                name='schedule_student_active_idx',
+            ),
+            models.Index(
+                fields=['teacher', 'day_of_week', 'start_time'], condition=models.Q(is_active=True),
+                name='schedule_teacher_active_idx',
+            ),
+        ]
 
     def __str__(self):
         return (
             f"{self.get_day_of_week_display()} {self.start_time} - "
             f"{self.student.full_name} with {self.teacher.full_name}"
         )
+
+
+def new_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeed(models.Model):
+    """
+    Secret token for a user's iCalendar subscription URL. Calendar apps
+    cannot send a JWT, so the token in the URL is the credential; rotating
+    it cuts off every app subscribed with the old URL.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='calendar_feed'
+    )
+    token = models.CharField(max_length=64, unique=True, default=new_feed_token)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'calendar_feeds'
+        verbose_name = 'Calendar Feed'
+        verbose_name_plural = 'Calendar Feeds'
+
+    def __str__(self):
+        return f"Calendar feed of {self.user.email}"
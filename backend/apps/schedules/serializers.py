@@ -1,8 +1,56 @@
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+
+from .conflicts import OVERLAP_CONSTRAINTS, conflict_messages, find_conflicts
 from .models import Schedule
 
+User = get_user_model()
+
+
+class ScheduleConflictMixin:
+    """
+    Validates times and rejects double-booking of the teacher or the student
+    on create and update. Unchanged fields are taken from the instance.
+    """
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        def value(name):
+            return attrs[name] if name in attrs else getattr(self.instance, name, None)
+
+        start_time, end_time = value('start_time'), value('end_time')
+        if start_time and end_time and start_time >= end_time:
+            raise serializers.ValidationError('End time must be after start time.')
+        if value('is_active') is False or None in (start_time, end_time, value('day_of_week')):
+            return attrs
+        conflicts = find_conflicts(
+            teacher_id=value('teacher').pk, student_id=value('student').pk,
+            day_of_week=value('day_of_week'), start_time=start_time, end_time=end_time,
+            exclude_pk=self.instance.pk if self.instance else None,
+        )
+        if conflicts:
+            raise serializers.ValidationError(conflict_messages(conflicts))
+        return attrs
+
+    def save(self, **kwargs):
+        # A concurrent write can still win the race on PostgreSQL, where the
+        # exclusion constraints turn it into an IntegrityError.
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as exc:
+            role = next((role for name, role in OVERLAP_CONSTRAINTS.items() if name in str(exc)), None)
+            if role is None:
+                raise
+            raise serializers.ValidationError([f'The {role} already has a class at this time.'])
 
-class ScheduleSerializer(serializers.ModelSerializer):
+
+class ScheduleSerializer(ScheduleConflictMixin, serializers.ModelSerializer):
     teacher_name = serializers.CharField(source='teacher.full_name', read_only=True)
     student_name = serializers.CharField(source='student.full_name', read_only=True)
     day_name = serializers.CharField(source='get_day_of_week_display', read_only=True)
@@ -19,13 +67,130 @@ class ScheduleSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'teacher_name', 'student_name', 'day_name', 'created_at', 'updated_at']
 
 
-class CreateScheduleSerializer(serializers.ModelSerializer):
+class CreateScheduleSerializer(ScheduleConflictMixin, serializers.ModelSerializer):
     class Meta:
         model = Schedule
         fields = ['enrollment', 'teacher', 'student', 'day_of_week', 'time_slot', 'start_time', 'end_time', 'notes']
 
+
+class ScheduleProposalSerializer(serializers.Serializer):
+    # Plain ids: check_timetable loads every involved timetable in one query.
+    id = serializers.IntegerField(required=False, allow_null=True)
+    teacher = serializers.IntegerField()
+    student = serializers.IntegerField()
+    day_of_week = serializers.ChoiceField(choices=Schedule.DayOfWeek.choices)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, attrs):
+        if attrs['start_time'] >= attrs['end_time']:
+            raise serializers.ValidationError('End time must be after start time.')
+        return attrs
+
+
+class TimetableValidationSerializer(serializers.Serializer):
+    schedules = serializers.ListField(
+        child=ScheduleProposalSerializer(),
+        allow_empty=False,
+        max_length=settings.SCHEDULE_BULK_MAX_ITEMS,
+    )
+
+    def validate_schedules(self, items):
+        # Every teacher and student id is checked with one query.
+        roles = dict(User.objects.filter(
+            pk__in={item['teacher'] for item in items} | {item['student'] for item in items},
+        ).values_list('id', 'role'))
+        errors = {}
+        for position, item in enumerate(items):
+            item_errors = {}
+            if roles.get(item['teacher']) != 'teacher':
+                item_errors['teacher'] = ['Selected user is not a teacher.']
+            if roles.get(item['student']) != 'student':
+                item_errors['student'] = ['Selected user is not a student.']
+            if item_errors:
+                errors[position] = item_errors
+        if errors:
+            raise serializers.ValidationError(errors)
+        return items
+
+
+class CalendarQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    tz = serializers.CharField(required=False, default=settings.TIME_ZONE)
+    teacher = serializers.IntegerField(required=False, min_value=1)
+    student = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_tz(self, value):
+        try:
+            return ZoneInfo(value)
+        except (ValueError, ZoneInfoNotFoundError):
+            raise serializers.ValidationError(f'Unknown time zone "{value}".')
+
+    def validate(self, attrs):
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError('End date must not be before start date.')
+        if (attrs['end'] - attrs['start']).days >= settings.CALENDAR_MAX_DAYS:
+            raise serializers.ValidationError(f'The range can cover at most {settings.CALENDAR_MAX_DAYS} days.')
+        return attrs
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    student = serializers.IntegerField(required=False, min_value=1)
+    time_slot = serializers.ChoiceField(choices=Schedule.TimeSlot.choices, required=False)
+    duration = serializers.IntegerField(required=False, default=60, min_value=15, max_value=360)
+    days = serializers.ListField(
+        child=serializers.ChoiceField(choices=Schedule.DayOfWeek.choices), required=False, allow_empty=False,
+    )
+
+    def validate(self, attrs):
+        from apps.accounts.models import StudentProfile
+
+        if 'time_slot' not in attrs:
+            if 'student' not in attrs:
+                raise serializers.ValidationError('Give a time_slot, or a student to use their preferred slot.')
+            slot = StudentProfile.objects.filter(user_id=attrs['student']).values_list(
+                'preferred_time_slot', flat=True,
+            ).first()
+            if slot is None:
+                raise serializers.ValidationError({'student': 'No student profile found for this user.'})
+            attrs['time_slot'] = slot
+        return attrs
+
+
+class WeeklyPatternItemSerializer(serializers.Serializer):
+    day_of_week = serializers.ChoiceField(choices=Schedule.DayOfWeek.choices)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    time_slot = serializers.ChoiceField(choices=Schedule.TimeSlot.choices, required=False)
+
+    def validate(self, attrs):
+        from .availability import slot_for
+
+        if attrs['start_time'] >= attrs['end_time']:
+            raise serializers.ValidationError('End time must be after start time.')
+        if 'time_slot' not in attrs:
+            attrs['time_slot'] = slot_for(attrs['start_time'])
+            if attrs['time_slot'] is None:
+                raise serializers.ValidationError({'time_slot': 'Required for classes starting outside the usual slots.'})
+        return attrs
+
+
+class BulkScheduleSerializer(serializers.Serializer):
+    # Plain enrollment ids: the bulk helper loads them all with one IN query.
+    enrollments = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=settings.SCHEDULE_BULK_MAX_ITEMS,
+    )
+    pattern = serializers.ListField(child=WeeklyPatternItemSerializer(), allow_empty=False, max_length=50)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    # Create the rows that pass even when others fail; by default one failure creates nothing.
+    partial = serializers.BooleanField(default=False)
+
     def validate(self, attrs):
-        if attrs.get('start_time') and attrs.get('end_time'):
-            if attrs['start_time'] >= attrs['end_time']:
-                raise serializers.ValidationError('End time must be after start time.')
+        if len(set(attrs['enrollments'])) * len(attrs['pattern']) > settings.SCHEDULE_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f'A request can create at most {settings.SCHEDULE_BULK_MAX_ITEMS} schedules.'
+            )
         return attrs
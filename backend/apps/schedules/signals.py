@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+
+from apps.courses.models import Course
+from core.response_cache import bump_version
+
+from .calendar import bump_calendars, bump_people_calendars, course_label, person_label, stored_people
+from .conflicts import STUDENT, TEACHER
+from .models import Schedule
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Schedule)
+@receiver(pre_delete, sender=Schedule)
+def remember_stored_people(sender, instance, raw=False, **kwargs):
+    # A schedule moved to another teacher or student changes both calendars.
+    if not raw:
+        instance._stored_people = stored_people(instance)
+
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def invalidate_calendars(sender, instance, **kwargs):
+    bump_people_calendars(instance, getattr(instance, '_stored_people', {}))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_own_calendar(sender, instance, **kwargs):
+    # Feeds check the owner's role and is_active, and are titled with their name.
+    bump_calendars(TEACHER, [instance.pk])
+    bump_calendars(STUDENT, [instance.pk])
+    # Other people's feeds show their name.
+    bump_version(person_label(instance.pk))
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_title(sender, instance, **kwargs):
+    # Class titles in the feeds name the course.
+    bump_version(course_label(instance.pk))
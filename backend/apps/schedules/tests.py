@@ -0,0 +1,352 @@
+import datetime
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import TeacherProfile, User
+from apps.courses.models import Course, Enrollment
+from apps.zoom_meetings.models import ZoomMeeting
+from core.response_cache import model_versions
+
+from .availability import free_windows, teacher_availability
+from .calendar import calendar_label
+from .conflicts import STUDENT, TEACHER
+from .models import CalendarFeed, Schedule
+
+
+class CalendarTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(title='Quran', description='Reading', max_students=10)
+        self.teachers = [
+            User.objects.create_user(f'teacher{number}@example.com', None, full_name=f'Teacher {number}', role='teacher')
+            for number in range(2)
+        ]
+        self.students = [
+            User.objects.create_user(f'student{number}@example.com', None, full_name=f'Student {number}')
+            for number in range(2)
+        ]
+        self.enrollment = Enrollment.objects.create(student=self.students[0], course=self.course, teacher=self.teachers[0])
+
+    def add_schedule(self, **fields):
+        return Schedule.objects.create(**{
+            'enrollment': self.enrollment, 'teacher': self.teachers[0], 'student': self.students[0],
+            'day_of_week': 0, 'time_slot': Schedule.TimeSlot.EVENING,
+            'start_time': datetime.time(15), 'end_time': datetime.time(16), **fields,
+        })
+
+    def versions(self):
+        return model_versions(
+            [calendar_label(TEACHER, teacher.pk) for teacher in self.teachers]
+            + [calendar_label(STUDENT, student.pk) for student in self.students]
+        )
+
+    def assertBumped(self, before, expected):
+        after = self.versions()
+        self.assertEqual([new != old for new, old in zip(after, before)], expected)
+
+
+class CalendarInvalidationTests(CalendarTestCase):
+    def test_moving_a_schedule_bumps_both_calendars(self):
+        schedule = self.add_schedule()
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.teacher = self.teachers[1]
+            schedule.save()
+        self.assertBumped(before, [True, True, True, False])
+
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.notes = 'Bring the mushaf'
+            schedule.save()
+        self.assertBumped(before, [False, True, True, False])
+
+    def test_deferred_load_reads_the_stored_people(self):
+        schedule = self.add_schedule()
+        schedule = Schedule.objects.only('id', 'notes').get(pk=schedule.pk)
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.student_id = self.students[1].pk
+            schedule.save()
+        self.assertBumped(before, [True, False, True, True])
+
+    def test_meeting_delete_bumps_the_stored_people(self):
+        meeting = ZoomMeeting.objects.create(
+            teacher=self.teachers[0], student=self.students[0], title='Class',
+            zoom_link='https://zoom.us/j/1', scheduled_at=timezone.now(),
+        )
+        meeting = ZoomMeeting.objects.get(pk=meeting.pk)
+        meeting.teacher = self.teachers[1]
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            meeting.delete()
+        self.assertBumped(before, [True, True, True, False])
+
+    def test_list_loads_run_no_handlers(self):
+        self.add_schedule()
+        with self.assertNumQueries(1):
+            schedules = list(Schedule.objects.all())
+        self.assertEqual(
+            schedules[0]._loaded_state, {'teacher_id': self.teachers[0].pk, 'student_id': self.students[0].pk},
+        )
+
+
+class CalendarViewTests(CalendarTestCase):
+    def setUp(self):
+        super().setUp()
+        self.schedule = self.add_schedule()
+        self.api = APIClient()
+        self.api.force_authenticate(self.teachers[0])
+
+    def starts(self):
+        response = self.api.get('/api/schedules/calendar/', {'start': '2026-03-02', 'end': '2026-03-08'})
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(b''.join(response.streaming_content))
+        return [occurrence['start'] for occurrence in body['occurrences']]
+
+    @override_settings(SHARED_CACHE=True)
+    def test_schedule_edit_changes_the_next_response(self):
+        self.assertEqual(self.starts(), ['2026-03-02T15:00:00+05:30'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule.start_time, self.schedule.end_time = datetime.time(17), datetime.time(18)
+            self.schedule.save()
+        self.assertEqual(self.starts(), ['2026-03-02T17:00:00+05:30'])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_process_local_cache_is_not_used(self):
+        # A bump made by another worker would never reach this process.
+        self.assertEqual(len(self.starts()), 1)
+        Schedule.objects.filter(pk=self.schedule.pk).update(day_of_week=2)
+        self.assertEqual(self.starts(), ['2026-03-04T15:00:00+05:30'])
+
+
+class AvailabilityTests(CalendarTestCase):
+    def setUp(self):
+        super().setUp()
+        for teacher in self.teachers:
+            TeacherProfile.objects.get_or_create(user=teacher)
+        # Teacher 0 has one active student and a Monday class at 15:00-16:00.
+        self.add_schedule()
+        # Teacher 1 has no students, and classes straddling both edges of the evening slot.
+        self.add_schedule(
+            teacher=self.teachers[1], student=self.students[1],
+            time_slot=Schedule.TimeSlot.MORNING, start_time=datetime.time(11), end_time=datetime.time(13),
+        )
+        self.add_schedule(
+            teacher=self.teachers[1], student=self.students[1],
+            time_slot=Schedule.TimeSlot.NIGHT, start_time=datetime.time(17, 30), end_time=datetime.time(19),
+        )
+
+    def windows(self, **options):
+        return [
+            (row['teacher'], [(window['start_time'], window['end_time']) for window in row['windows']])
+            for row in teacher_availability(Schedule.TimeSlot.EVENING, 60, days=[0], **options)
+        ]
+
+    def test_free_windows_clip_straddling_and_nested_busy_intervals(self):
+        busy = [(690, 780), (800, 900), (820, 850), (960, 990), (1020, 1140)]
+        self.assertEqual(free_windows(busy, 720, 1080, 60), [(900, 960)])
+        self.assertEqual(free_windows(busy, 720, 1080, 20), [(780, 800), (900, 960), (990, 1020)])
+        self.assertEqual(free_windows([], 720, 1080, 60), [(720, 1080)])
+        self.assertEqual(free_windows([(600, 1200)], 720, 1080, 1), [])
+
+    def test_least_loaded_teacher_ranks_first(self):
+        self.assertEqual(self.windows(), [
+            # Fewer free minutes (270 against 300), but no students yet.
+            (self.teachers[1].pk, [(datetime.time(13), datetime.time(17, 30))]),
+            (self.teachers[0].pk, [(datetime.time(12), datetime.time(15)), (datetime.time(16), datetime.time(18))]),
+        ])
+
+    def test_student_classes_are_left_out(self):
+        self.assertEqual(self.windows(student_id=self.students[0].pk)[0], (
+            self.teachers[1].pk,
+            [(datetime.time(13), datetime.time(15)), (datetime.time(16), datetime.time(17, 30))],
+        ))
+
+    @override_settings(TEACHER_MAX_ACTIVE_STUDENTS=1)
+    def test_full_teachers_are_left_out(self):
+        self.assertEqual([teacher for teacher, _ in self.windows()], [self.teachers[1].pk])
+
+
+class CalendarFeedTests(CalendarTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_schedule()
+        self.api = APIClient()
+        self.api.force_authenticate(self.students[0])
+
+    def feed_url(self, token=None):
+        token = token or CalendarFeed.objects.get_or_create(user=self.students[0])[0].token
+        return reverse('calendar-feed-ics', args=[token])
+
+    def poll(self, url=None):
+        return self.client.get(url or self.feed_url())
+
+    def rotate(self):
+        old_url = self.feed_url()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.api.post('/api/schedules/calendar/feed/').status_code, 200)
+        return old_url
+
+    def test_rotated_token_stops_working(self):
+        self.assertEqual(self.poll().status_code, 200)
+        old_url = self.rotate()
+        self.assertEqual(self.poll(old_url).status_code, 404)
+        self.assertEqual(self.poll().status_code, 200)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_shared_cache_serves_polls_without_queries_until_rotation(self):
+        url = self.feed_url()
+        self.assertEqual(self.poll(url).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.poll(url).status_code, 200)
+        self.rotate()
+        self.assertEqual(self.poll(url).status_code, 404)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_process_local_cache_is_not_used(self):
+        # A bump made by another worker would never reach this process.
+        self.assertIn(b'Quran with Teacher 0', self.poll().content)
+        User.objects.filter(pk=self.teachers[0].pk).update(full_name='Ustadh Ahmed')
+        self.assertIn(b'Quran with Ustadh Ahmed', self.poll().content)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_counterpart_name_and_course_title_refresh_the_feed(self):
+        self.assertIn(b'Quran with Teacher 0', self.poll().content)
+        with self.captureOnCommitCallbacks(execute=True):
+            teacher = User.objects.get(pk=self.teachers[0].pk)
+            teacher.full_name = 'Ustadh Ahmed'
+            teacher.save()
+        self.assertIn(b'Quran with Ustadh Ahmed', self.poll().content)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.title = 'Quran Reading'
+            self.course.save()
+        self.assertIn(b'Quran Reading with Ustadh Ahmed', self.poll().content)
+
+
+class ScheduleConflictTests(CalendarTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_schedule()
+        self.other_enrollment = Enrollment.objects.create(
+            student=self.students[1], course=self.course, teacher=self.teachers[0],
+        )
+        self.admin = APIClient()
+        self.admin.force_authenticate(
+            User.objects.create_user('admin@example.com', None, full_name='Admin', role='admin')
+        )
+
+    def create(self, start, end):
+        return self.admin.post('/api/schedules/admin/', {
+            'enrollment': self.other_enrollment.pk, 'teacher': self.teachers[0].pk, 'student': self.students[1].pk,
+            'day_of_week': 0, 'time_slot': Schedule.TimeSlot.EVENING, 'start_time': start, 'end_time': end,
+        }, format='json')
+
+    def test_overlap_is_rejected_and_back_to_back_is_not(self):
+        response = self.create('15:30', '16:30')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('The teacher already has a class on Monday 15:00-16:00', response.data['non_field_errors'][0])
+        self.assertEqual(self.create('16:00', '17:00').status_code, 201)
+
+    def test_update_is_checked_against_other_classes_but_not_itself(self):
+        schedule = Schedule.objects.get()
+        url = f'/api/schedules/admin/{schedule.pk}/'
+        self.assertEqual(self.admin.patch(url, {'start_time': '15:30', 'end_time': '16:30'}, format='json').status_code, 200)
+        other = self.add_schedule(
+            enrollment=self.other_enrollment, student=self.students[1],
+            start_time=datetime.time(17), end_time=datetime.time(18),
+        )
+        response = self.admin.patch(f'/api/schedules/admin/{other.pk}/', {'start_time': '16:00'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['non_field_errors'],
+            [f'The teacher already has a class on Monday 15:30-16:30 (schedule #{schedule.pk}).'],
+        )
+        self.assertEqual(Schedule.objects.get(pk=other.pk).start_time, datetime.time(17))
+
+    def validate(self, *items):
+        return self.admin.post('/api/schedules/admin/validate/', {'schedules': [
+            {'teacher': self.teachers[0].pk, 'student': self.students[1].pk, 'day_of_week': 0, **item}
+            for item in items
+        ]}, format='json')
+
+    def test_validate_checks_moves_against_the_stored_timetable_and_each_other(self):
+        schedule = Schedule.objects.get()
+        response = self.validate(
+            # Moves the stored class out of 15:00-16:00, so item 1 fits there.
+            {'id': schedule.pk, 'student': self.students[0].pk, 'start_time': '16:00', 'end_time': '17:00'},
+            {'start_time': '15:00', 'end_time': '16:00'},
+            {'start_time': '16:30', 'end_time': '17:30'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['valid'], response.data['conflicting']), (False, 1))
+        self.assertEqual([result['errors'] for result in response.data['results']], [
+            [], [],
+            ['The teacher already has a class on Monday 16:00-17:00 (item 0 of this timetable).'],
+        ])
+        response = self.validate({'start_time': '15:00', 'end_time': '16:00'})
+        self.assertEqual(
+            response.data['results'][0]['errors'],
+            [f'The teacher already has a class on Monday 15:00-16:00 (schedule #{schedule.pk}).'],
+        )
+
+    def test_validate_checks_roles(self):
+        response = self.validate(
+            {'start_time': '18:00', 'end_time': '19:00'},
+            {'teacher': self.students[0].pk, 'student': self.teachers[1].pk, 'start_time': '18:00', 'end_time': '19:00'},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['schedules']), {1})
+        self.assertEqual(response.data['schedules'][1]['teacher'], ['Selected user is not a teacher.'])
+        self.assertEqual(response.data['schedules'][1]['student'], ['Selected user is not a student.'])
+
+    def bulk(self, **options):
+        return self.admin.post('/api/schedules/admin/bulk/', {
+            'enrollments': [self.enrollment.pk, self.other_enrollment.pk],
+            'pattern': [{'day_of_week': 2, 'start_time': '15:00', 'end_time': '16:00'}],
+            **options,
+        }, format='json')
+
+    def test_bulk_is_all_or_nothing_by_default(self):
+        Schedule.objects.all().delete()
+        response = self.bulk()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data['created'], response.data['failed'], response.data['skipped']), (0, 1, 1))
+        self.assertEqual([entry['status'] for entry in response.data['results']], ['skipped', 'error'])
+        self.assertIn('item 0 of this timetable', response.data['results'][1]['errors']['non_field_errors'][0])
+        self.assertFalse(Schedule.objects.exists())
+
+    def test_bulk_partial_creates_the_rows_that_pass(self):
+        Schedule.objects.all().delete()
+        response = self.bulk(partial=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed'], response.data['skipped']), (1, 1, 0))
+        self.assertEqual(Schedule.objects.get().pk, response.data['results'][0]['schedule'])
+
+    def test_bulk_rolls_back_when_a_concurrent_booking_wins(self):
+        # Stands in for the PostgreSQL exclusion constraints rejecting a row
+        # that another write booked after validation.
+        Schedule.objects.all().delete()
+        original_save = Schedule.save
+
+        def save(schedule, *args, **kwargs):
+            if schedule.enrollment_id == self.other_enrollment.pk:
+                raise IntegrityError('conflicting key value violates "schedule_teacher_no_overlap"')
+            return original_save(schedule, *args, **kwargs)
+
+        with mock.patch.object(Schedule.objects, 'bulk_create', side_effect=IntegrityError), \
+                mock.patch.object(Schedule, 'save', save):
+            response = self.admin.post('/api/schedules/admin/bulk/', {
+                'enrollments': [self.enrollment.pk, self.other_enrollment.pk],
+                'pattern': [{'day_of_week': 2, 'start_time': '15:00', 'end_time': '16:00'}],
+                'partial': False,
+            }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([entry['status'] for entry in response.data['results']], ['skipped', 'error'])
+        self.assertFalse(Schedule.objects.exists())
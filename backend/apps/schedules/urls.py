@@ -3,7 +3,13 @@ from . import views
 
 urlpatterns = [
     path('admin/', views.AdminScheduleListCreateView.as_view(), name='admin-schedule-list'),
+    path('admin/bulk/', views.AdminBulkScheduleCreateView.as_view(), name='admin-schedule-bulk'),
+    path('admin/validate/', views.AdminTimetableValidateView.as_view(), name='admin-schedule-validate'),
+    path('admin/availability/', views.AdminTeacherAvailabilityView.as_view(), name='admin-teacher-availability'),
     path('admin/<int:pk>/', views.AdminScheduleDetailView.as_view(), name='admin-schedule-detail'),
+    path('calendar/', views.CalendarView.as_view(), name='schedule-calendar'),
+    path('calendar/feed/', views.CalendarFeedView.as_view(), name='calendar-feed'),
+    path('calendar/feed/<slug:token>.ics', views.calendar_feed, name='calendar-feed-ics'),
     path('my-schedule/', views.StudentScheduleView.as_view(), name='student-schedule'),
     path('teaching-schedule/', views.TeacherScheduleView.as_view(), name='teacher-schedule'),
 ]
@@ -1,10 +1,24 @@
-from rest_framework import generics, permissions
-from .models import Schedule
-from .serializers import ScheduleSerializer, CreateScheduleSerializer
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import CalendarFeed, Schedule, new_feed_token
+from .serializers import (
+    ScheduleSerializer, CreateScheduleSerializer, TimetableValidationSerializer, CalendarQuerySerializer,
+    AvailabilityQuerySerializer, BulkScheduleSerializer,
+)
 from apps.accounts.permissions import IsAdminUser, IsTeacherUser, IsStudentUser
+from core.sparse_fields import SparseFieldsetMixin
+from core.values_serializers import ValuesListMixin
 
 
-class AdminScheduleListCreateView(generics.ListCreateAPIView):
+class AdminScheduleListCreateView(SparseFieldsetMixin, ValuesListMixin, generics.ListCreateAPIView):
     """Admin: list all schedules or create new one."""
     permission_classes = [IsAdminUser]
     queryset = Schedule.objects.all().select_related('teacher', 'student', 'enrollment')
@@ -22,7 +36,187 @@ class AdminScheduleDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Schedule.objects.all()
 
 
-class StudentScheduleView(generics.ListAPIView):
+class AdminBulkScheduleCreateView(APIView):
+    """
+    POST /api/schedules/admin/bulk/
+    Admin applies one weekly pattern to many enrollments:
+    {"enrollments": [ids], "pattern": [{day_of_week, start_time, end_time, time_slot?}], "notes"?}.
+    Teacher and student come from each enrollment. Rows that would
+    double-book someone are reported, and then nothing is created (400);
+    send `"partial": true` to create the rows that pass anyway.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        from .bulk import bulk_create_schedules
+
+        serializer = BulkScheduleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        report = bulk_create_schedules(
+            data['enrollments'], data['pattern'], notes=data['notes'], partial=data['partial'],
+        )
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST)
+
+
+class AdminTimetableValidateView(APIView):
+    """
+    POST /api/schedules/admin/validate/
+    Admin checks a whole proposed timetable for double-booking in one pass:
+    {"schedules": [{id?, teacher, student, day_of_week, start_time, end_time}, ...]}.
+    Items are checked against stored schedules and against each other; an
+    `id` marks a change to that existing schedule. Nothing is saved.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        from .conflicts import check_timetable, conflict_messages
+
+        serializer = TimetableValidationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = check_timetable(serializer.validated_data['schedules'])
+        for result in results:
+            result['errors'] = conflict_messages(result['conflicts'])
+        return Response({
+            'valid': not any(result['conflicts'] for result in results),
+            'conflicting': sum(1 for result in results if result['conflicts']),
+            'results': results,
+        })
+
+
+class AdminTeacherAvailabilityView(APIView):
+    """
+    GET /api/schedules/admin/availability/?time_slot=morning&duration=60
+    GET /api/schedules/admin/availability/?student=<id>&days=0&days=2
+    Admin: free windows of at least `duration` minutes for every available
+    teacher inside a time slot (default: the student's preferred slot),
+    least-loaded teachers first. With a student, times they already have a
+    class are not offered.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        from .availability import ALL_DAYS, teacher_availability
+
+        serializer = AvailabilityQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        days = sorted(set(params.get('days', ALL_DAYS)))
+        results = teacher_availability(
+            params['time_slot'], params['duration'], days=days, student_id=params.get('student'),
+        )
+        return Response({
+            'time_slot': params['time_slot'],
+            'duration': params['duration'],
+            'days': days,
+            'count': len(results),
+            'results': results,
+        })
+
+
+class CalendarView(APIView):
+    """
+    GET /api/schedules/calendar/?start=YYYY-MM-DD&end=YYYY-MM-DD&tz=Area/City
+    Dated class occurrences and Zoom meetings between start and end
+    (inclusive), in time order, with times in `tz` (default: the school's
+    zone). Teachers see their own calendar and students their own classes;
+    admins see everything, or one person with ?teacher= and/or ?student=.
+    The JSON body is streamed.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        from apps.zoom_meetings.models import ZoomMeeting
+        from .calendar import CalendarRange
+
+        serializer = CalendarQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        user = request.user
+
+        if user.role == 'teacher':
+            teacher_id, student_id = user.pk, None
+        elif user.role == 'student':
+            teacher_id, student_id = None, user.pk
+        elif user.role == 'admin':
+            teacher_id, student_id = params.get('teacher'), params.get('student')
+        else:
+            self.permission_denied(request)
+
+        schedules = Schedule.objects.filter(is_active=True)
+        meetings = ZoomMeeting.objects.all()
+        if teacher_id is not None:
+            schedules = schedules.filter(teacher_id=teacher_id)
+            meetings = meetings.filter(teacher_id=teacher_id)
+        if student_id is not None:
+            schedules = schedules.filter(student_id=student_id)
+            meetings = meetings.filter(student_id=student_id)
+        if teacher_id is not None:
+            teacher_ids = [teacher_id]
+        else:
+            teacher_ids = schedules.order_by().values_list('teacher_id', flat=True).distinct()
+
+        calendar = CalendarRange(
+            params['start'], params['end'], params['tz'], teacher_ids, student_id=student_id, meetings=meetings,
+        )
+        return StreamingHttpResponse(
+            calendar.stream({'start': params['start'], 'end': params['end'], 'timezone': params['tz'].key}),
+            content_type='application/json',
+        )
+
+
+class CalendarFeedView(APIView):
+    """
+    GET  /api/schedules/calendar/feed/ - the user's iCalendar subscription URL
+    POST /api/schedules/calendar/feed/ - replace it; the old URL stops working
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        feed, _ = CalendarFeed.objects.get_or_create(user=request.user)
+        return Response(self.describe(request, feed))
+
+    def post(self, request):
+        from .feeds import forget_token
+
+        feed, created = CalendarFeed.objects.get_or_create(user=request.user)
+        if not created:
+            old_token, feed.token = feed.token, new_feed_token()
+            feed.save(update_fields=['token', 'updated_at'])
+            transaction.on_commit(lambda: forget_token(old_token))
+        return Response(self.describe(request, feed))
+
+    def describe(self, request, feed):
+        url = request.build_absolute_uri(reverse('calendar-feed-ics', args=[feed.token]))
+        return {
+            'url': url,
+            'webcal_url': 'webcal://' + url.split('://', 1)[1],
+            'created_at': feed.created_at,
+            'updated_at': feed.updated_at,
+        }
+
+
+@require_safe
+def calendar_feed(request, token):
+    """GET /api/schedules/calendar/feed/<token>.ics — a user's timetable for calendar apps."""
+    from .feeds import feed_user_id, get_feed
+
+    user_id = feed_user_id(token)
+    feed = get_feed(user_id) if user_id else None
+    if feed is None:
+        raise Http404
+    etag, last_modified, body = feed
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="timetable.ics"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class StudentScheduleView(SparseFieldsetMixin, ValuesListMixin, generics.ListAPIView):
     """Student: view only their own schedules."""
     serializer_class = ScheduleSerializer
     permission_classes = [IsStudentUser]
@@ -34,7 +228,7 @@ class StudentScheduleView(generics.ListAPIView):
         ).select_related('teacher', 'enrollment')
 
 
-class TeacherScheduleView(generics.ListAPIView):
+class TeacherScheduleView(SparseFieldsetMixin, ValuesListMixin, generics.ListAPIView):
     """Teacher: view all their teaching schedules."""
     serializer_class = ScheduleSerializer
     permission_classes = [IsTeacherUser]
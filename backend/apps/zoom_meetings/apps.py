@@ -5,3 +5,6 @@ class ZoomMeetingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.zoom_meetings'
     verbose_name = 'Zoom Meetings'
+
+    def ready(self):
+        from . import signals  # noqa: F401
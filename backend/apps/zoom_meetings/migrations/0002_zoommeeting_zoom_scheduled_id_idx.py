@@ -0,0 +1,20 @@
+# Generated by Django 5.0.3 on 2026-10-18 09:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_enrollment_enrollments_enrolled_id_idx'),
+        ('zoom_meetings', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='zoommeeting',
+            index=models.Index(fields=['scheduled_at', 'id'], name='zoom_scheduled_id_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.3 on 2026-10-18 09:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_enrollment_enroll_teacher_active_idx_and_more'),
+        ('zoom_meetings', '0002_zoommeeting_zoom_scheduled_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='zoommeeting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['student', '-scheduled_at'], name='zoom_student_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='zoommeeting',
+            index=models.Index(fields=['teacher', '-scheduled_at'], name='zoom_teacher_scheduled_idx'),
+        ),
+    ]
@@ -1,16 +1,20 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from apps.courses.models import Enrollment
+from core.loaded_state import LoadedStateMixin
 
 User = get_user_model()
 
 
-class ZoomMeeting(models.Model):
+class ZoomMeeting(LoadedStateMixin, models.Model):
     """
     Stores Zoom meeting links for teacher-student sessions.
     Designed to be compatible with Zoom API integration in the future.
     """
 
+    # Previous teacher and student for the calendar invalidation (apps/schedules/calendar.py).
+    loaded_state_fields = ('teacher_id', 'student_id')
+
     class MeetingType(models.TextChoices):
         REGULAR = 'regular', 'Regular Class'
         ASSESSMENT = 'assessment', 'Assessment'
@@ -60,6 +64,15 @@ class ZoomMeeting(models.Model):
         verbose_name = 'Zoom Meeting'
         verbose_name_plural = 'Zoom Meetings'
         ordering = ['-scheduled_at']
+        indexes = [
+            # Keyset pagination (core/pagination.py) seeks on (ordering, id).
+            models.Index(fields=['scheduled_at', 'id'], name='zoom_scheduled_id_idx'),
+            models.Index(
+                fields=['student', '-scheduled_at'], condition=models.Q(is_active=True),
+                name='zoom_student_active_idx',
+            ),
+            models.Index(fields=['teacher', '-scheduled_at'], name='zoom_teacher_scheduled_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.scheduled_at.strftime('%Y-%m-%d %H:%M')}"
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.schedules.calendar import bump_people_calendars, stored_people
+
+from .models import ZoomMeeting
+
+
+@receiver(pre_save, sender=ZoomMeeting)
+@receiver(pre_delete, sender=ZoomMeeting)
+def remember_stored_people(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._stored_people = stored_people(instance)
+
+
+@receiver(post_save, sender=ZoomMeeting)
+@receiver(post_delete, sender=ZoomMeeting)
+def invalidate_calendars(sender, instance, **kwargs):
+    # Meetings appear in the calendar feeds of their teacher and student.
+    bump_people_calendars(instance, getattr(instance, '_stored_people', {}))
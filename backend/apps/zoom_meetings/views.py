@@ -4,12 +4,16 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import ZoomMeeting
 from .serializers import ZoomMeetingSerializer, StudentZoomMeetingSerializer
 from apps.accounts.permissions import IsAdminUser, IsTeacherUser, IsStudentUser, IsAdminOrTeacher
+from core.pagination import OptionalCursorPagination
+from core.sparse_fields import SparseFieldsetMixin
+from core.values_serializers import ValuesListMixin
 
 
-class AdminZoomMeetingListCreateView(generics.ListCreateAPIView):
+class AdminZoomMeetingListCreateView(SparseFieldsetMixin, ValuesListMixin, generics.ListCreateAPIView):
     """Admin/Teacher: list all meetings or create a new one."""
     serializer_class = ZoomMeetingSerializer
     permission_classes = [IsAdminOrTeacher]
+    pagination_class = OptionalCursorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_active', 'meeting_type', 'teacher']
 
@@ -36,7 +40,7 @@ class AdminZoomMeetingDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = ZoomMeeting.objects.all()
 
 
-class StudentZoomMeetingView(generics.ListAPIView):
+class StudentZoomMeetingView(SparseFieldsetMixin, generics.ListAPIView):
     """Student: view their own Zoom meetings."""
     serializer_class = StudentZoomMeetingSerializer
     permission_classes = [IsStudentUser]
@@ -0,0 +1,28 @@
+"""
+API error handling.
+
+Wraps DRF's exception handler so errors raised below the views, which must
+not depend on DRF, still get a proper API response.
+"""
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from apps.accounts.hashers import PasswordHashingBusy
+
+
+class ServiceBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The server is busy processing sign-ins. Please try again shortly.'
+    default_code = 'password_hashing_busy'
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+def exception_handler(exc, context):
+    """DRF's handler; PasswordHashingBusy becomes a 503 with Retry-After."""
+    if isinstance(exc, PasswordHashingBusy):
+        exc = ServiceBusy(wait=exc.wait)
+    return drf_exception_handler(exc, context)
@@ -0,0 +1,87 @@
+"""
+Liveness and readiness probes.
+
+/healthz only proves the process is serving requests. /readyz checks the
+database, migrations and cache, and memoises the result for
+HEALTH_READY_CACHE_SECONDS so a flood of probes costs one check per window.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+from django.utils import timezone
+
+_ready_lock = threading.Lock()
+_ready_result = None
+_ready_expires_at = 0.0
+
+
+def healthz(request):
+    """Process-level liveness: never touches the database."""
+    return JsonResponse({
+        'status': 'ok',
+        'message': 'Bismi Academy Backend is running',
+    })
+
+
+def _check_database():
+    started = time.perf_counter()
+    timeout_ms = int(settings.HEALTH_DB_TIMEOUT_SECONDS * 1000)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL statement_timeout = %s', [timeout_ms])
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    result = {'ok': True, 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+    max_age = connection.settings_dict.get('CONN_MAX_AGE')
+    if connection.close_at is not None and max_age:
+        result['connection_age_seconds'] = round(max_age - (connection.close_at - time.monotonic()), 1)
+    return result
+
+
+def _check_migrations():
+    executor = MigrationExecutor(connection)
+    pending = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return {'ok': not pending, 'pending': len(pending)}
+
+
+def _check_cache():
+    key = 'readyz:probe'
+    value = str(time.monotonic())
+    cache.set(key, value, timeout=30)
+    return {'ok': cache.get(key) == value}
+
+
+def _run_checks():
+    checks = {}
+    for name, check in (
+        ('database', _check_database),
+        ('migrations', _check_migrations),
+        ('cache', _check_cache),
+    ):
+        try:
+            checks[name] = check()
+        except Exception as exc:
+            checks[name] = {'ok': False, 'error': exc.__class__.__name__}
+    ready = all(check['ok'] for check in checks.values())
+    return {
+        'status': 'ok' if ready else 'error',
+        'checks': checks,
+        'checked_at': timezone.now().isoformat(),
+    }
+
+
+def readyz(request):
+    """Readiness: database, migrations and cache, cached for a short TTL."""
+    global _ready_result, _ready_expires_at
+    with _ready_lock:
+        if _ready_result is None or time.monotonic() >= _ready_expires_at:
+            _ready_result = _run_checks()
+            _ready_expires_at = time.monotonic() + settings.HEALTH_READY_CACHE_SECONDS
+        result = _ready_result
+    return JsonResponse(result, status=200 if result['status'] == 'ok' else 503)
@@ -0,0 +1,163 @@
+"""
+Resized WebP/JPEG variants of uploaded images.
+
+Course thumbnails and profile photos are stored as uploaded. Clients ask for
+a fixed-size variant instead:
+
+    /img/<group>/<size>.<fmt>/<upload name>     e.g. /img/course/md.webp/courses/quran.png
+
+A variant is rendered on its first request and kept in storage under the
+SHA-256 of the source bytes (variants/ab/abcd.../course-md.webp), so
+identical uploads share their variants and a changed source never serves a
+stale one. Upload names are unique (storage never overwrites), so a variant
+URL always means the same bytes and is served as immutable.
+
+Google sign-in stores profile photos as external URLs. Those are passed
+through untouched for every size.
+"""
+import hashlib
+import io
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.encoding import escape_uri_path
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.http import require_safe
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+# Fixed output boxes (width, height) per group; images are cropped to fill them.
+PRESETS = {
+    'course': {'sm': (320, 180), 'md': (640, 360), 'lg': (1280, 720)},
+    'avatar': {'sm': (64, 64), 'md': (160, 160), 'lg': (320, 320)},
+}
+# The model field each group's sources come from.
+SOURCES = {
+    'course': ('courses.Course', 'thumbnail'),
+    'avatar': ('accounts.User', 'profile_photo'),
+}
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+DIGEST_KEY = 'image-variant:digest:{}'
+
+
+def is_external(name):
+    return name.startswith(('http://', 'https://'))
+
+
+def source_field(group):
+    label, field_name = SOURCES[group]
+    return apps.get_model(label)._meta.get_field(field_name)
+
+
+def variant_url(name, group, size, fmt):
+    if is_external(name):
+        return name
+    return f'{settings.IMAGE_VARIANT_URL}{group}/{size}.{fmt}/{escape_uri_path(name)}'
+
+
+def source_digest(name):
+    """SHA-256 of the source bytes, memoised per (name, size, mtime)."""
+    try:
+        stamp = f'{default_storage.size(name)}:{default_storage.get_modified_time(name).timestamp()}'
+    except NotImplementedError:
+        stamp = None
+    key = DIGEST_KEY.format(hashlib.sha1(f'{name}:{stamp}'.encode()).hexdigest())
+    digest = cache.get(key) if stamp else None
+    if digest is None:
+        sha = hashlib.sha256()
+        with default_storage.open(name) as source:
+            for chunk in source.chunks():
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        if stamp:
+            cache.set(key, digest, timeout=None)
+    return digest
+
+
+def render_variant(source, box, fmt):
+    pil_format = FORMATS[fmt][0]
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = ImageOps.fit(image, box, method=Image.Resampling.LANCZOS)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        if has_alpha and pil_format == 'WEBP':
+            image = image.convert('RGBA')
+        elif has_alpha:
+            # JPEG has no alpha channel: flatten onto white.
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            image = image.convert('RGB')
+        output = io.BytesIO()
+        image.save(output, pil_format, quality=settings.IMAGE_VARIANT_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def ensure_variant(name, group, size, fmt):
+    """Storage name of the variant, rendering it first if needed."""
+    digest = source_digest(name)
+    variant = f'variants/{digest[:2]}/{digest}/{group}-{size}.{fmt}'
+    if not default_storage.exists(variant):
+        with default_storage.open(name) as source:
+            data = render_variant(source, PRESETS[group][size], fmt)
+        if not default_storage.exists(variant):
+            variant = default_storage.save(variant, ContentFile(data))
+    return variant
+
+
+@require_safe
+def image_variant(request, group, size, fmt, name):
+    """GET /img/<group>/<size>.<fmt>/<name> — a resized variant of an uploaded image."""
+    if size not in PRESETS.get(group, {}) or fmt not in FORMATS:
+        raise Http404
+    if not name.startswith(source_field(group).upload_to) or is_external(name):
+        raise Http404
+    try:
+        variant = ensure_variant(name, group, size, fmt)
+    except (OSError, SuspiciousFileOperation, UnidentifiedImageError, Image.DecompressionBombError):
+        raise Http404
+
+    etag = quote_etag(variant.rsplit('/', 2)[-2] + f'-{size}.{fmt}')
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(default_storage.open(variant), content_type=FORMATS[fmt][1])
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.IMAGE_VARIANT_MAX_AGE}, immutable'
+    return response
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Read-only {size: {format: url}} for an image field, e.g.
+    `thumbnail_variants = ImageVariantsField('course', source='thumbnail')`.
+    """
+
+    def __init__(self, group, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.group = group
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        name = getattr(value, 'name', value)
+        request = self.context.get('request')
+        variants = {}
+        for size in PRESETS[self.group]:
+            variants[size] = {}
+            for fmt in FORMATS:
+                url = variant_url(name, self.group, size, fmt)
+                if request is not None and not is_external(url):
+                    url = request.build_absolute_uri(url)
+                variants[size][fmt] = url
+        return variants
@@ -0,0 +1,47 @@
+"""
+Previous field values for signal handlers that apply deltas.
+
+Counters and cache invalidation need to know what a row looked like before
+a save (which course it counted towards, which teacher's calendar it was
+on). Models list those fields in `loaded_state_fields`. from_db() records
+them when a row is loaded, and save() refreshes them once every post_save
+handler has run, so `_loaded_state` always describes the row as stored.
+save() runs in a transaction, so the row and whatever its handlers write
+(counter deltas) commit together, as deletes already do.
+
+Only rows loaded from the database pay for this, and only for the listed
+fields. Fields that were deferred at load time are missing from the state;
+handlers read them from the database before the save instead.
+"""
+from django.db import transaction
+
+
+class LoadedStateMixin:
+    loaded_state_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = {
+            name: value for name, value in zip(field_names, values) if name in cls.loaded_state_fields
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self._loaded_state = {
+            name: self.__dict__[name] for name in self.loaded_state_fields if name in self.__dict__
+        }
+
+    def loaded_state(self, fields):
+        """
+        {field: value as stored} for `fields`, or None for a row that is not
+        stored yet. Call before the row is written (pre_save / pre_delete).
+        """
+        if self._state.adding:
+            return None
+        state = getattr(self, '_loaded_state', {})
+        if all(name in state for name in fields):
+            return {name: state[name] for name in fields}
+        return type(self)._base_manager.filter(pk=self.pk).values(*fields).first()
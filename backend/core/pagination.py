@@ -0,0 +1,110 @@
+"""
+Opt-in keyset pagination for large list endpoints.
+
+PageNumberPagination runs COUNT(*) and an OFFSET scan, so page N costs
+O(N * page_size). With `?pagination=cursor` (or any `?cursor=`), these views
+instead filter on the position of the last row seen, using the model's
+Meta.ordering field with `id` as the unique tiebreaker. Every page is then an
+index range scan of page_size + 1 rows. Page-number requests behave exactly
+as before, so existing clients are unaffected.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def get_keyset_ordering(self, queryset, view):
+        """The ordering field, taken from view.cursor_ordering or the model's Meta.ordering."""
+        ordering = getattr(view, 'cursor_ordering', None) or queryset.model._meta.ordering[0]
+        descending = ordering.startswith('-')
+        return queryset.model._meta.get_field(ordering.lstrip('-')), descending
+
+    def encode_cursor(self, row, reverse):
+        if isinstance(row, dict):
+            # A .values() row (see core.values_serializers).
+            pk = row[self.field.model._meta.pk.attname]
+            row = self.field.model(**{self.field.attname: row[self.field.name]})
+        else:
+            pk = row.pk
+        position = {'v': self.field.value_to_string(row), 'id': pk, 'r': reverse}
+        token = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+        return replace_query_param(
+            remove_query_param(self.base_url, self.page_query_param), self.cursor_query_param, token
+        )
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(token.encode()))
+            return self.field.to_python(position['v']), int(position['id']), bool(position['r'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.use_cursor(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.field, descending = self.get_keyset_ordering(queryset, view)
+        cursor = self.decode_cursor(request)
+        reverse = cursor[2] if cursor else False
+
+        # Walking backwards flips the comparison and the ordering; the page is
+        # reversed again below so results always come out in display order.
+        forwards_desc = descending != reverse
+        name = self.field.name
+        if cursor:
+            value, pk, _ = cursor
+            op = 'lt' if forwards_desc else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{name}__{op}': value}) | Q(**{name: value, f'pk__{op}': pk})
+            )
+        prefix = '-' if forwards_desc else ''
+        rows = list(queryset.order_by(f'{prefix}{name}', f'{prefix}pk')[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_link = self.previous_link = None
+        if rows:
+            if has_more or reverse:
+                self.next_link = self.encode_cursor(rows[-1], reverse=False)
+            if (has_more and reverse) or (cursor and not reverse):
+                self.previous_link = self.encode_cursor(rows[0], reverse=True)
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.next_link),
+            ('previous', self.previous_link),
+            ('results', data),
+        ]))
+
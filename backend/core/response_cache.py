@@ -0,0 +1,107 @@
+"""
+Versioned response cache for public list endpoints.
+
+Each cached view names the models its output depends on. Every model has a
+version counter in the cache that is bumped after a save or delete commits.
+Cache keys include the current versions, so a write makes every older entry
+unreachable at once and nothing has to be deleted. A hit returns the stored
+bytes with a strong ETag, or 304 Not Modified when the client already holds
+them, without touching the database.
+
+The counters live in the default cache, so a bump made in one process
+(another gunicorn worker, the import worker) reaches the others only when
+that cache is shared. Without REDIS_URL (settings.SHARED_CACHE) responses
+are therefore not cached at all, rather than served stale.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+VERSION_KEY = 'response-cache:version:{}'
+
+
+def model_versions(labels):
+    keys = [VERSION_KEY.format(label) for label in labels]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A fresh, never-reused starting point, so entries cached under a
+            # counter that was evicted can never be served again.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model):
+    """Invalidate cached responses that depend on `model`, once the write commits."""
+    bump_version(model._meta.label_lower)
+
+
+def bump_version(label):
+    """Bump the counter for `label` (a model label or a finer-grained key) on commit."""
+    key = VERSION_KEY.format(label)
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+class VersionedCacheMixin:
+    """
+    Caches the rendered list response per query string and renderer.
+    Set `cache_models` to the 'app_label.Model' labels the response is built from.
+    """
+    cache_models = ()
+
+    def get_response_cache_key(self, request):
+        labels = [label.lower() for label in self.cache_models]
+        versions = '.'.join(str(version) for version in model_versions(labels))
+        # Bodies hold absolute URLs (media, pagination links) built from the
+        # request's scheme and Host, so those are part of the key: a forged
+        # Host header must not poison the entry other clients are served.
+        origin = f'{request.scheme}://{request.get_host()}'
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        params = hashlib.sha1(f'{origin}?{query}'.encode()).hexdigest()
+        return f'response-cache:{request.path}:{request.accepted_renderer.format}:{versions}:{params}'
+
+    def not_modified(self, request, etag):
+        return etag in parse_etags(request.headers.get('If-None-Match', ''))
+
+    def list(self, request, *args, **kwargs):
+        if not settings.SHARED_CACHE:
+            return super().list(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            etag, content, content_type = cached
+            response = (
+                HttpResponseNotModified() if self.not_modified(request, etag)
+                else HttpResponse(content, content_type=content_type)
+            )
+            response['ETag'] = etag
+            return response
+        self.response_cache_key = key
+        return super().list(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, 'response_cache_key', None)
+        if key is None or response.status_code != 200:
+            return response
+        response.render()
+        etag = quote_etag(hashlib.sha256(response.content).hexdigest())
+        cache.set(key, (etag, response.content, response['Content-Type']), settings.RESPONSE_CACHE_SECONDS)
+        if self.not_modified(request, etag):
+            response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
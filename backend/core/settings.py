@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'apps.schedules',
     'apps.payments',
     'apps.zoom_meetings',
+    'apps.analytics',
 ]
 
 MIDDLEWARE = [
@@ -78,6 +79,25 @@ DATABASES = {
     'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600)
 }
 
+# Cache: shared Redis when REDIS_URL is set, otherwise per-process memory
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Caches that a write elsewhere must invalidate (the versioned response,
+# calendar and feed caches) are only used when every process shares them.
+SHARED_CACHE = bool(REDIS_URL)
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -89,6 +109,27 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Hashing goes through a bounded per-process executor (apps/accounts/hashers.py).
+PASSWORD_HASHERS = [
+    'apps.accounts.hashers.BoundedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASHING_SLOTS = config('PASSWORD_HASHING_SLOTS', default=2, cast=int)
+PASSWORD_HASHING_QUEUE_SIZE = config('PASSWORD_HASHING_QUEUE_SIZE', default=8, cast=int)
+PASSWORD_HASHING_TIMEOUT_SECONDS = config('PASSWORD_HASHING_TIMEOUT_SECONDS', default=5, cast=float)
+PASSWORD_HASHING_RETRY_AFTER_SECONDS = config('PASSWORD_HASHING_RETRY_AFTER_SECONDS', default=2, cast=int)
+
+# Bulk CSV user import (apps/accounts/importers.py)
+USER_IMPORT_CHUNK_SIZE = config('USER_IMPORT_CHUNK_SIZE', default=500, cast=int)
+USER_IMPORT_PROCESSES = config('USER_IMPORT_PROCESSES', default=os.cpu_count() or 1, cast=int)
+# How often `import_users --worker` checks for imports queued through the API
+USER_IMPORT_POLL_SECONDS = config('USER_IMPORT_POLL_SECONDS', default=5, cast=int)
+# A job running longer than this is taken to belong to a worker that died, and is marked failed
+USER_IMPORT_JOB_TIMEOUT_SECONDS = config('USER_IMPORT_JOB_TIMEOUT_SECONDS', default=3600, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Asia/Kolkata'
@@ -104,23 +145,29 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resized image variants (core/images.py)
+IMAGE_VARIANT_URL = '/img/'
+IMAGE_VARIANT_QUALITY = config('IMAGE_VARIANT_QUALITY', default=80, cast=int)
+IMAGE_VARIANT_MAX_AGE = 60 * 60 * 24 * 365
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
+        'apps.accounts.search.IndexedSearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'EXCEPTION_HANDLER': 'core.exceptions.exception_handler',
 }
 
 # JWT Configuration
@@ -134,8 +181,62 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.serializers.RotatingTokenRefreshSerializer',
 }
 
+# Firebase ID-token verification for Google sign-in (apps/accounts/firebase.py)
+FIREBASE_PROJECT_ID = config('FIREBASE_PROJECT_ID', default='bismi-arabic-institute')
+FIREBASE_CERTS_URL = config(
+    'FIREBASE_CERTS_URL',
+    default='https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+)
+FIREBASE_CERTS_FILE = config('FIREBASE_CERTS_FILE', default='')
+FIREBASE_CERTS_REFRESH_SECONDS = config('FIREBASE_CERTS_REFRESH_SECONDS', default=3600, cast=int)
+
+# In-memory filter of recently blacklisted refresh-token JTIs (apps/accounts/tokens.py)
+TOKEN_BLACKLIST_FILTER_CAPACITY = config('TOKEN_BLACKLIST_FILTER_CAPACITY', default=100000, cast=int)
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = config('TOKEN_BLACKLIST_FILTER_ERROR_RATE', default=0.01, cast=float)
+
+# Readiness probe (core/health.py)
+HEALTH_DB_TIMEOUT_SECONDS = config('HEALTH_DB_TIMEOUT_SECONDS', default=2, cast=float)
+HEALTH_READY_CACHE_SECONDS = config('HEALTH_READY_CACHE_SECONDS', default=5, cast=float)
+
+# Full recompute of the dashboard stats snapshot (apps/analytics), run by start.sh (0 = boot only)
+STATS_RECOMPUTE_INTERVAL_SECONDS = config('STATS_RECOMPUTE_INTERVAL_SECONDS', default=3600, cast=int)
+
+# Versioned cache for the public course and teacher lists (core/response_cache.py); needs SHARED_CACHE
+RESPONSE_CACHE_SECONDS = config('RESPONSE_CACHE_SECONDS', default=600, cast=int)
+
+# Largest batch accepted by the bulk enrollment and teacher-assignment endpoints
+BULK_ENROLLMENT_MAX_ITEMS = config('BULK_ENROLLMENT_MAX_ITEMS', default=500, cast=int)
+
+# Teacher auto-assignment: cap on a teacher's active students across all courses
+# (0 = no cap; applying a plan then needs "allow_uncapped": true)
+TEACHER_MAX_ACTIVE_STUDENTS = config('TEACHER_MAX_ACTIVE_STUDENTS', default=30, cast=int)
+
+# Largest proposed timetable accepted by the schedule validation endpoint
+SCHEDULE_BULK_MAX_ITEMS = config('SCHEDULE_BULK_MAX_ITEMS', default=1000, cast=int)
+
+# Calendar expansion of weekly schedules (apps/schedules/calendar.py); weeks are cached only with SHARED_CACHE
+CALENDAR_MAX_DAYS = config('CALENDAR_MAX_DAYS', default=62, cast=int)
+CALENDAR_CACHE_SECONDS = config('CALENDAR_CACHE_SECONDS', default=86400, cast=int)
+
+# iCalendar subscription feeds (apps/schedules/feeds.py); tokens and feeds are cached only with SHARED_CACHE
+CALENDAR_FEED_CACHE_SECONDS = config('CALENDAR_FEED_CACHE_SECONDS', default=3600, cast=int)
+CALENDAR_FEED_PAST_DAYS = config('CALENDAR_FEED_PAST_DAYS', default=90, cast=int)
+
+# Rows per section of the student home endpoint (apps/accounts/home.py)
+STUDENT_HOME_LIMITS = {
+    'enrollments': 10,
+    'schedule': 20,
+    'meetings': 10,
+    'payments': 5,
+}
+
+# Per-process cache of User rows used by ClaimsJWTAuthentication (0 disables it)
+USER_CACHE_MAX_ENTRIES = config('USER_CACHE_MAX_ENTRIES', default=1024, cast=int)
+USER_CACHE_TTL_SECONDS = config('USER_CACHE_TTL_SECONDS', default=300, cast=int)
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -0,0 +1,172 @@
+"""
+Sparse fieldsets: `?fields=` and `?omit=` on read endpoints.
+
+Both take comma-separated field paths, with dots for nested serializers:
+
+    ?fields=id,full_name,student_profile.preferred_time_slot
+    ?omit=course.description,course.syllabus
+
+The view's serializer is pruned to what was asked for, and the queryset is
+narrowed to match. Relations no remaining field reads are dropped from
+select_related, and only() loads just the columns the remaining fields read.
+If a serializer level has fields whose inputs can't be known (method fields,
+model properties, a custom to_representation), that level keeps all of its
+columns and the joins the view already selected beneath it. Responses stay
+correct; that level just doesn't get narrower.
+
+Without either parameter nothing changes.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+# Leaf marker in a parsed path tree: the whole field.
+WHOLE = None
+
+
+def parse_paths(value):
+    """'id,course.title' -> {'id': WHOLE, 'course': {'title': WHOLE}}"""
+    tree = {}
+    for path in value.split(','):
+        parts = [part.strip() for part in path.split('.')]
+        if not all(parts):
+            continue
+        node = tree
+        for part in parts[:-1]:
+            if node.get(part, {}) is WHOLE:
+                break  # the whole field was already asked for
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = WHOLE
+    return tree
+
+
+def nested_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    return field if isinstance(field, serializers.BaseSerializer) else None
+
+
+def prune(serializer, include, omit, prefix=''):
+    """Drop fields from `serializer` in place. Returns the unknown paths."""
+    fields = serializer.fields
+    unknown = [prefix + name for name in (include or {}) if name not in fields]
+    unknown += [prefix + name for name in (omit or {}) if name not in fields]
+    for name in list(fields):
+        if (include is not None and name not in include) or (omit and name in omit and omit[name] is WHOLE):
+            del fields[name]
+    for name, field in fields.items():
+        sub_include = include.get(name) if include else WHOLE
+        sub_omit = omit.get(name) if omit else WHOLE
+        if sub_include is WHOLE and sub_omit is WHOLE:
+            continue
+        child = nested_serializer(field)
+        if child is None:
+            unknown += [f'{prefix}{name}.{sub}' for sub in (sub_include or sub_omit)]
+            continue
+        unknown += prune(child, sub_include, sub_omit, prefix=f'{prefix}{name}.')
+    return unknown
+
+
+class QuerysetPlan:
+    """The columns and joins a (pruned) serializer reads from a queryset."""
+
+    def __init__(self, serializer, model, original_related):
+        self.columns = set()
+        self.related = set()
+        self.original_related = original_related
+        self.visit(serializer, model, '')
+
+    def visit(self, serializer, model, prefix):
+        opaque = type(serializer).to_representation is not serializers.Serializer.to_representation
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if not self.visit_field(field, model, prefix):
+                opaque = True
+        if opaque:
+            self.columns.update(prefix + f.name for f in model._meta.concrete_fields)
+            self.related.update(path for path in self.original_related if path.startswith(prefix))
+
+    def visit_field(self, field, model, prefix):
+        """Record what `field` reads; False when that can't be worked out."""
+        if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            return False
+        attrs = field.source_attrs
+        for position, attr in enumerate(attrs):
+            last = position == len(attrs) - 1
+            if last and attr.startswith('get_') and attr.endswith('_display'):
+                attr = attr[4:-8]
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return False
+            if model_field.many_to_many or model_field.one_to_many:
+                return False
+            if model_field.concrete:
+                self.columns.add(prefix + model_field.name)
+            if last and not (model_field.is_relation and nested_serializer(field) is not None):
+                return True
+            if not model_field.is_relation:
+                return False
+            prefix = f'{prefix}{model_field.name}__'
+            self.related.add(prefix[:-2])
+            model = model_field.related_model
+        self.visit(nested_serializer(field), model, prefix)
+        return True
+
+
+def select_related_paths(queryset):
+    """The select_related() paths of a queryset, or None for select_related()."""
+    tree = queryset.query.select_related
+    if tree is True:
+        return None
+    paths, stack = set(), [('', tree or {})]
+    while stack:
+        prefix, node = stack.pop()
+        for name, child in node.items():
+            paths.add(prefix + name)
+            stack.append((f'{prefix}{name}__', child))
+    return paths
+
+
+class SparseFieldsetMixin:
+    """
+    Generic view mixin: honour `?fields=` / `?omit=` on safe requests by
+    pruning the serializer and narrowing the queryset it reads.
+    """
+
+    def get_sparse_fieldset(self):
+        """(include, omit) path trees, or None when neither parameter is given."""
+        if not hasattr(self, '_sparse_fieldset'):
+            params = self.request.query_params
+            self._sparse_fieldset = None
+            if self.request.method in ('GET', 'HEAD') and (FIELDS_PARAM in params or OMIT_PARAM in params):
+                include = parse_paths(params[FIELDS_PARAM]) if FIELDS_PARAM in params else None
+                self._sparse_fieldset = (include, parse_paths(params.get(OMIT_PARAM, '')))
+        return self._sparse_fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is not None:
+            unknown = prune(nested_serializer(serializer), *fieldset)
+            if unknown:
+                raise ValidationError({'fields': [f'Unknown field: {path}' for path in unknown]})
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fieldset() is None:
+            return queryset
+        original_related = select_related_paths(queryset)
+        if original_related is None or queryset.query.deferred_loading != (frozenset(), True):
+            return queryset  # select_related() of everything, or already deferred
+        plan = QuerysetPlan(self.get_serializer(), queryset.model, original_related)
+        queryset = queryset.select_related(None)
+        if plan.related:
+            queryset = queryset.select_related(*sorted(plan.related))
+        return queryset.only(*sorted(plan.columns))
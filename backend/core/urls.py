@@ -6,32 +6,23 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from django.http import JsonResponse
-
-def health_check(request):
-    try:
-        from apps.accounts.models import User
-        count = User.objects.count()
-        return JsonResponse({
-            'status': 'ok',
-            'database': 'connected',
-            'message': 'Bismi Academy Backend is running'
-        })
-    except Exception as e:
-        return JsonResponse({
-            'status': 'error',
-            'database': 'failed',
-            'error': 'Database connectivity issue'
-        }, status=500)
+from .health import healthz, readyz
+from .images import image_variant
 
 urlpatterns = [
-    path('', health_check, name='health-check'),
+    path('', healthz, name='health-check'),
+    path('healthz', healthz, name='healthz'),
+    path('readyz', readyz, name='readyz'),
     path('admin/', admin.site.urls),
     path('api/auth/', include('apps.accounts.urls')),
     path('api/courses/', include('apps.courses.urls')),
     path('api/schedules/', include('apps.schedules.urls')),
     path('api/payments/', include('apps.payments.urls')),
     path('api/zoom/', include('apps.zoom_meetings.urls')),
+    path(
+        settings.IMAGE_VARIANT_URL.lstrip('/') + '<slug:group>/<slug:size>.<slug:fmt>/<path:name>',
+        image_variant, name='image-variant',
+    ),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,182 @@
+"""
+Read-only list serialization straight from `.values()` rows.
+
+A ModelSerializer list builds one model instance per row (plus one per
+select_related relation), then walks every field through get_attribute and
+to_representation. For large read-only lists most of that work is wasted.
+ValuesSerializer compiles an existing ModelSerializer once into a flat plan:
+the `.values()` lookup each field reads, and the converter its output needs.
+Rows are then mapped from plain dicts. Plain values (ids, strings, ints,
+bools, choices) are copied as they are; dates, times and decimals go through
+the serializer's own field, so the JSON is byte-for-byte the same as the
+ModelSerializer output.
+
+Only fields that map onto a `.values()` lookup can be compiled: concrete
+model fields, forward relations (`source='student.full_name'`) and
+`get_FOO_display`. Anything else (method fields, nested serializers, files,
+properties) raises ImproperlyConfigured when the plan is built, never at
+request time with a different payload.
+"""
+import copy
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils.encoding import force_str
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty
+from rest_framework.response import Response
+
+# Fields whose to_representation is the identity for values read from the database.
+PASSTHROUGH_FIELDS = (
+    serializers.PrimaryKeyRelatedField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.ReadOnlyField,
+)
+CONVERTED_FIELDS = (
+    serializers.DateTimeField,
+    serializers.DateField,
+    serializers.TimeField,
+    serializers.DecimalField,
+    serializers.FloatField,
+    serializers.UUIDField,
+    serializers.JSONField,
+)
+
+_compiled = {}
+
+
+class ValuesSerializer:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.set_plan([self.compile_field(field) for field in serializer_class().fields.values()])
+
+    def set_plan(self, plan):
+        self.plan = plan
+        self.lookups = list(dict.fromkeys(
+            lookup for step in plan for lookup in (step[1], step[3]) if lookup
+        ))
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        if serializer_class not in _compiled:
+            _compiled[serializer_class] = cls(serializer_class)
+        return _compiled[serializer_class]
+
+    def subset(self, names):
+        """A copy rendering only the fields in `names` (see core.sparse_fields)."""
+        names = set(names)
+        if names.issuperset(step[0] for step in self.plan):
+            return self
+        subset = copy.copy(self)
+        subset.set_plan([step for step in self.plan if step[0] in names])
+        return subset
+
+    def fail(self, field, reason):
+        raise ImproperlyConfigured(
+            f'{self.serializer_class.__name__}.{field.field_name} cannot be read from .values(): {reason}'
+        )
+
+    def compile_field(self, field):
+        """Return (key, lookup, convert, null_guard, on_null) for one serializer field."""
+        if field.write_only:
+            self.fail(field, 'write-only fields are not rendered.')
+        if field.source == '*' or not isinstance(field, PASSTHROUGH_FIELDS + CONVERTED_FIELDS):
+            self.fail(field, f'{type(field).__name__} is not supported.')
+
+        model, parts, guard = self.model, [], None
+        attrs = field.source_attrs
+        for position, attr in enumerate(attrs):
+            last = position == len(attrs) - 1
+            if last and attr.startswith('get_') and attr.endswith('_display'):
+                choice_field = self.model_field(field, model, attr[4:-8])
+                if not choice_field.choices:
+                    self.fail(field, f'{attr} has no choices.')
+                parts.append(choice_field.name)
+                labels = dict(choice_field.flatchoices)
+                return (
+                    field.field_name, '__'.join(parts),
+                    lambda value: field.to_representation(force_str(labels.get(value, value), strings_only=True)),
+                    guard, self.on_null(field),
+                )
+            model_field = self.model_field(field, model, attr)
+            if model_field.many_to_many or model_field.one_to_many or (model_field.is_relation and not model_field.concrete):
+                self.fail(field, f'{attr} is not a forward relation.')
+            parts.append(model_field.name)
+            if not last:
+                if not model_field.is_relation:
+                    self.fail(field, f'{attr} is not a relation.')
+                if model_field.null and guard is None:
+                    # Distinguishes a missing relation from a null value behind it.
+                    guard = '__'.join(parts)
+                model = model_field.related_model
+
+        convert = field.to_representation if isinstance(field, CONVERTED_FIELDS) else None
+        return field.field_name, '__'.join(parts), convert, guard, self.on_null(field)
+
+    def model_field(self, field, model, name):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            self.fail(field, f'{model.__name__}.{name} is not a model field.')
+
+    @staticmethod
+    def on_null(field):
+        """What DRF renders when a relation on the source path is missing."""
+        if field.default is not empty:
+            return lambda: field.get_default()
+        if field.allow_null:
+            return lambda: None
+        return None  # the key is left out, as with SkipField
+
+    def values(self, queryset, *extra):
+        """The queryset as dict rows carrying every lookup the plan reads."""
+        return queryset.values(*dict.fromkeys([*self.lookups, *extra]))
+
+    def to_representation(self, rows):
+        plan = self.plan
+        data = []
+        for row in rows:
+            item = {}
+            for key, lookup, convert, guard, on_null in plan:
+                if guard is not None and row[guard] is None:
+                    if on_null is None:
+                        continue
+                    try:
+                        item[key] = on_null()
+                    except SkipField:
+                        pass
+                    continue
+                value = row[lookup]
+                item[key] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class ValuesListMixin:
+    """
+    Serve GET list responses from `.values()` rows through a compiled
+    ValuesSerializer of the view's serializer class. Output, filtering and
+    pagination are unchanged; only the row materialisation is skipped.
+    """
+
+    def get_values_serializer(self):
+        # The view's serializer may have been pruned by ?fields= / ?omit=.
+        fields = self.get_serializer().fields
+        return ValuesSerializer.for_serializer(self.get_serializer_class()).subset(fields)
+
+    def get_values_extra_lookups(self, queryset):
+        """Ordering fields and pk, which keyset pagination reads from each row."""
+        ordering = [getattr(self, 'cursor_ordering', None), *queryset.model._meta.ordering]
+        return [queryset.model._meta.pk.attname] + [field.lstrip('-') for field in ordering if field]
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = values_serializer.values(queryset, *self.get_values_extra_lookups(queryset))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.to_representation(page))
+        return Response(values_serializer.to_representation(queryset))
@@ -3,3 +3,7 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 application = get_wsgi_application()
+
+# Load Firebase signing keys in the background before the first Google sign-in.
+from apps.accounts.firebase import firebase_keys  # noqa: E402
+firebase_keys.start()
@@ -5,5 +5,16 @@ set -o errexit
 echo "--- Bismi Academy: Running Migrations ---"
 python manage.py migrate --noinput
 
+echo "--- Bismi Academy: Verifying Stats Snapshot ---"
+python manage.py recompute_stats
+
+# Re-verify it every STATS_RECOMPUTE_INTERVAL_SECONDS for the life of this instance.
+python manage.py recompute_stats --loop &
+
+# CSV imports queued through the admin API run here, outside the web workers.
+python manage.py import_users --worker &
+
 echo "--- Bismi Academy: Starting Gunicorn ---"
-gunicorn core.wsgi:application
+# Threaded workers keep serving other endpoints while password hashes wait
+# for one of the PASSWORD_HASHING_SLOTS.
+gunicorn core.wsgi:application --worker-class gthread --threads "${GUNICORN_THREADS:-4}"
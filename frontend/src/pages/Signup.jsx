@@ -97,7 +97,7 @@ export default function Signup() {
                 const res = await fetch(url, {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(reqUser)
+                    body: JSON.stringify({ id_token: await user.getIdToken() })
                 });
                 if (res.ok) {
                     const data = await res.json();